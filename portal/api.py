@@ -1,19 +1,50 @@
 # mypy: disable-error-code="misc,untyped-decorator"
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import asdict
+from datetime import datetime
 from typing import Any
 
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http.response import HttpResponseBase
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
 from rest_framework import serializers, status, viewsets
+from rest_framework.authentication import BaseAuthentication
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
 
+from portal.conditional import add_validators, cached_not_modified, not_modified
 from portal.forms import LookupForm
-from portal.services.eligibility import evaluate_eligibility
-from portal.services.order_store import find_order, get_order
-from portal.types import Article, ArticleEligibility, Order
+from portal.payloads import (
+    ArticlesJSONRenderer,
+    EntryPayload,
+    articles_payload,
+    result_entries,
+    result_entry,
+)
+from portal.services.eligibility import (
+    evaluate_cached,
+    evaluate_eligibility,
+    evaluate_order,
+)
+from portal.services.eligibility_trace import EligibilityTracer, rule_stats
+from portal.services.order_store import (
+    find_order,
+    get_order_record,
+    get_orders,
+    order_from_record,
+)
+from portal.services.rules import get_ruleset
+from portal.services.throttle import client_ident, get_lookup_throttle
+from portal.tokens import HEADER, issue_lookup_token, token_order_number
+from portal.types import ArticleEligibility, Order
 
 
 class LookupRequestSerializer(serializers.Serializer[dict[str, Any]]):
@@ -24,6 +55,7 @@ class LookupRequestSerializer(serializers.Serializer[dict[str, Any]]):
 class LookupResponseSerializer(serializers.Serializer[dict[str, Any]]):
     order_number = serializers.CharField()
     articles_url = serializers.CharField()
+    token = serializers.CharField()
 
 
 class ArticleSerializer(serializers.Serializer[dict[str, Any]]):
@@ -63,10 +95,69 @@ class ArticlesResponseSerializer(serializers.Serializer[dict[str, Any]]):
     results = EligibilityEntrySerializer(many=True)
 
 
+class BulkEligibilityRequestSerializer(serializers.Serializer[dict[str, Any]]):
+    order_numbers = serializers.ListField(
+        child=serializers.CharField(max_length=50),
+        allow_empty=False,
+        max_length=500,
+    )
+
+
+class BulkEligibilityOrderSerializer(serializers.Serializer[dict[str, Any]]):
+    order_number = serializers.CharField()
+    found = serializers.BooleanField()
+    results = EligibilityEntrySerializer(many=True)
+
+
+class BulkEligibilityResponseSerializer(serializers.Serializer[dict[str, Any]]):
+    orders = BulkEligibilityOrderSerializer(many=True)
+
+
+class LookupTokenAuthentication(BaseAuthentication):
+    """Accept a lookup token; ``request.auth`` is the order number it proves.
+
+    Requests with a valid token are not looked up in the session at all.
+    """
+
+    def authenticate(self, request: Request) -> tuple[AnonymousUser, str] | None:
+        order_number = token_order_number(request)
+        if order_number is None:
+            return None
+        return AnonymousUser(), order_number
+
+
+class LookupTokenScheme(OpenApiAuthenticationExtension):  # type: ignore[no-untyped-call]
+    target_class = "portal.api.LookupTokenAuthentication"
+    name = "lookupToken"
+
+    def get_security_definition(self, auto_schema: Any) -> dict[str, str]:
+        return {"type": "apiKey", "in": "header", "name": HEADER}
+
+
+class LookupRateThrottle(BaseThrottle):
+    """Token buckets per client and per order number on lookup attempts."""
+
+    def allow_request(self, request: Request, view: Any) -> bool:
+        data = request.data
+        order_number = data.get("order_number") if hasattr(data, "get") else None
+        self._wait = get_lookup_throttle().check(
+            client_ident(request.META), order_number
+        )
+        return not self._wait
+
+    def wait(self) -> float | None:
+        return self._wait or None
+
+
 class ReturnsViewSet(viewsets.ViewSet):
     """Headless endpoints mirroring the lookup/articles browser flow."""
 
-    @action(detail=False, methods=["post"], url_path="lookup")
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="lookup",
+        throttle_classes=[LookupRateThrottle],
+    )
     def lookup(self, request: Request) -> Response:
         request_serializer = LookupRequestSerializer(data=request.data)
         request_serializer.is_valid(raise_exception=True)
@@ -94,33 +185,122 @@ class ReturnsViewSet(viewsets.ViewSet):
                 kwargs={"pk": order.order_number},
                 request=request,
             ),
+            "token": issue_lookup_token(order.order_number),
         }
         response_serializer = LookupResponseSerializer(payload)
         return Response(response_serializer.data, status=status.HTTP_200_OK)
 
-    @action(detail=True, methods=["get"], url_path="articles")
-    def articles(self, request: Request, pk: str | None = None) -> Response:
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="articles",
+        authentication_classes=[
+            LookupTokenAuthentication,
+            *api_settings.DEFAULT_AUTHENTICATION_CLASSES,
+        ],
+        renderer_classes=[ArticlesJSONRenderer, *api_settings.DEFAULT_RENDERER_CLASSES],
+    )
+    def articles(
+        self, request: Request, pk: str | None = None
+    ) -> Response | HttpResponseBase:
         order_number = pk or ""
-        if not request.session.get("order_number"):
+        if request.auth != order_number and not request.session.get("order_number"):
             return Response(
                 {"detail": "Order lookup is required before viewing articles."},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        order = get_order(order_number)
-        if order is None:
+        record = get_order_record(order_number)
+        if record is None:
             return Response(
                 {"detail": "Order not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        results = evaluate_eligibility(order)
+        tracer = self._tracer(request)
+        if tracer is not None:
+            order = order_from_record(record)
+            evaluation = evaluate_order(order, tracer=tracer)
+            data = self._articles_data(order, evaluation.results)
+            data["trace"] = self._serialize_trace(tracer)
+            return Response(data, status=status.HTTP_200_OK)
+
+        # The JSON and browsable API renderings get different ETags.
+        variant = request.accepted_renderer.format
+        now = datetime.now()
+        response = cached_not_modified(request, record, variant, now=now)
+        if response is not None:
+            return response
+        order = order_from_record(record)
+        evaluation = evaluate_cached(order, record.version, now=now)
+        response = not_modified(request, record, evaluation, variant, now=now)
+        if response is None:
+            # The data of ArticlesResponseSerializer, built without it.
+            response = Response(
+                articles_payload(order, evaluation.results), status=status.HTTP_200_OK
+            )
+        return add_validators(response, record, evaluation, variant, now=now)
+
+    def _articles_data(
+        self, order: Order, results: Sequence[ArticleEligibility]
+    ) -> dict[str, Any]:
         payload = {
             "order": self._serialize_order(order),
-            "results": [self._serialize_result(result) for result in results],
+            "results": self._serialize_results(results),
+        }
+        data: dict[str, Any] = ArticlesResponseSerializer(payload).data
+        return data
+
+    def _tracer(self, request: Request) -> EligibilityTracer | None:
+        """Trace the evaluation for ``?debug=trace`` (DEBUG or staff only)."""
+        if request.query_params.get("debug") != "trace":
+            return None
+        if not (settings.DEBUG or request.user.is_staff):
+            return None
+        return EligibilityTracer()
+
+    def _serialize_trace(self, tracer: EligibilityTracer) -> dict[str, Any]:
+        return {
+            "articles": [asdict(article) for article in tracer.articles],
+            "rule_stats": [asdict(counter) for counter in rule_stats.snapshot()],
         }
 
-        response_serializer = ArticlesResponseSerializer(payload)
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-eligibility",
+        permission_classes=[IsAdminUser],
+    )
+    def bulk_eligibility(self, request: Request) -> Response:
+        """Eligibility for many orders in one round trip, for support tooling."""
+        request_serializer = BulkEligibilityRequestSerializer(data=request.data)
+        request_serializer.is_valid(raise_exception=True)
+
+        order_numbers = list(
+            dict.fromkeys(request_serializer.validated_data["order_numbers"])
+        )
+        orders = get_orders(order_numbers)
+        # One ruleset and one "now" for the whole batch, even mid-reload.
+        ruleset = get_ruleset()
+        now = datetime.now()
+
+        entries = []
+        for order_number in order_numbers:
+            order = orders.get(order_number)
+            results = (
+                evaluate_eligibility(order, now=now, ruleset=ruleset)
+                if order is not None
+                else []
+            )
+            entries.append(
+                {
+                    "order_number": order_number,
+                    "found": order is not None,
+                    "results": self._serialize_results(results),
+                }
+            )
+
+        response_serializer = BulkEligibilityResponseSerializer({"orders": entries})
         return Response(response_serializer.data, status=status.HTTP_200_OK)
 
     def _serialize_order(self, order: Order) -> dict[str, Any]:
@@ -135,17 +315,10 @@ class ReturnsViewSet(viewsets.ViewSet):
             "delivery_date": order.delivery_date,
         }
 
-    def _serialize_result(self, result: ArticleEligibility) -> dict[str, Any]:
-        remaining_qty = max(result.article.quantity - result.article.quantity_returned, 0)
-        return {
-            "article": self._serialize_article(result.article),
-            "returnable": result.returnable,
-            "reason": result.reason,
-            "matched_rule": result.matched_rule,
-            "remaining_qty": remaining_qty,
-            "quantity_options": list(range(1, remaining_qty + 1)),
-            "selectable": result.returnable and remaining_qty > 0,
-        }
+    def _serialize_results(
+        self, results: Sequence[ArticleEligibility]
+    ) -> list[EntryPayload]:
+        return result_entries(results)
 
-    def _serialize_article(self, article: Article) -> dict[str, Any]:
-        return asdict(article)
+    def _serialize_result(self, result: ArticleEligibility) -> EntryPayload:
+        return result_entry(result)
@@ -0,0 +1 @@
+"""Standalone performance benchmarks; run the modules with ``python -m``."""
@@ -0,0 +1,287 @@
+"""Microbenchmarks of the request path, over parametrised dataset sizes.
+
+Covers the order store lookup, the mapper (one order at a time, batched
+and on a process pool),
+:func:`~portal.services.eligibility.evaluate_eligibility` and the articles
+response (the DRF serializers and the fast path), for every combination of
+``--orders`` and ``--articles`` (per order) over a
+:func:`~portal.services.order_generator.generate_orders` corpus.  Each
+benchmark reports operations (orders) per second, plus the blocks and bytes
+still live at the end of a pass, its output included, and its peak traced
+memory, and the results can be written as JSON and compared::
+
+    python -m portal.benchmarks.suite --orders 10 10000 --articles 1 50 5000 \\
+        --output before.json
+    python -m portal.benchmarks.suite --compare before.json after.json
+
+Combinations above ``--max-lines`` articles in total are skipped, so that
+e.g. ``--orders 1000000 --articles 1`` can run without its 5000-article
+counterpart.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "returns_portal.settings")
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from portal.api import ReturnsViewSet  # noqa: E402
+from portal.payloads import articles_json  # noqa: E402
+from portal.services.eligibility import evaluate_eligibility  # noqa: E402
+from portal.services.mapper import map_order, map_orders  # noqa: E402
+from portal.services.order_generator import generate_orders  # noqa: E402
+from portal.services.order_store import JsonOrderStore  # noqa: E402
+from portal.services.rules import get_ruleset  # noqa: E402
+
+# A fixed evaluation time keeps eligibility, and so the work done, stable.
+_NOW = datetime(2025, 12, 20, 12, 0)
+
+_WORKERS = min(4, os.cpu_count() or 1)
+
+_Corpus = list[dict[str, Any]]
+
+
+def build_corpus(orders: int, articles: int) -> _Corpus:
+    """*orders* generated raw orders of *articles* lines each."""
+    return list(generate_orders(orders, articles=articles, prefix="BENCH"))
+
+
+def _find_order(corpus: _Corpus, workdir: Path) -> Callable[[], object]:
+    path = workdir / f"orders-{len(corpus)}.json"
+    with path.open("w") as f:
+        json.dump({"orders": corpus}, f)
+    store = JsonOrderStore(path, check_interval=3600)
+    store.get("")  # index the file outside of the measurement
+    keys = [(raw["order_number"], raw["email"]) for raw in corpus]
+    return lambda: [store.find(number, email) for number, email in keys]
+
+
+def _map_order(corpus: _Corpus, workdir: Path) -> Callable[[], object]:
+    return lambda: [map_order(raw) for raw in corpus]
+
+
+def _map_orders(corpus: _Corpus, workdir: Path) -> Callable[[], object]:
+    return lambda: list(map_orders(corpus))
+
+
+def _map_orders_pool(corpus: _Corpus, workdir: Path) -> Callable[[], object]:
+    return lambda: list(map_orders(corpus, workers=_WORKERS))
+
+
+def _evaluate_eligibility(corpus: _Corpus, workdir: Path) -> Callable[[], object]:
+    orders = [map_order(raw) for raw in corpus]
+    ruleset = get_ruleset()
+    return lambda: [
+        evaluate_eligibility(order, now=_NOW, ruleset=ruleset) for order in orders
+    ]
+
+
+def _serialize_results(corpus: _Corpus, workdir: Path) -> Callable[[], object]:
+    results = [evaluate_eligibility(map_order(raw), now=_NOW) for raw in corpus]
+    viewset = ReturnsViewSet()
+    return lambda: [viewset._serialize_results(r) for r in results]
+
+
+def _articles_json(corpus: _Corpus, workdir: Path) -> Callable[[], object]:
+    orders = [map_order(raw) for raw in corpus]
+    pairs = [(order, evaluate_eligibility(order, now=_NOW)) for order in orders]
+    return lambda: [articles_json(order, results) for order, results in pairs]
+
+
+def _drf_articles_json(corpus: _Corpus, workdir: Path) -> Callable[[], object]:
+    orders = [map_order(raw) for raw in corpus]
+    pairs = [(order, evaluate_eligibility(order, now=_NOW)) for order in orders]
+    viewset = ReturnsViewSet()
+    renderer = JSONRenderer()
+    return lambda: [
+        renderer.render(viewset._articles_data(order, results))
+        for order, results in pairs
+    ]
+
+
+# name -> setup(corpus, workdir) returning one pass over the corpus
+BENCHMARKS: dict[str, Callable[[_Corpus, Path], Callable[[], object]]] = {
+    "find_order": _find_order,
+    "map_order": _map_order,
+    "map_orders": _map_orders,
+    "map_orders_pool": _map_orders_pool,
+    "evaluate_eligibility": _evaluate_eligibility,
+    "serialize_results": _serialize_results,
+    "articles_json": _articles_json,
+    "drf_articles_json": _drf_articles_json,
+}
+
+
+@dataclass(frozen=True)
+class Result:
+    benchmark: str
+    orders: int
+    articles: int
+    ops_per_second: float
+    passes: int
+    live_blocks: int
+    live_bytes: int
+    peak_bytes: int
+
+    @property
+    def key(self) -> tuple[str, int, int]:
+        return (self.benchmark, self.orders, self.articles)
+
+
+def _time(run: Callable[[], object], ops: int, min_time: float) -> tuple[float, int]:
+    gc.collect()
+    passes = 0
+    start = time.perf_counter()
+    while True:
+        run()
+        passes += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return ops * passes / elapsed, passes
+
+
+def _memory(run: Callable[[], object]) -> tuple[int, int, int]:
+    """Blocks and bytes live at the end of one pass, and its peak bytes.
+
+    The pass's output is still referenced, so it is counted as live.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        output = run()
+        live, peak = tracemalloc.get_traced_memory()
+        blocks = sum(
+            stat.count for stat in tracemalloc.take_snapshot().statistics("filename")
+        )
+    finally:
+        tracemalloc.stop()
+    del output
+    return blocks, live, peak
+
+
+def run_suite(
+    benchmarks: Sequence[str],
+    orders: Sequence[int],
+    articles: Sequence[int],
+    *,
+    max_lines: int,
+    min_time: float,
+    on_result: Callable[[Result], None] | None = None,
+) -> list[Result]:
+    results: list[Result] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_orders, n_articles in itertools.product(orders, articles):
+            if n_orders * n_articles > max_lines:
+                continue
+            corpus = build_corpus(n_orders, n_articles)
+            for name in benchmarks:
+                run = BENCHMARKS[name](corpus, Path(tmp))
+                ops_per_second, passes = _time(run, n_orders, min_time)
+                blocks, live, peak = _memory(run)
+                result = Result(
+                    benchmark=name,
+                    orders=n_orders,
+                    articles=n_articles,
+                    ops_per_second=ops_per_second,
+                    passes=passes,
+                    live_blocks=blocks,
+                    live_bytes=live,
+                    peak_bytes=peak,
+                )
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+            del corpus
+    return results
+
+
+def _print_result(result: Result) -> None:
+    print(
+        f"{result.benchmark:<22} {result.orders:>9,} x {result.articles:>5,}"
+        f" {result.ops_per_second:>14,.1f} ops/s"
+        f" {result.live_blocks:>11,} blocks"
+        f" {result.live_bytes / 2**20:>9.1f} MiB live"
+        f" {result.peak_bytes / 2**20:>9.1f} MiB peak"
+    )
+
+
+def _load(path: Path) -> dict[tuple[str, int, int], Result]:
+    data = json.loads(path.read_text())
+    results = [Result(**entry) for entry in data["results"]]
+    return {result.key: result for result in results}
+
+
+def compare(base_path: Path, new_path: Path) -> None:
+    """Print the change of every benchmark present in both result files."""
+    base = _load(base_path)
+    new = _load(new_path)
+    print(f"{'benchmark':<22} {'orders':>9}   {'lines':>5} {'ops/s':>9} {'peak':>9}")
+    for key in sorted(base.keys() & new.keys()):
+        before, after = base[key], new[key]
+        speed = after.ops_per_second / before.ops_per_second - 1
+        peak = after.peak_bytes / before.peak_bytes - 1 if before.peak_bytes else 0.0
+        print(f"{key[0]:<22} {key[1]:>9,} x {key[2]:>5,} {speed:>+9.1%} {peak:>+9.1%}")
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, nargs="+", default=[10, 10_000])
+    parser.add_argument("--articles", type=int, nargs="+", default=[1, 50, 5000])
+    parser.add_argument("--max-lines", type=int, default=1_000_000)
+    parser.add_argument("--min-time", type=float, default=0.5)
+    parser.add_argument(
+        "--benchmark", action="append", choices=sorted(BENCHMARKS), default=None
+    )
+    parser.add_argument("--output", type=Path, help="Write the results as JSON.")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        type=Path,
+        metavar=("BASE", "NEW"),
+        help="Compare two result files instead of running.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run_suite(
+        args.benchmark or list(BENCHMARKS),
+        args.orders,
+        args.articles,
+        max_lines=args.max_lines,
+        min_time=args.min_time,
+        on_result=_print_result,
+    )
+    if args.output is not None:
+        report = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version,
+            "platform": platform.platform(),
+            "results": [asdict(result) for result in results],
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Conditional GET for the articles page and API.
+
+An articles response only changes with the order payload, the ruleset or
+the passing of a return window, so its ETag is derived from the order
+version, the ruleset version and the evaluation's ``valid_until``.  When
+the evaluation is still cached, :func:`cached_not_modified` answers
+``If-None-Match`` with a 304 before the order is mapped or evaluated.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from portal.services.eligibility import Evaluation, cached_evaluation
+from portal.services.order_store import StoredOrder
+
+
+def articles_etag(record: StoredOrder, evaluation: Evaluation, variant: str) -> str:
+    """Strong ETag of one representation (*variant*) of an order's articles."""
+    valid_until = evaluation.valid_until
+    key = "\0".join(
+        (
+            variant,
+            record.version,
+            evaluation.ruleset_version,
+            "" if valid_until is None else valid_until.isoformat(),
+        )
+    )
+    return f'"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}"'
+
+
+def max_age(evaluation: Evaluation, now: datetime) -> int:
+    """Seconds clients may reuse the response without revalidating.
+
+    Bounded by the evaluation's expiry and by ``RETURNS_ARTICLES_MAX_AGE``,
+    as order updates cannot be predicted.
+    """
+    limit: int = getattr(settings, "RETURNS_ARTICLES_MAX_AGE", 60)
+    if evaluation.valid_until is None:
+        return limit
+    remaining = int((evaluation.valid_until - now).total_seconds())
+    return max(0, min(limit, remaining))
+
+
+def add_validators[R: HttpResponseBase](
+    response: R,
+    record: StoredOrder,
+    evaluation: Evaluation,
+    variant: str,
+    *,
+    now: datetime,
+) -> R:
+    """Set the ``ETag`` and ``Cache-Control`` headers of an articles response."""
+    response["ETag"] = articles_etag(record, evaluation, variant)
+    patch_cache_control(response, private=True, max_age=max_age(evaluation, now))
+    return response
+
+
+def not_modified(
+    request: HttpRequest,
+    record: StoredOrder,
+    evaluation: Evaluation,
+    variant: str,
+    *,
+    now: datetime,
+) -> HttpResponseBase | None:
+    """Return a 304 (or 412) if the request's preconditions say so."""
+    response = get_conditional_response(
+        request, etag=articles_etag(record, evaluation, variant)
+    )
+    if response is None:
+        return None
+    return add_validators(response, record, evaluation, variant, now=now)
+
+
+def cached_not_modified(
+    request: HttpRequest, record: StoredOrder, variant: str, *, now: datetime
+) -> HttpResponseBase | None:
+    """:func:`not_modified` from a cached evaluation, without mapping the order."""
+    if "HTTP_IF_NONE_MATCH" not in request.META:
+        return None
+    evaluation = cached_evaluation(record.order_number, record.version, now=now)
+    if evaluation is None:
+        return None
+    return not_modified(request, record, evaluation, variant, now=now)
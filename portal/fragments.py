@@ -0,0 +1,112 @@
+"""Cache of rendered article-row fragments for the HTMX partials.
+
+A rows fragment depends only on the order, the ruleset, the eligibility
+evaluation and the filter applied, so it is cached per order and filter,
+tagged with the versions and evaluation it was rendered from, and served
+until the evaluation's ``valid_until`` passes.  Entries keep only the
+evaluation's versions and validity, not its results, and the cache is
+bounded by count and by the size of the HTML it holds.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+from portal.services.eligibility import Evaluation
+
+# Filters accepted by the rows partial.
+ROW_FILTERS = frozenset({"all", "returnable"})
+
+_DEFAULT_MAX_ENTRIES = 4096
+_DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class _Entry:
+    version: str
+    evaluation: Evaluation  # without results
+    html: str
+    size: int
+
+
+class RowsCache:
+    """LRU cache of rendered rows keyed by order number and filter."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+    ) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        order_number: str,
+        order_version: str,
+        ruleset_version: str,
+        row_filter: str,
+        now: datetime,
+    ) -> tuple[Evaluation, str] | None:
+        """Return the evaluation and HTML still valid at *now*, if any.
+
+        The evaluation carries no results, only its versions and validity.
+        """
+        key = (order_number, row_filter)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if (
+                    entry.version == order_version
+                    and entry.evaluation.ruleset_version == ruleset_version
+                    and entry.evaluation.is_valid(now)
+                ):
+                    self._entries.move_to_end(key)
+                    return entry.evaluation, entry.html
+                self._discard(key)
+            return None
+
+    def put(
+        self,
+        order_number: str,
+        order_version: str,
+        row_filter: str,
+        evaluation: Evaluation,
+        html: str,
+    ) -> None:
+        """Cache *html*, rendered from *evaluation* with *row_filter*."""
+        key = (order_number, row_filter)
+        size = sys.getsizeof(html)
+        if size > self._max_bytes:
+            return
+        entry = _Entry(order_version, replace(evaluation, results=()), html, size)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while (
+                len(self._entries) > self._max_entries or self._bytes > self._max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _discard(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+rows_cache = RowsCache()
@@ -0,0 +1,31 @@
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from portal.services.order_store import DATA_PATH
+from portal.services.snapshot import build_snapshot
+
+
+class Command(BaseCommand):
+    help = "Write a memory-mappable binary snapshot of the mapped orders."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--source",
+            type=Path,
+            default=DATA_PATH,
+            help="Orders JSON file to read (default: the bundled demo data).",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            default=None,
+            help="Snapshot file to write (default: settings.RETURNS_ORDERS_SNAPSHOT).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        output = Path(options["output"] or settings.RETURNS_ORDERS_SNAPSHOT)
+        count = build_snapshot(options["source"], output)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} orders to {output}"))
@@ -0,0 +1,94 @@
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from portal.services.backfill import Progress, evaluate_all, open_writer
+from portal.services.order_store import DATA_PATH
+from portal.services.rules import get_ruleset
+
+
+class Command(BaseCommand):
+    help = "Recompute return eligibility for every order into JSONL or SQLite."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--source",
+            type=Path,
+            default=DATA_PATH,
+            help=(
+                "Orders JSON file to read, with its delta feed applied "
+                "(default: the bundled demo data)."
+            ),
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            required=True,
+            help="Results file; .sqlite3/.sqlite/.db writes SQLite, else JSONL.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes (default: one per CPU; 1 runs in-process).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Orders per work unit and per checkpoint.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue from the output's last checkpoint.",
+        )
+        parser.add_argument(
+            "--progress-interval",
+            type=float,
+            default=5.0,
+            help="Seconds between progress lines.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        interval = options["progress_interval"]
+        next_report = time.monotonic() + interval
+
+        def report(progress: Progress) -> None:
+            nonlocal next_report
+            if time.monotonic() >= next_report:
+                next_report = time.monotonic() + interval
+                self.stdout.write(self._describe(progress))
+
+        ruleset = get_ruleset()
+        writer = open_writer(options["output"])
+        try:
+            total = evaluate_all(
+                options["source"],
+                writer,
+                ruleset=ruleset,
+                workers=options["workers"],
+                chunk_size=options["chunk_size"],
+                resume=options["resume"],
+                on_progress=report,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        finally:
+            writer.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Evaluated {self._describe(total)} with ruleset {ruleset.version} "
+                f"into {options['output']}"
+            )
+        )
+
+    def _describe(self, progress: Progress) -> str:
+        return (
+            f"{progress.orders} orders ({progress.articles} articles) in "
+            f"{progress.elapsed:.1f}s, {progress.orders_per_second:.0f} orders/s"
+        )
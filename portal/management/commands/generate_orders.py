@@ -0,0 +1,49 @@
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from portal.services.order_generator import generate_orders, write_orders
+
+
+class Command(BaseCommand):
+    help = "Write a deterministic synthetic orders JSON file of any size."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--output",
+            type=Path,
+            required=True,
+            help="Orders JSON file to write.",
+        )
+        parser.add_argument(
+            "--orders",
+            type=int,
+            default=10_000,
+            help="Number of orders to generate (default: 10000).",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed; the same seed always writes the same file.",
+        )
+        parser.add_argument(
+            "--max-articles",
+            type=int,
+            default=5000,
+            help="Cap on the long-tailed article count per order (default: 5000).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        output = options["output"]
+        try:
+            orders = generate_orders(
+                options["orders"],
+                seed=options["seed"],
+                max_articles=options["max_articles"],
+            )
+            count = write_orders(orders, output)
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} orders to {output}"))
@@ -0,0 +1,49 @@
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from portal.services.order_store import DATA_PATH
+from portal.services.sqlite_store import ingest_orders
+
+
+class Command(BaseCommand):
+    help = "Load orders_raw.json into the SQLite order store."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--source",
+            type=Path,
+            default=DATA_PATH,
+            help="Orders JSON file to read (default: the bundled demo data).",
+        )
+        parser.add_argument(
+            "--database",
+            type=Path,
+            default=None,
+            help="SQLite file to write (default: settings.RETURNS_ORDERS_DB).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Orders written per transaction.",
+        )
+        parser.add_argument(
+            "--truncate",
+            action="store_true",
+            help="Delete all existing orders before ingesting.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        database = Path(options["database"] or settings.RETURNS_ORDERS_DB)
+        count = ingest_orders(
+            options["source"],
+            database,
+            batch_size=options["batch_size"],
+            truncate=options["truncate"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Ingested {count} orders into {database}")
+        )
@@ -0,0 +1,59 @@
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from portal.services.eligibility import evaluate_order
+from portal.services.eligibility_trace import EligibilityTracer, rule_stats
+from portal.services.mapper import map_order
+from portal.services.order_store import DATA_PATH
+from portal.services.order_stream import iter_raw_orders
+from portal.services.rules import get_ruleset
+
+
+class Command(BaseCommand):
+    help = (
+        "Evaluate every order with tracing on and print per-rule hit counts "
+        "and cumulative time."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--source",
+            type=Path,
+            default=DATA_PATH,
+            help="Orders JSON file to read (default: the bundled demo data).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=1,
+            help="Evaluate each order this many times for steadier timings.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the counters as JSON.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        ruleset = get_ruleset()
+        orders = [map_order(entry.raw) for entry in iter_raw_orders(options["source"])]
+        rule_stats.reset()
+        for _ in range(options["repeat"]):
+            for order in orders:
+                evaluate_order(order, ruleset=ruleset, tracer=EligibilityTracer())
+        counters = rule_stats.snapshot()
+
+        if options["json"]:
+            self.stdout.write(json.dumps([asdict(c) for c in counters], indent=2))
+            return
+        self.stdout.write(f"Ruleset {ruleset.version}, {len(orders)} orders")
+        self.stdout.write(f"{'rule':<32} {'evaluations':>11} {'hits':>8} {'µs':>10}")
+        for c in counters:
+            self.stdout.write(
+                f"{c.rule:<32} {c.evaluations:>11} {c.hits:>8} "
+                f"{c.total_ns / 1000:>10.1f}"
+            )
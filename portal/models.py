@@ -10,7 +10,7 @@ from dataclasses import dataclass
 from datetime import datetime
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LineItem:
     sku: str
     name: str
@@ -22,7 +22,7 @@ class LineItem:
     is_final_sale: bool
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ReturnRegistration:
     order_number: str
     email: str
@@ -33,7 +33,7 @@ class ReturnRegistration:
     items: list[LineItem]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class EligibilityResult:
     sku: str
     returnable: bool | None
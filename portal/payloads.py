@@ -0,0 +1,196 @@
+"""Fast encoding of the articles API response.
+
+:class:`~portal.api.ArticlesResponseSerializer` stays the documented shape
+of ``GET /api/returns/{id}/articles/``.  :func:`articles_payload` builds the
+same data as plain dicts, without going field by field through nested DRF
+serializers, and :class:`ArticlesJSONRenderer` encodes it in one pass with a
+pydantic :class:`~pydantic.TypeAdapter`.
+
+The JSON is equivalent to what DRF's :class:`JSONRenderer` writes, not
+byte-for-byte identical: floats in exponent notation are spelled the
+shortest way (``1e-7`` rather than ``1e-07``).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Any, TypedDict, cast
+
+from pydantic import TypeAdapter
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from portal.types import (
+    DIGITAL,
+    FINAL_SALE,
+    ArticleEligibility,
+    EligibilityTable,
+    Order,
+)
+
+# Datetimes are rendered by DRF itself so time zones and the "Z" suffix come
+# out exactly as ``serializers.DateTimeField`` has them.
+_datetime_field = serializers.DateTimeField()
+
+
+class _ArticlePayload(TypedDict):
+    sku: str
+    name: str
+    quantity: int
+    quantity_returned: int
+    price: float
+    is_digital: bool
+    is_final_sale: bool
+    category: str
+
+
+class EntryPayload(TypedDict):
+    article: _ArticlePayload
+    returnable: bool
+    reason: str
+    matched_rule: str
+    remaining_qty: int
+    quantity_options: list[int]
+    selectable: bool
+
+
+class _OrderPayload(TypedDict):
+    order_number: str
+    email: str
+    recipient: str
+    zip: str
+    street: str
+    city: str
+    order_date: str
+    delivery_date: str
+
+
+class _ArticlesPayload(TypedDict):
+    order: _OrderPayload
+    results: list[EntryPayload]
+
+
+class ArticlesPayload(dict[str, Any]):
+    """Articles response data that :class:`ArticlesJSONRenderer` encodes fast."""
+
+
+_articles_adapter = TypeAdapter(_ArticlesPayload)
+
+
+def articles_payload(
+    order: Order, results: Sequence[ArticleEligibility]
+) -> ArticlesPayload:
+    """Build the articles response for *order* and its eligibility *results*.
+
+    Equal to the data of :class:`~portal.api.ArticlesResponseSerializer`.
+    """
+    return ArticlesPayload(
+        order={
+            "order_number": order.order_number,
+            "email": order.email,
+            "recipient": order.recipient,
+            "zip": order.zip,
+            "street": order.street,
+            "city": order.city,
+            "order_date": _datetime_field.to_representation(order.order_date),
+            "delivery_date": _datetime_field.to_representation(order.delivery_date),
+        },
+        results=result_entries(results),
+    )
+
+
+def articles_json(order: Order, results: Sequence[ArticleEligibility]) -> bytes:
+    """Encode the articles response for *order* and its eligibility *results*."""
+    return _encode(articles_payload(order, results))
+
+
+def result_entries(results: Sequence[ArticleEligibility]) -> list[EntryPayload]:
+    """Return the response entry of every eligibility result."""
+    if isinstance(results, EligibilityTable):
+        return _table_entries(results)
+    return [result_entry(result) for result in results]
+
+
+def result_entry(result: ArticleEligibility) -> EntryPayload:
+    article = result.article
+    return _entry(
+        {
+            "sku": article.sku,
+            "name": article.name,
+            "quantity": article.quantity,
+            "quantity_returned": article.quantity_returned,
+            "price": article.price,
+            "is_digital": article.is_digital,
+            "is_final_sale": article.is_final_sale,
+            "category": article.category,
+        },
+        result.returnable,
+        result.reason,
+        result.matched_rule,
+    )
+
+
+def _entry(
+    article: _ArticlePayload, returnable: bool, reason: str, matched_rule: str
+) -> EntryPayload:
+    remaining_qty = max(article["quantity"] - article["quantity_returned"], 0)
+    return {
+        "article": article,
+        "returnable": returnable,
+        "reason": reason,
+        "matched_rule": matched_rule,
+        "remaining_qty": remaining_qty,
+        "quantity_options": list(range(1, remaining_qty + 1)),
+        "selectable": returnable and remaining_qty > 0,
+    }
+
+
+def _table_entries(results: EligibilityTable) -> list[EntryPayload]:
+    # Read the columns directly instead of building per-line objects.
+    articles = results.articles
+    entries: list[EntryPayload] = []
+    for i in range(len(results)):
+        flags = articles.flags[i]
+        entries.append(
+            _entry(
+                {
+                    "sku": articles.sku[i],
+                    "name": articles.name[i],
+                    "quantity": articles.quantity[i],
+                    "quantity_returned": articles.quantity_returned[i],
+                    "price": articles.price[i],
+                    "is_digital": bool(flags & DIGITAL),
+                    "is_final_sale": bool(flags & FINAL_SALE),
+                    "category": articles.category[i],
+                },
+                bool(results.returnable[i]),
+                results.reason[i],
+                results.matched_rule[i],
+            )
+        )
+    return entries
+
+
+def _encode(payload: ArticlesPayload) -> bytes:
+    encoded = _articles_adapter.dump_json(cast(_ArticlesPayload, payload))
+    # Like JSONRenderer, escape the separators JavaScript strings cannot hold.
+    return encoded.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+        b"\xe2\x80\xa9", b"\\u2029"
+    )
+
+
+class ArticlesJSONRenderer(JSONRenderer):  # type: ignore[misc]
+    """:class:`JSONRenderer` with a one-pass path for :class:`ArticlesPayload`."""
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: str | None = None,
+        renderer_context: Mapping[str, Any] | None = None,
+    ) -> bytes:
+        if isinstance(data, ArticlesPayload) and not self.get_indent(
+            accepted_media_type or "", renderer_context or {}
+        ):
+            return _encode(data)
+        rendered: bytes = super().render(data, accepted_media_type, renderer_context)
+        return rendered
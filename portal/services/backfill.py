@@ -0,0 +1,355 @@
+"""Recompute eligibility for every order, e.g. after a ruleset change.
+
+Orders are streamed from the orders JSON file with its delta feed applied,
+as the order store serves them, mapped and evaluated in chunks on a process
+pool, and written in input order to a JSONL or SQLite output.  Orders that
+only exist in the feed follow those of the file.  After each chunk the
+output records a checkpoint (orders done, ruleset version, evaluation time
+and how much of the feed was read), so an interrupted run can resume where
+it stopped with the same orders, the same rules and the same "now".
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import sqlite3
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Protocol
+
+from portal.services.eligibility import evaluate_eligibility
+from portal.services.mapper import map_orders
+from portal.services.order_delta import (
+    OrderDelta,
+    apply_delta,
+    delta_path_for,
+    delta_version,
+    read_deltas,
+)
+from portal.services.order_stream import iter_raw_orders
+from portal.services.pool import imap_bounded
+from portal.services.rules import Ruleset
+
+# order_number, order_version, line, sku, returnable, matched_rule, reason
+ResultRow = tuple[str, str, int, str, bool, str, str]
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """Progress of a run: the first *orders* source entries are written.
+
+    *delta_offset* is the end of the delta feed the run applies.
+    """
+
+    orders: int
+    ruleset_version: str
+    now: datetime
+    delta_offset: int = 0
+
+
+@dataclass(frozen=True)
+class Progress:
+    orders: int
+    articles: int
+    elapsed: float
+
+    @property
+    def orders_per_second(self) -> float:
+        return self.orders / self.elapsed if self.elapsed else 0.0
+
+
+class ResultWriter(Protocol):
+    def checkpoint(self) -> Checkpoint | None:
+        """Return the last committed checkpoint, if any."""
+        ...
+
+    def start(self, checkpoint: Checkpoint, *, resume: bool) -> None:
+        """Prepare for writing; discard any partial output unless resuming."""
+        ...
+
+    def write(self, rows: list[ResultRow], checkpoint: Checkpoint) -> None:
+        """Durably append *rows* and record *checkpoint* with them."""
+        ...
+
+    def close(self) -> None: ...
+
+
+class JsonlResultWriter:
+    """One JSON object per article; the checkpoint lives next to the file."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._checkpoint_path = path.with_name(f"{path.name}.checkpoint")
+        self._file: BinaryIO | None = None
+
+    def checkpoint(self) -> Checkpoint | None:
+        state = self._read_state()
+        if state is None:
+            return None
+        return Checkpoint(
+            orders=state["orders"],
+            ruleset_version=state["ruleset_version"],
+            now=datetime.fromisoformat(state["now"]),
+            delta_offset=state.get("delta_offset", 0),
+        )
+
+    def start(self, checkpoint: Checkpoint, *, resume: bool) -> None:
+        state = self._read_state() if resume else None
+        self._file = self._path.open("ab" if state else "wb")
+        # Drop whatever was written after the last checkpoint.
+        self._file.truncate(state["offset"] if state else 0)
+        if not state:
+            self._checkpoint_path.unlink(missing_ok=True)
+
+    def write(self, rows: list[ResultRow], checkpoint: Checkpoint) -> None:
+        if self._file is None:
+            raise RuntimeError("start() must be called before write()")
+        for number, version, line, sku, returnable, rule, reason in rows:
+            record = {
+                "order_number": number,
+                "order_version": version,
+                "line": line,
+                "sku": sku,
+                "returnable": returnable,
+                "matched_rule": rule,
+                "reason": reason,
+                "ruleset_version": checkpoint.ruleset_version,
+            }
+            self._file.write(json.dumps(record).encode() + b"\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        state = {
+            "orders": checkpoint.orders,
+            "offset": self._file.tell(),
+            "ruleset_version": checkpoint.ruleset_version,
+            "now": checkpoint.now.isoformat(),
+            "delta_offset": checkpoint.delta_offset,
+        }
+        tmp_path = self._checkpoint_path.with_name(f"{self._checkpoint_path.name}.tmp")
+        tmp_path.write_text(json.dumps(state))
+        os.replace(tmp_path, self._checkpoint_path)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+    def _read_state(self) -> dict[str, Any] | None:
+        try:
+            state: dict[str, Any] = json.loads(self._checkpoint_path.read_text())
+        except FileNotFoundError:
+            return None
+        return state
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS eligibility (
+    order_number TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    order_version TEXT NOT NULL,
+    sku TEXT NOT NULL,
+    returnable INTEGER NOT NULL,
+    matched_rule TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    ruleset_version TEXT NOT NULL,
+    PRIMARY KEY (order_number, line)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS eligibility_checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    orders INTEGER NOT NULL,
+    ruleset_version TEXT NOT NULL,
+    now TEXT NOT NULL,
+    delta_offset INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class SqliteResultWriter:
+    """Rows and checkpoint are committed in the same transaction."""
+
+    def __init__(self, path: Path) -> None:
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SQLITE_SCHEMA)
+
+    def checkpoint(self) -> Checkpoint | None:
+        row = self._conn.execute(
+            "SELECT orders, ruleset_version, now, delta_offset"
+            " FROM eligibility_checkpoint"
+        ).fetchone()
+        if row is None:
+            return None
+        return Checkpoint(row[0], row[1], datetime.fromisoformat(row[2]), row[3])
+
+    def start(self, checkpoint: Checkpoint, *, resume: bool) -> None:
+        if not resume:
+            with self._conn:
+                self._conn.execute("DELETE FROM eligibility")
+                self._conn.execute("DELETE FROM eligibility_checkpoint")
+
+    def write(self, rows: list[ResultRow], checkpoint: Checkpoint) -> None:
+        ruleset = checkpoint.ruleset_version
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO eligibility VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (number, line, version, sku, returnable, rule, reason, ruleset)
+                    for number, version, line, sku, returnable, rule, reason in rows
+                ],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO eligibility_checkpoint VALUES (0, ?, ?, ?, ?)",
+                (
+                    checkpoint.orders,
+                    checkpoint.ruleset_version,
+                    checkpoint.now.isoformat(),
+                    checkpoint.delta_offset,
+                ),
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_writer(path: Path) -> ResultWriter:
+    """Pick the writer for *path*: SQLite for ``.sqlite3`` / ``.db``."""
+    if path.suffix in {".sqlite", ".sqlite3", ".db"}:
+        return SqliteResultWriter(path)
+    return JsonlResultWriter(path)
+
+
+_SourceEntry = tuple[str, dict[str, Any]] | None
+
+# The ruleset and evaluation time of this process's run, set once per worker.
+_run: tuple[Ruleset, datetime] | None = None
+
+
+def _start_run(ruleset: Ruleset, now: datetime) -> None:
+    global _run
+    _run = (ruleset, now)
+
+
+def _evaluate_chunk(chunk: tuple[_SourceEntry, ...]) -> tuple[int, list[ResultRow]]:
+    """Evaluate the served orders of *chunk*; return its size and the rows."""
+    if _run is None:
+        raise RuntimeError("_start_run() must be called before evaluating")
+    ruleset, now = _run
+    entries = [entry for entry in chunk if entry is not None]
+    orders = map_orders((raw for _, raw in entries), chunk_size=len(entries) or 1)
+    rows: list[ResultRow] = []
+    for (version, _), order in zip(entries, orders, strict=True):
+        results = evaluate_eligibility(order, now=now, ruleset=ruleset)
+        rows.extend(
+            (
+                order.order_number,
+                version,
+                line,
+                result.article.sku,
+                result.returnable,
+                result.matched_rule,
+                result.reason,
+            )
+            for line, result in enumerate(results)
+        )
+    return len(chunk), rows
+
+
+def _patched(
+    version: str, raw: dict[str, Any] | None, deltas: Iterable[OrderDelta]
+) -> tuple[str, dict[str, Any]] | None:
+    for delta in deltas:
+        patched = apply_delta(raw, delta)
+        if patched is not None:
+            version, raw = delta_version(version, delta), patched
+    return None if raw is None else (version, raw)
+
+
+def _orders(source: Path, deltas: list[OrderDelta]) -> Iterator[_SourceEntry]:
+    # Entries that are not served (no order number, or a repeated one) are
+    # yielded as None so that every source entry counts towards the
+    # checkpoint.  Versions match those of the order store.
+    pending: dict[str, list[OrderDelta]] = {}
+    for delta in deltas:
+        pending.setdefault(delta.order_number, []).append(delta)
+    seen: set[str] = set()
+    for entry in iter_raw_orders(source):
+        order_number = entry.raw.get("order_number")
+        if not isinstance(order_number, str) or order_number in seen:
+            yield None
+            continue
+        seen.add(order_number)
+        yield _patched(entry.span.digest, entry.raw, pending.pop(order_number, ()))
+    for order_deltas in pending.values():
+        yield _patched("", None, order_deltas)
+
+
+def evaluate_all(
+    source: Path,
+    writer: ResultWriter,
+    *,
+    ruleset: Ruleset,
+    now: datetime | None = None,
+    workers: int = 1,
+    chunk_size: int = 1000,
+    resume: bool = False,
+    delta_path: Path | None = None,
+    on_progress: Callable[[Progress], None] | None = None,
+) -> Progress:
+    """Evaluate every order in *source* and write the results to *writer*.
+
+    Updates in the delta feed at *delta_path* (by default the one next to
+    *source*) are applied first.  With *resume*, orders before the writer's
+    checkpoint are skipped and the checkpoint's evaluation time and feed
+    position are reused; the checkpoint must have been written with the
+    same *ruleset*.  Returns the totals of this run.
+    """
+    previous = writer.checkpoint() if resume else None
+    if previous is not None and previous.ruleset_version != ruleset.version:
+        raise ValueError(
+            f"checkpoint was written with ruleset {previous.ruleset_version}, "
+            f"the active ruleset is {ruleset.version}; rerun without resuming"
+        )
+    if previous is not None:
+        now = previous.now
+    elif now is None:
+        now = datetime.now()
+    done = previous.orders if previous is not None else 0
+    # Feed lines appended during or after the run wait for the next run.
+    deltas, delta_offset = read_deltas(
+        delta_path or delta_path_for(source),
+        end=previous.delta_offset if previous is not None else None,
+    )
+    writer.start(
+        Checkpoint(done, ruleset.version, now, delta_offset),
+        resume=previous is not None,
+    )
+
+    started = time.monotonic()
+    orders = articles = 0
+
+    def commit(size: int, rows: list[ResultRow]) -> None:
+        nonlocal orders, articles
+        orders += size
+        articles += len(rows)
+        writer.write(
+            rows, Checkpoint(done + orders, ruleset.version, now, delta_offset)
+        )
+        if on_progress is not None:
+            on_progress(Progress(orders, articles, time.monotonic() - started))
+
+    entries = itertools.islice(_orders(source, deltas), done, None)
+    chunks = itertools.batched(entries, chunk_size)
+    for size, rows in imap_bounded(
+        _evaluate_chunk,
+        chunks,
+        workers=workers,
+        initializer=_start_run,
+        initargs=(ruleset, now),
+    ):
+        commit(size, rows)
+    return Progress(orders, articles, time.monotonic() - started)
@@ -2,21 +2,248 @@
 
 from __future__ import annotations
 
-from portal.types import ArticleEligibility, Order
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, NamedTuple
 
+from portal.services.eligibility_cache import EligibilityCache
+from portal.services.rules import (
+    FULLY_RETURNED,
+    Plan,
+    Rule,
+    Ruleset,
+    get_ruleset,
+)
+from portal.types import (
+    DIGITAL,
+    FINAL_SALE,
+    Article,
+    ArticleEligibility,
+    ArticleTable,
+    EligibilityTable,
+    Order,
+)
 
-def evaluate_eligibility(order: Order) -> list[ArticleEligibility]:
+if TYPE_CHECKING:
+    from portal.services.eligibility_trace import EligibilityTracer
+
+
+@dataclass(frozen=True, slots=True)
+class Evaluation:
+    """Eligibility of one order under one ruleset, and how long it holds.
+
+    ``valid_until`` is the last instant at which every result is still
+    correct, i.e. the earliest end of a return window that is open at
+    evaluation time, or ``None`` if the results can no longer change.
+    """
+
+    results: Sequence[ArticleEligibility]
+    ruleset_version: str
+    valid_until: datetime | None
+
+    def is_valid(self, now: datetime) -> bool:
+        return self.valid_until is None or now <= self.valid_until
+
+
+_cache = EligibilityCache()
+
+
+def evaluate_eligibility(
+    order: Order,
+    *,
+    now: datetime | None = None,
+    ruleset: Ruleset | None = None,
+) -> Sequence[ArticleEligibility]:
     """Evaluate return eligibility for every article in *order*.
 
+    Articles are checked against *ruleset* (the configured rules by default)
+    as of *now* (the current time by default).
+
     Returns:
         A list of :class:`ArticleEligibility`, one per article in the order.
+        Orders whose articles are an :class:`ArticleTable` get an
+        :class:`EligibilityTable` instead, evaluated column by column.
+    """
+    return evaluate_order(order, now=now, ruleset=ruleset).results
+
+
+def evaluate_order(
+    order: Order,
+    *,
+    now: datetime | None = None,
+    ruleset: Ruleset | None = None,
+    tracer: EligibilityTracer | None = None,
+) -> Evaluation:
+    """Like :func:`evaluate_eligibility`, but also report how long it holds.
+
+    With a *tracer*, the plan lookup and every rule check per article are
+    timed and recorded on it (see :mod:`portal.services.eligibility_trace`).
     """
-    return [
-        ArticleEligibility(
-            article=article,
-            returnable=True,
-            reason="",
-            matched_rule="",
+    if now is None:
+        now = datetime.now()
+    if ruleset is None:
+        ruleset = get_ruleset()
+    lookup: PlanLookup = ruleset.plan
+    checks = RULE_CHECKS
+    if tracer is not None:
+        lookup, checks = tracer.instrument(lookup, checks)
+    results: Sequence[ArticleEligibility]
+    if isinstance(order.articles, ArticleTable):
+        results, open_window = _evaluate_table(
+            order, order.articles, lookup, checks, now
         )
-        for article in order.articles
-    ]
+    else:
+        rows = []
+        open_window = None
+        for article in order.articles:
+            plan = _plan_for(lookup, article)
+            rejection, open_window = _decide(plan, order, now, open_window, checks)
+            rows.append(_result(article, rejection))
+        results = rows
+    return Evaluation(
+        results=results,
+        ruleset_version=ruleset.version,
+        valid_until=None if open_window is None else order.delivery_date + open_window,
+    )
+
+
+def cached_evaluation(
+    order_number: str, order_version: str, *, now: datetime | None = None
+) -> Evaluation | None:
+    """Return the cached evaluation of an order version, if still valid.
+
+    Only needs the order's number and version, so callers can check for a
+    cached result before mapping the order at all.
+    """
+    if now is None:
+        now = datetime.now()
+    return _cache.get(order_number, order_version, get_ruleset().version, now)
+
+
+def evaluate_cached(
+    order: Order, order_version: str, *, now: datetime | None = None
+) -> Evaluation:
+    """:func:`evaluate_order` with the active ruleset, cached per version.
+
+    Results are reused for the same (order version, ruleset version) until
+    their ``valid_until`` passes.
+    """
+    if now is None:
+        now = datetime.now()
+    ruleset = get_ruleset()
+    evaluation = _cache.get(order.order_number, order_version, ruleset.version, now)
+    if evaluation is None:
+        evaluation = evaluate_order(order, now=now, ruleset=ruleset)
+        _cache.put(order.order_number, order_version, evaluation)
+    return evaluation
+
+
+PlanLookup = Callable[[str, int], Plan]
+# (plan, order, now, open window) -> (rule consulted, rejected, open window)
+RuleCheck = Callable[
+    [Plan, Order, datetime, timedelta | None],
+    tuple[Rule | None, bool, timedelta | None],
+]
+
+
+def _plan_for(lookup: PlanLookup, article: Article) -> Plan:
+    flags = (
+        (DIGITAL if article.is_digital else 0)
+        | (FINAL_SALE if article.is_final_sale else 0)
+        | (FULLY_RETURNED if article.quantity <= article.quantity_returned else 0)
+    )
+    return lookup(article.category, flags)
+
+
+def _check_window(
+    plan: Plan, order: Order, now: datetime, open_window: timedelta | None
+) -> tuple[Rule | None, bool, timedelta | None]:
+    """Reject an article whose return window has ended.
+
+    Otherwise fold its window into *open_window*, the shortest return window
+    that is still open for the order.
+    """
+    window = plan.window
+    length = plan.window_length
+    if window is None or length is None:
+        return None, False, open_window
+    if now > order.delivery_date + length:
+        return window, True, open_window
+    if open_window is None or length < open_window:
+        open_window = length
+    return window, False, open_window
+
+
+def _check_deny(
+    plan: Plan, order: Order, now: datetime, open_window: timedelta | None
+) -> tuple[Rule | None, bool, timedelta | None]:
+    """Reject the article unconditionally if its plan has a deny rule."""
+    deny = plan.deny
+    return deny, deny is not None, open_window
+
+
+class RuleChecks(NamedTuple):
+    """The checks of a plan, in the order the engine applies them."""
+
+    window: RuleCheck
+    deny: RuleCheck
+
+
+RULE_CHECKS = RuleChecks(_check_window, _check_deny)
+
+
+def _decide(
+    plan: Plan,
+    order: Order,
+    now: datetime,
+    open_window: timedelta | None,
+    checks: RuleChecks,
+) -> tuple[tuple[str, str] | None, timedelta | None]:
+    """Return the ``(rule id, reason)`` rejecting an article, if any.
+
+    Also returns *open_window* updated with the article's window.
+    """
+    check_window, check_deny = checks
+    rule, rejected, open_window = check_window(plan, order, now, open_window)
+    if not rejected:
+        rule, rejected, open_window = check_deny(plan, order, now, open_window)
+    if rejected and rule is not None:
+        return (rule.id, rule.reason), open_window
+    return None, open_window
+
+
+def _result(article: Article, rejection: tuple[str, str] | None) -> ArticleEligibility:
+    if rejection is None:
+        return ArticleEligibility(
+            article=article, returnable=True, reason="", matched_rule=""
+        )
+    rule_id, reason = rejection
+    return ArticleEligibility(
+        article=article, returnable=False, reason=reason, matched_rule=rule_id
+    )
+
+
+def _evaluate_table(
+    order: Order,
+    articles: ArticleTable,
+    lookup: PlanLookup,
+    checks: RuleChecks,
+    now: datetime,
+) -> tuple[EligibilityTable, timedelta | None]:
+    results = EligibilityTable(articles)
+    open_window = None
+    # ArticleTable flags share their bits with the plan keys (portal.types).
+    row_flags = articles.flags
+    for i in range(len(articles)):
+        flags = row_flags[i]
+        if articles.quantity[i] <= articles.quantity_returned[i]:
+            flags |= FULLY_RETURNED
+        plan = lookup(articles.category[i], flags)
+        rejection, open_window = _decide(plan, order, now, open_window, checks)
+        if rejection is None:
+            results.append_row(returnable=True, reason="", matched_rule="")
+        else:
+            rule_id, reason = rejection
+            results.append_row(returnable=False, reason=reason, matched_rule=rule_id)
+    return results, open_window
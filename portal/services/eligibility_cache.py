@@ -0,0 +1,66 @@
+"""Cache of eligibility evaluations.
+
+An order's eligibility depends only on the order, the ruleset and the
+current time, and the time only matters once a return window closes.  An
+:class:`~portal.services.eligibility.Evaluation` is therefore cached under
+the order and ruleset versions it was computed from and served until its
+``valid_until`` passes.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from portal.services.eligibility import Evaluation
+
+_DEFAULT_MAX_ENTRIES = 4096
+
+
+class EligibilityCache:
+    """LRU cache of evaluations keyed by order number.
+
+    Each entry is tagged with the order version and ruleset version it was
+    computed from; a lookup with different versions, or after the entry's
+    ``valid_until``, drops it.
+    """
+
+    def __init__(self, *, max_entries: int = _DEFAULT_MAX_ENTRIES) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, Evaluation]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, order_number: str, order_version: str, ruleset_version: str, now: datetime
+    ) -> Evaluation | None:
+        """Return the evaluation still valid at *now*, or ``None`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(order_number)
+            if entry is not None:
+                version, evaluation = entry
+                if (
+                    version == order_version
+                    and evaluation.ruleset_version == ruleset_version
+                    and evaluation.is_valid(now)
+                ):
+                    self._entries.move_to_end(order_number)
+                    return evaluation
+                del self._entries[order_number]
+            return None
+
+    def put(
+        self, order_number: str, order_version: str, evaluation: Evaluation
+    ) -> None:
+        """Cache *evaluation* for *order_number* at *order_version*."""
+        with self._lock:
+            self._entries.pop(order_number, None)
+            self._entries[order_number] = (order_version, evaluation)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
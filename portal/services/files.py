@@ -0,0 +1,17 @@
+"""Filesystem helpers shared by the file-backed services."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+
+def file_signature(path: Path) -> tuple[int, int] | None:
+    """Return the mtime and size of *path*, or ``None`` if it does not exist.
+
+    A changed signature means the file has to be read again.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import functools
+import itertools
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from datetime import datetime
-from typing import Any
+from typing import Any, TypedDict
 
-from portal.types import Article, Order
+from portal.services.pool import imap_bounded
+from portal.types import Article, ArticleTable, LazyOrder, Order
 
 
 def _parse_dt(value: str) -> datetime:
@@ -49,12 +53,68 @@ def _as_float(value: object, default: float = 0.0) -> float:
     return default
 
 
+# Upper bound on distinct timestamps memoised by one batch parser.
+_PARSE_CACHE_SIZE = 1 << 16
+
+
+def _memoized_parse_dt() -> Callable[[str], datetime]:
+    """Return a :func:`_parse_dt` that remembers strings it has seen.
+
+    Orders from one export batch share most of their timestamps, so a batch
+    mostly pays for a dict lookup instead of an ISO-8601 parse.
+    """
+    cache: dict[str, datetime] = {}
+
+    def parse(value: str) -> datetime:
+        dt = cache.get(value)
+        if dt is None:
+            if len(cache) >= _PARSE_CACHE_SIZE:
+                cache.clear()
+            dt = cache[value] = _parse_dt(value)
+        return dt
+
+    return parse
+
+
 def map_order(raw: dict[str, Any]) -> Order:
     """Map a raw order dict (from ``orders_raw.json``) to an :class:`Order`.
 
     The raw payload comes from an upstream system.  This mapper converts it
     into our internal domain representation.
     """
+    return _map_order(raw, _parse_dt)
+
+
+def map_order_lazy(raw: dict[str, Any]) -> Order:
+    """Map only the header of *raw*; articles and delivery date come later.
+
+    The returned :class:`~portal.types.LazyOrder` behaves like the result of
+    :func:`map_order`, but builds ``articles`` and ``delivery_date`` on
+    first access.  Credential lookups only need the header, so large orders
+    skip the per-article work entirely.
+    """
+    header = _map_header(raw, _parse_dt)
+    order_date = header["order_date"]
+    return LazyOrder(
+        **header,
+        load_articles=functools.partial(_map_articles, raw),
+        load_delivery_date=lambda: _map_delivery_date(raw, _parse_dt) or order_date,
+    )
+
+
+class _OrderHeader(TypedDict):
+    order_number: str
+    email: str
+    recipient: str
+    zip: str
+    street: str
+    city: str
+    order_date: datetime
+
+
+def _map_header(
+    raw: dict[str, Any], parse_dt: Callable[[str], datetime]
+) -> _OrderHeader:
     customer = _as_dict(raw.get("customer"))
 
     recipient = _as_str(raw.get("recipient"))
@@ -73,11 +133,27 @@ def map_order(raw: dict[str, Any]) -> Order:
     city = _as_str(raw.get("city")) or _as_str(customer.get("city"))
 
     order_date_raw = _as_str(raw.get("order_date"))
-    order_date = _parse_dt(order_date_raw)
+    order_date = parse_dt(order_date_raw)
+
+    return {
+        "order_number": _as_str(raw.get("order_number")),
+        "email": _as_str(raw.get("email")),
+        "recipient": recipient,
+        "zip": zip_code,
+        "street": street,
+        "city": city,
+        "order_date": order_date,
+    }
 
-    articles: list[Article] = []
 
-    for item in _as_list_of_dicts(raw.get("articles")):
+# Orders with at least this many lines keep their articles in columns.
+ARTICLE_TABLE_MIN_LINES = 256
+
+
+def _map_articles(raw: dict[str, Any]) -> Sequence[Article]:
+    items = _as_list_of_dicts(raw.get("articles"))
+    articles: list[Article] = []
+    for item in items:
         articles.append(
             Article(
                 sku=_as_str(item.get("sku")),
@@ -90,30 +166,61 @@ def map_order(raw: dict[str, Any]) -> Order:
                 category="",
             )
         )
+    if len(articles) >= ARTICLE_TABLE_MIN_LINES:
+        # The per-line objects only live until they are copied into columns.
+        return ArticleTable.from_articles(articles)
+    return articles
+
 
+def _map_delivery_date(
+    raw: dict[str, Any], parse_dt: Callable[[str], datetime]
+) -> datetime | None:
     # Derive the effective delivery date from the most recent fulfillment.
     fulfillments = _as_list_of_dicts(raw.get("fulfillments"))
     delivery_date: datetime | None = None
     for f in fulfillments:
         delivered_at = _as_str(f.get("delivered_at"))
         if delivered_at:
-            dt = _parse_dt(delivered_at)
+            dt = parse_dt(delivered_at)
             if delivery_date is None or dt > delivery_date:
                 delivery_date = dt
 
     if delivery_date is None:
         delivered_at = _as_str(raw.get("delivered_at"))
         if delivered_at:
-            delivery_date = _parse_dt(delivered_at)
+            delivery_date = parse_dt(delivered_at)
+    return delivery_date
 
+
+def _map_order(raw: dict[str, Any], parse_dt: Callable[[str], datetime]) -> Order:
+    header = _map_header(raw, parse_dt)
+    articles = _map_articles(raw)
+    delivery_date = _map_delivery_date(raw, parse_dt)
     return Order(
-        order_number=_as_str(raw.get("order_number")),
-        email=_as_str(raw.get("email")),
-        recipient=recipient,
-        zip=zip_code,
-        street=street,
-        city=city,
-        order_date=order_date,
-        delivery_date=delivery_date or order_date,
+        **header,
+        delivery_date=delivery_date or header["order_date"],
         articles=articles,
     )
+
+
+def _map_chunk(raws: tuple[dict[str, Any], ...]) -> list[Order]:
+    parse_dt = _memoized_parse_dt()
+    return [_map_order(raw, parse_dt) for raw in raws]
+
+
+def map_orders(
+    raws: Iterable[dict[str, Any]],
+    *,
+    workers: int | None = None,
+    chunk_size: int = 1000,
+) -> Iterator[Order]:
+    """Map many raw orders, yielding results in input order.
+
+    Equivalent to ``map(map_order, raws)``, but timestamp parsing is
+    memoised per chunk.  With *workers* > 1 chunks are mapped on a process
+    pool; at most two chunks per worker are in flight, so *raws* can be a
+    stream larger than memory.
+    """
+    chunks = itertools.batched(raws, chunk_size)
+    for orders in imap_bounded(_map_chunk, chunks, workers=workers or 1):
+        yield from orders
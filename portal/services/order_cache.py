@@ -0,0 +1,159 @@
+"""Size-bounded LRU cache of mapped orders.
+
+Mapping a raw payload is pure, so the resulting :class:`Order` can be kept
+for as long as the upstream payload does not change.  Entries are keyed by
+order number and tagged with the source version they were mapped from; a
+lookup with a different version drops the stale entry.
+
+A :class:`~portal.types.LazyOrder` is measured without its deferred fields
+when it is cached and measured again as soon as one of them loads, so the
+byte budget also covers articles that are mapped after the fact.
+"""
+
+from __future__ import annotations
+
+import functools
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass, replace
+
+from portal.types import ArticleTable, LazyOrder, Order
+
+_DEFAULT_MAX_ENTRIES = 4096
+_DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Point-in-time counters of an :class:`OrderCache`."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+
+@dataclass(frozen=True)
+class _Entry:
+    version: str
+    order: Order
+    size: int
+
+
+def _estimate_size(obj: object) -> int:
+    """Approximate the retained size of a mapped dataclass in bytes."""
+    size = sys.getsizeof(obj)
+    if is_dataclass(obj):
+        for f in fields(obj):
+            if isinstance(obj, LazyOrder) and not obj.is_loaded(f.name):
+                continue
+            size += _estimate_size(getattr(obj, f.name))
+    elif isinstance(obj, list):
+        for item in obj:
+            size += _estimate_size(item)
+    elif isinstance(obj, ArticleTable):
+        for column in (obj.sku, obj.name, obj.category):
+            size += _estimate_size(column)
+        for array in (obj.quantity, obj.quantity_returned, obj.price, obj.flags):
+            size += sys.getsizeof(array)
+    return size
+
+
+class OrderCache:
+    """LRU cache of :class:`Order` objects bounded by count and bytes.
+
+    Byte sizes are estimates from :func:`sys.getsizeof`; they are meant to
+    keep a worker's footprint predictable, not to be exact.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+    ) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, order_number: str, version: str) -> Order | None:
+        """Return the cached order for *version*, or ``None`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(order_number)
+            if entry is None or entry.version != version:
+                if entry is not None:
+                    self._discard(order_number)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(order_number)
+            self._hits += 1
+            return entry.order
+
+    def put(self, order_number: str, version: str, order: Order) -> None:
+        """Cache *order* as the mapping of *order_number* at *version*."""
+        size = _estimate_size(order)
+        if size > self._max_bytes:
+            return
+        if isinstance(order, LazyOrder):
+            for f in fields(order):
+                if not order.is_loaded(f.name):
+                    order.when_loaded(
+                        f.name, functools.partial(self._remeasure, order_number, order)
+                    )
+        with self._lock:
+            self._discard(order_number)
+            self._entries[order_number] = _Entry(version, order, size)
+            self._bytes += size
+            self._evict()
+
+    def _remeasure(self, order_number: str, order: Order) -> None:
+        # A deferred field of a cached order was loaded; charge its size.
+        size = _estimate_size(order)
+        with self._lock:
+            entry = self._entries.get(order_number)
+            if entry is None or entry.order is not order:
+                return
+            self._entries[order_number] = replace(entry, size=size)
+            self._bytes += size - entry.size
+            if size > self._max_bytes:
+                self._discard(order_number)
+                self._evictions += 1
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self._evictions += 1
+
+    def invalidate(self, order_number: str) -> None:
+        """Drop any cached mapping of *order_number*."""
+        with self._lock:
+            self._discard(order_number)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
+
+    def _discard(self, order_number: str) -> None:
+        entry = self._entries.pop(order_number, None)
+        if entry is not None:
+            self._bytes -= entry.size
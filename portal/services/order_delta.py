@@ -0,0 +1,130 @@
+"""Append-only delta feed for order updates.
+
+Upstream appends one JSON object per line to ``<base>.delta.jsonl`` next to
+the orders file instead of rewriting the whole export.  Each line targets
+one order by ``order_number`` and may contain:
+
+``order``
+    a complete raw payload that replaces (or creates) the order;
+``set``
+    top-level fields to overwrite;
+``articles``
+    a mapping of SKU to article fields to overwrite, e.g.
+    ``{"TSHIRT-BLK-M": {"quantity_returned": 1}}``;
+``fulfillments``
+    fulfillments to append.
+
+Lines that are not a JSON object naming an ``order_number`` are logged and
+skipped, so one bad line cannot stall the feed.
+
+Patches are applied copy-on-write: the input payload is never mutated, so
+payloads that are already being served stay unchanged.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OrderDelta:
+    """One line of the delta feed."""
+
+    order_number: str
+    payload: dict[str, Any]
+    line: bytes  # the encoded line, used to derive the new order version
+
+
+def delta_path_for(path: Path) -> Path:
+    """Return the delta feed that belongs to the orders file at *path*."""
+    return path.with_name(f"{path.stem}.delta.jsonl")
+
+
+def read_deltas(
+    path: Path, offset: int = 0, end: int | None = None
+) -> tuple[list[OrderDelta], int]:
+    """Read complete delta lines from *path* starting at byte *offset*.
+
+    A trailing line without a newline is still being written and is left
+    for the next read, as is everything from byte *end* on.  Malformed lines
+    are skipped.  Returns the deltas and the offset to resume from.
+    """
+    deltas: list[OrderDelta] = []
+    try:
+        f = path.open("rb")
+    except FileNotFoundError:
+        return deltas, offset
+    with f:
+        f.seek(offset)
+        for line in f:
+            if (end is not None and offset >= end) or not line.endswith(b"\n"):
+                break
+            start = offset
+            offset += len(line)
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                deltas.append(_parse_delta(line))
+            except ValueError as exc:
+                logger.warning(
+                    "Skipping order delta at byte %d of %s: %s", start, path, exc
+                )
+    return deltas, offset
+
+
+def _parse_delta(line: bytes) -> OrderDelta:
+    payload: object = json.loads(line)
+    if not isinstance(payload, dict):
+        raise ValueError("each order delta must be an object")
+    order_number = payload.get("order_number")
+    if not isinstance(order_number, str):
+        raise ValueError("each order delta must name an order_number")
+    return OrderDelta(order_number, payload, line)
+
+
+def delta_version(previous: str, delta: OrderDelta) -> str:
+    """Return the version of an order after *delta*, given its *previous* one."""
+    return hashlib.blake2b(previous.encode() + delta.line, digest_size=8).hexdigest()
+
+
+def apply_delta(raw: dict[str, Any] | None, delta: OrderDelta) -> dict[str, Any] | None:
+    """Return *raw* with *delta* applied, or ``None`` if there is no order."""
+    replacement = delta.payload.get("order")
+    if isinstance(replacement, dict):
+        return {**replacement, "order_number": delta.order_number}
+    if raw is None:
+        return None
+
+    patched = dict(raw)
+    updates = delta.payload.get("set")
+    if isinstance(updates, dict):
+        patched.update(updates)
+
+    article_updates = delta.payload.get("articles")
+    if isinstance(article_updates, dict) and isinstance(raw.get("articles"), list):
+        patched["articles"] = [
+            {**item, **article_updates[item["sku"]]}
+            if isinstance(item, dict)
+            and isinstance(article_updates.get(item.get("sku")), dict)
+            else item
+            for item in raw["articles"]
+        ]
+
+    fulfillments = delta.payload.get("fulfillments")
+    if isinstance(fulfillments, list):
+        existing = raw.get("fulfillments")
+        patched["fulfillments"] = [
+            *(existing if isinstance(existing, list) else []),
+            *fulfillments,
+        ]
+
+    patched["order_number"] = delta.order_number
+    return patched
@@ -0,0 +1,218 @@
+"""Deterministic synthetic order corpora for scale testing.
+
+:func:`generate_orders` yields raw orders in the export format of
+``orders_raw.json``, drawn from a seeded RNG so the same seed always gives
+the same corpus, and a longer corpus starts with the orders of a shorter
+one.  The orders mix every payload shape the mapper handles: flat or nested
+``customer`` contact fields, no, one or several ``fulfillments`` (or only a
+top-level ``delivered_at``), digital and final-sale articles, product-type
+hierarchies of varying depth and a long-tailed number of articles per
+order, or a fixed one for benchmarks.  :func:`write_orders` streams them
+to disk one at a time.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+# (category, product-type hierarchy from general to specific)
+_CATALOGUE: list[tuple[str, list[str]]] = [
+    ("apparel", ["Apparel", "Tops", "T-Shirts"]),
+    ("apparel", ["Apparel", "Outerwear", "Jackets", "Rain Jackets"]),
+    ("apparel", ["Apparel", "Pants"]),
+    ("footwear", ["Footwear", "Sneakers", "Running"]),
+    ("footwear", ["Footwear", "Boots"]),
+    ("electronics", ["Electronics", "Audio", "Headphones", "Wireless"]),
+    ("electronics", ["Electronics", "Accessories"]),
+    ("home", ["Home", "Kitchen", "Cookware"]),
+    ("accessories", ["Accessories", "Scarves"]),
+    ("beauty", ["Beauty"]),
+]
+_DIGITAL: list[tuple[str, list[str]]] = [
+    ("digital", ["Digital", "Books"]),
+    ("digital", ["Digital", "Gift Cards"]),
+    ("digital", ["Digital", "Software", "Subscriptions"]),
+]
+_FIRST_NAMES = ["Alex", "Sam", "Max", "Jana", "Lee", "Noor", "Ada", "Mika", "Ines"]
+_LAST_NAMES = ["Meyer", "Rivera", "Schmidt", "Okafor", "Rossi", "Novak", "Berg"]
+_CITIES = [
+    ("Berlin", "10"),
+    ("Hamburg", "20"),
+    ("München", "80"),
+    ("Köln", "50"),
+    ("Milano", "20"),
+    ("Wien", "11"),
+]
+_STREETS = ["Hauptstrasse", "Luisenstrasse", "Kapellenweg", "Via Roma", "Ringstrasse"]
+_CARRIERS = ["dhl", "ups", "dpd", "gls"]
+_TAGS = ["seasonal", "cotton", "bestseller", "new", "eco"]
+
+_DEFAULT_START = datetime(2025, 1, 1)
+
+
+def generate_orders(
+    count: int,
+    *,
+    seed: int = 0,
+    start: datetime = _DEFAULT_START,
+    days: int = 365,
+    max_articles: int = 5000,
+    articles: int | None = None,
+    prefix: str = "GEN",
+) -> Iterator[dict[str, Any]]:
+    """Yield *count* raw orders placed over *days* days from *start*.
+
+    Article counts follow a Pareto distribution capped at *max_articles*:
+    most orders have one to three lines, a few have hundreds.  With
+    *articles*, every order has exactly that many lines instead.
+    """
+    if count < 0 or days <= 0 or max_articles <= 0:
+        raise ValueError("count, days and max_articles must be positive")
+    if articles is not None and articles < 0:
+        raise ValueError("articles must not be negative")
+    rng = random.Random(seed)
+    for i in range(count):
+        yield _order(rng, i, start, days, max_articles, articles, prefix)
+
+
+def _order(
+    rng: random.Random,
+    index: int,
+    start: datetime,
+    days: int,
+    max_articles: int,
+    articles: int | None,
+    prefix: str,
+) -> dict[str, Any]:
+    order_number = f"{prefix}-{index:08d}"
+    first_name = rng.choice(_FIRST_NAMES)
+    last_name = rng.choice(_LAST_NAMES)
+    city, zip_prefix = rng.choice(_CITIES)
+    zip_code = f"{zip_prefix}{rng.randrange(1000):03d}"
+    street = f"{rng.choice(_STREETS)} {rng.randint(1, 200)}"
+    extra = f"Apt {rng.randint(1, 40)}" if rng.random() < 0.3 else ""
+    order_date = start + timedelta(seconds=rng.randrange(days * 86_400))
+
+    raw: dict[str, Any] = {
+        "order_number": order_number,
+        "email": f"{first_name}.{last_name}.{index}@example.com".lower(),
+        "order_date": _iso(order_date),
+    }
+    # Contact fields: flat only, nested customer only, or both, in which
+    # case some flat fields may be missing and fall back to the customer.
+    style = rng.random()
+    if style < 0.6:
+        flat = {
+            "recipient": f"{first_name} {last_name}",
+            "street": f"{street}, {extra}" if extra else street,
+            "zip": zip_code,
+            "city": city,
+        }
+        for key, value in flat.items():
+            if style < 0.3 or rng.random() < 0.8:
+                raw[key] = value
+    if style >= 0.3:
+        raw["customer"] = {
+            "first_name": first_name,
+            "last_name": last_name,
+            "address_line": street,
+            "address_line_extra": extra,
+            "postal_code": zip_code,
+            "city": city,
+            "country_code": "DE",
+        }
+        raw["customer_id"] = f"CUST-{index:08d}"
+
+    raw.update(_delivery(rng, order_date))
+    if articles is None:
+        lines = min(max_articles, int(rng.paretovariate(1.2)))
+    else:
+        lines = articles
+    raw["articles"] = [_article(rng, order_number, line) for line in range(lines)]
+    return raw
+
+
+def _delivery(rng: random.Random, order_date: datetime) -> dict[str, Any]:
+    shape = rng.random()
+    if shape < 0.1:
+        return {"fulfillments": []}  # not shipped yet
+    delivered = order_date + timedelta(hours=rng.randint(24, 24 * 7))
+    if shape < 0.2:
+        return {"delivered_at": _iso(delivered)}  # legacy, no fulfillments
+    fulfillments = []
+    for _ in range(1 if shape < 0.8 else rng.randint(2, 4)):
+        fulfillment: dict[str, Any] = {
+            "tracking_number": f"TRK{rng.randrange(10**10):010d}",
+            "carrier": rng.choice(_CARRIERS),
+        }
+        # Split shipments arrive on different days; some are in transit.
+        if rng.random() < 0.95:
+            fulfillment["delivered_at"] = _iso(delivered)
+        fulfillments.append(fulfillment)
+        delivered += timedelta(hours=rng.randint(1, 72))
+    if shape > 0.95:
+        # Fulfillments win over a stale top-level date.
+        return {"fulfillments": fulfillments, "delivered_at": _iso(order_date)}
+    return {"fulfillments": fulfillments}
+
+
+def _article(rng: random.Random, order_number: str, line: int) -> dict[str, Any]:
+    kind = rng.random()
+    digital = kind < 0.1
+    category, path = rng.choice(_DIGITAL if digital else _CATALOGUE)
+    depth = rng.randint(1, len(path))
+    quantity = 1 if digital else rng.choice((1, 1, 1, 2, 3, 5))
+    tags = rng.sample(_TAGS, rng.randint(0, 2))
+    if digital:
+        tags.append("digital-delivery")
+    elif kind > 0.9:
+        tags += ["final-sale", "clearance"]
+    returned = rng.random()
+    return {
+        "line_item_id": f"LI-{order_number}-{line + 1}",
+        "sku": f"{category[:4].upper()}-{rng.randrange(100_000):05d}",
+        "name": f"{path[-1]} {rng.randrange(1000)}",
+        "category": category,
+        "product_type": " > ".join(path[:depth]),
+        "quantity": quantity,
+        "quantity_returned": (
+            quantity if returned < 0.05 else rng.randint(1, quantity) - 1
+        ),
+        "price": round(rng.uniform(2, 300), 2),
+        "requires_shipping": not digital,
+        "tags": tags,
+    }
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def write_orders(orders: Iterable[dict[str, Any]], path: Path) -> int:
+    """Stream *orders* into an ``orders_raw.json`` file at *path*.
+
+    Orders are encoded one at a time, so *orders* may be a generator of any
+    length.  The file is written next to *path* and moved into place when
+    complete.  Returns the number of orders written.
+    """
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    count = 0
+    try:
+        with tmp_path.open("w", encoding="utf-8") as f:
+            f.write('{"orders": [')
+            for order in orders:
+                f.write(",\n" if count else "\n")
+                f.write(json.dumps(order, ensure_ascii=False, separators=(",", ":")))
+                count += 1
+            f.write("\n]}\n")
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return count
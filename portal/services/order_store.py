@@ -1,21 +1,49 @@
-"""Simple JSON-backed order store.
+"""Order store and lookup helpers used by the views.
 
-Loads orders from ``portal/data/orders_raw.json`` and provides lookup
-helpers used by the views.
+Orders are read through a pluggable :class:`OrderBackend`.  The default
+backend indexes ``portal/data/orders_raw.json`` in memory; setting
+``RETURNS_ORDER_BACKEND = "sqlite"`` reads the database filled by
+``manage.py ingest_orders`` and ``"snapshot"`` memory-maps the file written
+by ``manage.py build_snapshot``.
 """
 
 from __future__ import annotations
 
-import json
-from dataclasses import replace
+import functools
+import logging
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, Protocol
 
-from portal.services.mapper import map_order
-from portal.types import Order
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
-_DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "orders_raw.json"
+from portal.services.files import file_signature
+from portal.services.mapper import map_order_lazy
+from portal.services.order_cache import CacheStats, OrderCache
+from portal.services.order_delta import (
+    OrderDelta,
+    apply_delta,
+    delta_path_for,
+    delta_version,
+    read_deltas,
+)
+from portal.services.order_stream import (
+    RawOrderSpan,
+    StreamedOrder,
+    iter_raw_orders,
+    read_raw_order,
+)
+from portal.types import LazyOrder, Order
+
+logger = logging.getLogger(__name__)
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "orders_raw.json"
 
 # How many days ago each order was delivered.  Used to keep the demo
 # data realistic regardless of when the challenge is actually run.
@@ -26,19 +54,280 @@ _DELIVERY_AGE_DAYS: dict[str, int] = {
 }
 
 
-def _load_raw_orders() -> list[dict[str, Any]]:
-    with _DATA_PATH.open() as f:
-        loaded: object = json.load(f)
+def normalize_identifier(value: str) -> str:
+    """Normalise an email / zip for comparison (case and whitespace)."""
+    return "".join(value.split()).casefold()
+
+
+@dataclass(frozen=True)
+class OrderRecord:
+    """A raw order payload together with the version of its source."""
+
+    order_number: str
+    version: str  # changes whenever the upstream payload changes
+    raw: dict[str, Any]
+
+    def to_order(self) -> Order:
+        return map_order_lazy(self.raw)
+
+
+class StoredOrder(Protocol):
+    """A versioned order as returned by a backend, not yet materialised."""
+
+    @property
+    def order_number(self) -> str: ...
+
+    @property
+    def version(self) -> str: ...
+
+    def to_order(self) -> Order:
+        """Build the domain :class:`Order` for this record."""
+        ...
+
+
+class OrderBackend(Protocol):
+    """Source of versioned order records."""
+
+    def get(self, order_number: str) -> StoredOrder | None:
+        """Return the record for *order_number*, if any."""
+        ...
+
+    def find(self, order_number: str, identifier: str) -> StoredOrder | None:
+        """Return the record if *identifier* matches its email or zip."""
+        ...
+
+    def get_many(self, order_numbers: Iterable[str]) -> Mapping[str, StoredOrder]:
+        """Return the records that exist among *order_numbers*, by number."""
+        ...
+
 
-    assert isinstance(loaded, dict), "orders JSON root must be an object"
+@dataclass(frozen=True)
+class _OrderIndex:
+    """Immutable lookup tables; a reload builds and publishes a new one."""
 
-    orders = loaded.get("orders")
-    assert isinstance(orders, list), "orders JSON must include an 'orders' list"
-    assert all(isinstance(order, dict) for order in orders), (
-        "each order entry must be an object"
+    # decoded payloads; when not resident, only orders patched by deltas
+    by_number: dict[str, OrderRecord] = field(default_factory=dict)
+    # byte location of every order, for re-reading a single payload
+    spans: dict[str, RawOrderSpan] = field(default_factory=dict)
+    # normalised email / zip -> order numbers carrying that identifier
+    by_identifier: dict[str, frozenset[str]] = field(default_factory=dict)
+
+
+def _identifiers(raw: dict[str, Any] | None) -> set[str]:
+    if raw is None:
+        return set()
+    values = (raw.get("email"), raw.get("zip"))
+    return {normalize_identifier(v) for v in values if isinstance(v, str) and v}
+
+
+def _build_index(orders: Iterable[StreamedOrder], *, resident: bool) -> _OrderIndex:
+    by_number: dict[str, OrderRecord] = {}
+    spans: dict[str, RawOrderSpan] = {}
+    by_identifier: dict[str, set[str]] = {}
+    for entry in orders:
+        raw = entry.raw
+        order_number = raw.get("order_number")
+        if not isinstance(order_number, str) or order_number in spans:
+            continue
+        spans[order_number] = entry.span
+        if resident:
+            by_number[order_number] = OrderRecord(order_number, entry.span.digest, raw)
+        for identifier in _identifiers(raw):
+            by_identifier.setdefault(identifier, set()).add(order_number)
+    return _OrderIndex(
+        by_number=by_number,
+        spans=spans,
+        by_identifier={key: frozenset(nums) for key, nums in by_identifier.items()},
     )
 
-    return [cast(dict[str, Any], order) for order in orders]
+
+class JsonOrderStore:
+    """In-memory, indexed view of an ``orders_raw.json`` file.
+
+    The file is streamed once and indexed by order number and by normalised
+    email / zip, so lookups are dictionary hits.  The file is only re-read
+    when its mtime or size changes, and it is stat'ed at most once every
+    *check_interval* seconds so the request path stays in memory.
+
+    Updates appended to the delta feed next to the file (see
+    :mod:`portal.services.order_delta`) are applied incrementally.  Every
+    reload builds a new immutable index and publishes it with a single
+    reference swap; readers never wait for a reload, they keep answering
+    from the index they already hold.  If a reload fails, the previous
+    index stays active and the error is kept in :attr:`last_error`.
+
+    With ``resident=False`` only the indexes and byte offsets are kept and
+    each lookup re-reads its single order with one seek, which keeps memory
+    flat for exports that do not fit in a worker.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        check_interval: float = 2.0,
+        resident: bool = True,
+        delta_path: Path | None = None,
+    ) -> None:
+        self._path = path
+        self._delta_path = delta_path or delta_path_for(path)
+        self._check_interval = check_interval
+        self._resident = resident
+        self._lock = threading.Lock()
+        self._index = _OrderIndex()
+        self._signature: tuple[int, int] | None = None
+        self._delta_signature: tuple[int, int] | None = None
+        self._delta_offset = 0
+        self._next_check = 0.0
+        self.last_error: Exception | None = None
+
+    def get(self, order_number: str) -> OrderRecord | None:
+        """Return the record for *order_number*, if any."""
+        self._ensure_fresh()
+        return self._load(self._index, order_number)
+
+    def find(self, order_number: str, identifier: str) -> OrderRecord | None:
+        """Return the record if *identifier* matches its email or zip."""
+        self._ensure_fresh()
+        index = self._index
+        numbers = index.by_identifier.get(normalize_identifier(identifier))
+        if numbers is None or order_number not in numbers:
+            return None
+        return self._load(index, order_number)
+
+    def get_many(self, order_numbers: Iterable[str]) -> dict[str, OrderRecord]:
+        """Return the records that exist among *order_numbers*, by number."""
+        self._ensure_fresh()
+        index = self._index
+        records: dict[str, OrderRecord] = {}
+        for order_number in order_numbers:
+            record = self._load(index, order_number)
+            if record is not None:
+                records[order_number] = record
+        return records
+
+    def _load(self, index: _OrderIndex, order_number: str) -> OrderRecord | None:
+        record = index.by_number.get(order_number)
+        if record is not None or self._resident:
+            return record
+        span = index.spans.get(order_number)
+        if span is None:
+            return None
+        return OrderRecord(order_number, span.digest, read_raw_order(self._path, span))
+
+    def _ensure_fresh(self) -> None:
+        if time.monotonic() < self._next_check:
+            return
+        # Only the very first load makes callers wait; afterwards whoever
+        # loses the race keeps serving the current index.
+        if not self._lock.acquire(blocking=self._signature is None):
+            return
+        try:
+            if time.monotonic() < self._next_check:
+                return
+            try:
+                self._refresh()
+            except Exception as exc:
+                if self._signature is None:
+                    raise  # nothing to fall back to
+                # Keep serving the previous index; retry after the interval.
+                self.last_error = exc
+                logger.exception("Could not reload orders from %s", self._path)
+            else:
+                self.last_error = None
+            self._next_check = time.monotonic() + self._check_interval
+        finally:
+            self._lock.release()
+
+    def _refresh(self) -> None:
+        signature = file_signature(self._path)
+        if signature is None:
+            raise FileNotFoundError(self._path)
+        delta_signature = file_signature(self._delta_path)
+        delta_size = delta_signature[1] if delta_signature else 0
+
+        if signature != self._signature or delta_size < self._delta_offset:
+            index = _build_index(iter_raw_orders(self._path), resident=self._resident)
+            delta_offset = 0
+        elif delta_signature != self._delta_signature:
+            index = self._index
+            delta_offset = self._delta_offset
+        else:
+            return
+
+        deltas, delta_offset = read_deltas(self._delta_path, delta_offset)
+        if deltas:
+            index = self._apply_deltas(index, deltas)
+
+        self._index = index  # publish
+        self._signature = signature
+        self._delta_signature = delta_signature
+        self._delta_offset = delta_offset
+
+    def _apply_deltas(
+        self, index: _OrderIndex, deltas: list[OrderDelta]
+    ) -> _OrderIndex:
+        by_number = dict(index.by_number)
+        by_identifier = dict(index.by_identifier)
+        patched = _OrderIndex(by_number, index.spans, by_identifier)
+        for delta in deltas:
+            current = self._load(patched, delta.order_number)
+            old_raw = current.raw if current is not None else None
+            new_raw = apply_delta(old_raw, delta)
+            if new_raw is None:
+                continue
+            previous = current.version if current is not None else ""
+            version = delta_version(previous, delta)
+            by_number[delta.order_number] = OrderRecord(
+                delta.order_number, version, new_raw
+            )
+            old_ids, new_ids = _identifiers(old_raw), _identifiers(new_raw)
+            for identifier in old_ids - new_ids:
+                by_identifier[identifier] = by_identifier[identifier] - {
+                    delta.order_number
+                }
+            for identifier in new_ids - old_ids:
+                by_identifier[identifier] = by_identifier.get(
+                    identifier, frozenset()
+                ) | {delta.order_number}
+        return patched
+
+
+_cache = OrderCache()
+
+
+@functools.cache
+def get_backend() -> OrderBackend:
+    """Return the process-wide backend selected by ``RETURNS_ORDER_BACKEND``."""
+    name = getattr(settings, "RETURNS_ORDER_BACKEND", "json")
+    if name == "json":
+        return JsonOrderStore(DATA_PATH)
+    if name == "sqlite":
+        from portal.services.sqlite_store import SqliteOrderStore
+
+        return SqliteOrderStore(Path(settings.RETURNS_ORDERS_DB))
+    if name == "snapshot":
+        from portal.services.snapshot import SnapshotOrderStore
+
+        return SnapshotOrderStore(Path(settings.RETURNS_ORDERS_SNAPSHOT))
+    raise ImproperlyConfigured(f"Unknown RETURNS_ORDER_BACKEND {name!r}")
+
+
+def order_cache_stats() -> CacheStats:
+    """Hit / miss / eviction counters of the mapped-order cache."""
+    return _cache.stats()
+
+
+def _map_record(record: StoredOrder) -> Order:
+    """Map *record*, reusing the cached :class:`Order` for its version.
+
+    Cached orders are shared between requests and must not be mutated.
+    """
+    order = _cache.get(record.order_number, record.version)
+    if order is None:
+        order = record.to_order()
+        _cache.put(record.order_number, record.version, order)
+    return order
 
 
 def _freshen_dates(order: Order) -> Order:
@@ -53,21 +342,22 @@ def _freshen_dates(order: Order) -> Order:
         second=0,
         microsecond=0,
     ) - timedelta(days=days_ago)
+    if isinstance(order, LazyOrder):
+        return order.with_dates(new_delivery - gap, new_delivery)
     return replace(order, delivery_date=new_delivery, order_date=new_delivery - gap)
 
 
 def find_order(order_number: str, identifier: str) -> Order | None:
     """Look up an order by number and verify the email or zip matches.
 
-    Returns the mapped :class:`Order` on success, or ``None`` if the order
-    is not found or the identifier does not match.
+    The identifier is compared case- and whitespace-insensitively.  Returns
+    the mapped :class:`Order` on success, or ``None`` if the order is not
+    found or the identifier does not match.
     """
-    for raw in _load_raw_orders():
-        if raw["order_number"] == order_number and (
-            raw["email"] == identifier or raw["zip"] == identifier
-        ):
-            return _freshen_dates(map_order(raw))
-    return None
+    record = get_backend().find(order_number, identifier)
+    if record is None:
+        return None
+    return _freshen_dates(_map_record(record))
 
 
 def get_order(order_number: str) -> Order | None:
@@ -75,7 +365,51 @@ def get_order(order_number: str) -> Order | None:
 
     Used after the user has already been authenticated via the lookup page.
     """
-    for raw in _load_raw_orders():
-        if raw["order_number"] == order_number:
-            return _freshen_dates(map_order(raw))
-    return None
+    record = get_order_record(order_number)
+    if record is None:
+        return None
+    return order_from_record(record)
+
+
+def get_order_record(order_number: str) -> StoredOrder | None:
+    """Retrieve an order's stored record, without mapping it.
+
+    The record's ``version`` identifies the payload, so callers can key
+    caches on it before paying for :func:`order_from_record`.
+    """
+    return get_backend().get(order_number)
+
+
+def order_from_record(record: StoredOrder) -> Order:
+    """Map a record from :func:`get_order_record` like :func:`get_order`."""
+    return _freshen_dates(_map_record(record))
+
+
+def get_orders(order_numbers: Iterable[str]) -> dict[str, Order]:
+    """Retrieve several orders at once (no credential check).
+
+    Unknown order numbers are left out of the result.  The backend is asked
+    once for the whole batch.
+    """
+    records = get_backend().get_many(dict.fromkeys(order_numbers))
+    return {
+        number: _freshen_dates(_map_record(record))
+        for number, record in records.items()
+    }
+
+
+async def afind_order(order_number: str, identifier: str) -> Order | None:
+    """Async :func:`find_order`; backend I/O runs in the thread pool."""
+    return await sync_to_async(find_order, thread_sensitive=False)(
+        order_number, identifier
+    )
+
+
+async def aget_order(order_number: str) -> Order | None:
+    """Async :func:`get_order`; backend I/O runs in the thread pool."""
+    return await sync_to_async(get_order, thread_sensitive=False)(order_number)
+
+
+async def aget_order_record(order_number: str) -> StoredOrder | None:
+    """Async :func:`get_order_record`; backend I/O runs in the thread pool."""
+    return await sync_to_async(get_order_record, thread_sensitive=False)(order_number)
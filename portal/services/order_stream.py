@@ -0,0 +1,211 @@
+"""Incremental reader for large ``orders_raw.json`` exports.
+
+Walks the top-level ``"orders"`` array without decoding the whole file, so
+only one raw order is held in memory at a time.  Every order is yielded
+together with its byte span in the file, which lets a single order be
+re-read later with one seek instead of a full parse.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+_DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = b" \t\r\n"
+_STRUCTURAL = re.compile(rb'["{}\[\]]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_SCALAR_END = re.compile(rb"[,}\]\s]")
+
+
+@dataclass(frozen=True)
+class RawOrderSpan:
+    """Location of one encoded order inside the orders file."""
+
+    offset: int
+    length: int
+    # content hash of the encoded bytes; changes whenever the order does
+    digest: str
+
+
+@dataclass(frozen=True)
+class StreamedOrder:
+    """A decoded raw order and where it came from."""
+
+    span: RawOrderSpan
+    raw: dict[str, Any]
+
+
+class _Scanner:
+    """Buffered byte scanner that can cut complete JSON values from a stream.
+
+    The buffer only ever holds the unconsumed tail of the last chunk plus the
+    value currently being cut, so memory stays bounded by the largest order.
+    """
+
+    def __init__(self, f: BinaryIO, chunk_size: int) -> None:
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = b""
+        self._pos = 0
+        self._base = 0  # absolute file offset of self._buf[0]
+
+    def _fill(self) -> bool:
+        chunk = self._f.read(self._chunk_size)
+        if not chunk:
+            return False
+        self._buf += chunk
+        return True
+
+    def _compact(self) -> None:
+        if self._pos:
+            self._base += self._pos
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+
+    def peek(self) -> int | None:
+        """Return the next non-whitespace byte without consuming it."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            self._compact()
+            if not self._fill():
+                return None
+
+    def expect(self, char: bytes) -> None:
+        if self.peek() != char[0]:
+            raise ValueError(
+                f"orders JSON: expected {char.decode()!r} at byte {self._offset}"
+            )
+        self._pos += 1
+
+    @property
+    def _offset(self) -> int:
+        return self._base + self._pos
+
+    def take_value(self) -> tuple[int, bytes]:
+        """Consume the next JSON value and return its offset and raw bytes."""
+        first = self.peek()
+        if first is None:
+            raise ValueError("orders JSON ended unexpectedly")
+        self._compact()
+        if first in b"{[":
+            end = self._container_end(0)
+        elif first == ord('"'):
+            end = self._string_end(0)
+        else:
+            end = self._scalar_end(0)
+        offset = self._offset
+        value = self._buf[:end]
+        self._pos = end
+        return offset, value
+
+    def _container_end(self, start: int) -> int:
+        depth = 0
+        i = start
+        while True:
+            match = _STRUCTURAL.search(self._buf, i)
+            if match is None:
+                i = len(self._buf)
+                if not self._fill():
+                    raise ValueError("orders JSON ended inside a value")
+                continue
+            char = self._buf[match.start()]
+            if char == ord('"'):
+                i = self._string_end(match.start())
+                continue
+            depth += 1 if char in b"{[" else -1
+            i = match.end()
+            if depth == 0:
+                return i
+
+    def _string_end(self, start: int) -> int:
+        i = start + 1
+        while True:
+            match = _STRING_SPECIAL.search(self._buf, i)
+            if match is not None and self._buf[match.start()] == ord('"'):
+                return match.end()
+            if match is None or match.end() >= len(self._buf):
+                # Either no terminator yet or a trailing backslash whose
+                # escaped byte lives in the next chunk.
+                if not self._fill():
+                    raise ValueError("orders JSON ended inside a string")
+                continue
+            i = match.end() + 1
+
+    def _scalar_end(self, start: int) -> int:
+        while True:
+            match = _SCALAR_END.search(self._buf, start)
+            if match is not None:
+                return match.start()
+            if not self._fill():
+                return len(self._buf)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def _iter_array(scanner: _Scanner) -> Iterator[StreamedOrder]:
+    scanner.expect(b"[")
+    if scanner.peek() == ord("]"):
+        scanner.expect(b"]")
+        return
+    while True:
+        offset, data = scanner.take_value()
+        raw: object = json.loads(data)
+        if not isinstance(raw, dict):
+            raise ValueError("each order entry must be an object")
+        span = RawOrderSpan(offset, len(data), _digest(data))
+        yield StreamedOrder(span=span, raw=raw)
+        if scanner.peek() == ord(","):
+            scanner.expect(b",")
+            continue
+        scanner.expect(b"]")
+        return
+
+
+def iter_raw_orders(
+    path: Path, *, chunk_size: int = _DEFAULT_CHUNK_SIZE
+) -> Iterator[StreamedOrder]:
+    """Yield every entry of the top-level ``"orders"`` array, one at a time.
+
+    Raises:
+        ValueError: if the file is not an object with an ``"orders"`` list
+            of objects.
+    """
+    with path.open("rb") as f:
+        scanner = _Scanner(f, chunk_size)
+        scanner.expect(b"{")
+        if scanner.peek() != ord("}"):
+            while True:
+                _, key = scanner.take_value()
+                scanner.expect(b":")
+                if json.loads(key) == "orders":
+                    if scanner.peek() != ord("["):
+                        break
+                    yield from _iter_array(scanner)
+                    return
+                scanner.take_value()
+                if scanner.peek() != ord(","):
+                    break
+                scanner.expect(b",")
+    raise ValueError("orders JSON must include an 'orders' list")
+
+
+def read_raw_order(path: Path, span: RawOrderSpan) -> dict[str, Any]:
+    """Re-read a single order previously located by :func:`iter_raw_orders`."""
+    with path.open("rb") as f:
+        f.seek(span.offset)
+        raw: object = json.loads(f.read(span.length))
+    if not isinstance(raw, dict):
+        raise ValueError("each order entry must be an object")
+    return raw
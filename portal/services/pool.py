@@ -0,0 +1,43 @@
+"""Ordered, bounded fan-out of work items to a process pool."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+
+
+def imap_bounded[T, R](
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    workers: int,
+    initializer: Callable[..., None] | None = None,
+    initargs: tuple[Any, ...] = (),
+) -> Iterator[R]:
+    """Yield ``fn(item)`` for every item, in input order.
+
+    With *workers* > 1 the items are processed on a process pool whose
+    workers each run ``initializer(*initargs)`` once, so large shared
+    arguments are pickled once per worker instead of once per item.  At
+    most two items per worker are in flight, so *items* can be a stream
+    larger than memory.  Otherwise everything runs in this process, after
+    the same initializer.
+    """
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        yield from map(fn, items)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=initializer, initargs=initargs
+    ) as executor:
+        pending: deque[Future[R]] = deque()
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,302 @@
+"""Return eligibility rules and their compiled form.
+
+The rules file (YAML or JSON, see ``portal/data/return_rules.yaml``) is an
+ordered list of rules.  Everything a rule can test except the return window
+is known from the article alone: its category and flags.  :func:`compile_rules`
+therefore resolves, once per (category, flags) combination, which rule
+decides an article; evaluating an article is a single dict lookup plus at most
+one date comparison, however many rules there are.
+
+Each compiled :class:`Ruleset` carries a ``version``, the hash of the file
+content it was compiled from.  :class:`RulesSource` watches the file,
+recompiles it on a background thread when it changes and publishes the new
+ruleset with a single reference swap: evaluations already running finish on
+the ruleset they started with, and request threads never wait for a
+compile.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import itertools
+import json
+import logging
+import threading
+import time
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+import yaml
+from django.conf import settings
+
+from portal.services.files import file_signature
+from portal.types import DIGITAL, FINAL_SALE
+
+logger = logging.getLogger(__name__)
+
+RULES_PATH = Path(__file__).resolve().parent.parent / "data" / "return_rules.yaml"
+
+# Bits of an article's flag key, as used by :meth:`Ruleset.plan`: the
+# article's own flags plus whether it is fully returned.
+FULLY_RETURNED = 4
+_FLAG_NAMES = {
+    "is_digital": DIGITAL,
+    "is_final_sale": FINAL_SALE,
+    "fully_returned": FULLY_RETURNED,
+}
+_FLAG_KEYS = range((DIGITAL | FINAL_SALE | FULLY_RETURNED) + 1)
+
+_DEFAULT_WINDOW_REASON = "The {days}-day return window has ended."
+
+
+@dataclass(frozen=True, slots=True)
+class Rule:
+    """One entry of the rules file."""
+
+    id: str
+    reason: str
+    categories: frozenset[str] | None = None
+    flags_set: int = 0
+    flags_clear: int = 0
+    window_days: int | None = None
+
+    def applies_to(self, category: str | None, flags: int) -> bool:
+        if self.categories is not None and category not in self.categories:
+            return False
+        return flags & self.flags_set == self.flags_set and not flags & self.flags_clear
+
+
+@dataclass(frozen=True, slots=True)
+class Plan:
+    """What decides the articles of one (category, flags) combination.
+
+    ``window`` is checked first, then ``deny`` rejects unconditionally.  An
+    article that passes both is returnable.
+    """
+
+    window: Rule | None
+    window_length: timedelta | None
+    deny: Rule | None
+
+
+class Ruleset:
+    """Rules compiled into one :class:`Plan` per category and flag key."""
+
+    def __init__(self, rules: Sequence[Rule], *, version: str = "") -> None:
+        self.rules = tuple(rules)
+        self.version = version
+        categories: set[str | None] = {None}
+        for rule in self.rules:
+            categories.update(rule.categories or ())
+        self._plans = {
+            (category, flags): _plan(self.rules, category, flags)
+            for category, flags in itertools.product(categories, _FLAG_KEYS)
+        }
+
+    def plan(self, category: str, flags: int) -> Plan:
+        """Return the plan for an article; unknown categories share one."""
+        key = category.casefold()
+        plan = self._plans.get((key, flags))
+        if plan is None:
+            plan = self._plans[None, flags]
+        return plan
+
+
+def _plan(rules: Iterable[Rule], category: str | None, flags: int) -> Plan:
+    window: Rule | None = None
+    for rule in rules:
+        if not rule.applies_to(category, flags):
+            continue
+        if rule.window_days is None:
+            return _make_plan(window, rule)
+        if window is None:
+            window = rule
+    return _make_plan(window, None)
+
+
+def _make_plan(window: Rule | None, deny: Rule | None) -> Plan:
+    length = None
+    if window is not None and window.window_days is not None:
+        length = timedelta(days=window.window_days)
+    return Plan(window=window, window_length=length, deny=deny)
+
+
+def _parse_rule(entry: object, position: int) -> Rule:
+    if not isinstance(entry, Mapping):
+        raise ValueError(f"rule #{position} must be a mapping")
+    rule_id = entry.get("id")
+    if not isinstance(rule_id, str) or not rule_id:
+        raise ValueError(f"rule #{position} needs a string 'id'")
+
+    when = entry.get("when") or {}
+    if not isinstance(when, Mapping):
+        raise ValueError(f"rule {rule_id!r}: 'when' must be a mapping")
+    categories: frozenset[str] | None = None
+    flags_set = flags_clear = 0
+    for key, value in when.items():
+        if key == "category":
+            values = [value] if isinstance(value, str) else value
+            if not isinstance(values, list) or not all(
+                isinstance(v, str) for v in values
+            ):
+                raise ValueError(f"rule {rule_id!r}: bad category {value!r}")
+            categories = frozenset(v.casefold() for v in values)
+        elif key in _FLAG_NAMES:
+            if not isinstance(value, bool):
+                raise ValueError(f"rule {rule_id!r}: {key} must be true or false")
+            if value:
+                flags_set |= _FLAG_NAMES[key]
+            else:
+                flags_clear |= _FLAG_NAMES[key]
+        else:
+            raise ValueError(f"rule {rule_id!r}: unknown condition {key!r}")
+
+    window_days = entry.get("window_days")
+    if window_days is not None and (
+        not isinstance(window_days, int)
+        or isinstance(window_days, bool)
+        or window_days < 0
+    ):
+        raise ValueError(f"rule {rule_id!r}: window_days must be a whole number")
+
+    reason = entry.get("reason")
+    if reason is None and window_days is not None:
+        reason = _DEFAULT_WINDOW_REASON
+    if not isinstance(reason, str) or not reason:
+        raise ValueError(f"rule {rule_id!r} needs a 'reason'")
+    if window_days is not None:
+        # Only {days} is a placeholder; other braces are kept as written.
+        reason = reason.replace("{days}", str(window_days))
+
+    return Rule(
+        id=rule_id,
+        reason=reason,
+        categories=categories,
+        flags_set=flags_set,
+        flags_clear=flags_clear,
+        window_days=window_days,
+    )
+
+
+def compile_rules(config: Any, *, version: str = "") -> Ruleset:
+    """Validate a parsed rules file and compile it into a :class:`Ruleset`."""
+    if not isinstance(config, Mapping) or not isinstance(config.get("rules"), list):
+        raise ValueError("rules config must include a 'rules' list")
+    rules = [_parse_rule(entry, i) for i, entry in enumerate(config["rules"], 1)]
+    ids = [rule.id for rule in rules]
+    if len(set(ids)) != len(ids):
+        raise ValueError("rule ids must be unique")
+    return Ruleset(rules, version=version)
+
+
+def load_rules(path: Path) -> Ruleset:
+    """Read and compile the rules file at *path* (``.json`` or YAML).
+
+    The ruleset's version is a hash of the file content, so it only changes
+    when the rules do.
+    """
+    data = path.read_bytes()
+    version = hashlib.blake2b(data, digest_size=8).hexdigest()
+    text = data.decode()
+    config = json.loads(text) if path.suffix == ".json" else yaml.safe_load(text)
+    return compile_rules(config, version=version)
+
+
+class RulesSource:
+    """The current :class:`Ruleset` of a rules file, reloaded on change.
+
+    The file is stat'ed at most once every *check_interval* seconds.  When
+    it changed, a background thread recompiles it and swaps the result in;
+    until then, and if the new file does not compile, callers keep getting
+    the previous ruleset.  Only the very first load happens on the caller's
+    thread.
+    """
+
+    def __init__(self, path: Path, *, check_interval: float = 2.0) -> None:
+        self._path = path
+        self._check_interval = check_interval
+        self._ruleset: Ruleset | None = None
+        self._signature: tuple[int, int] | None = None
+        self._next_check = 0.0
+        # Held for the duration of a (re)load.
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.last_error: Exception | None = None
+
+    def get(self) -> Ruleset:
+        """Return the active ruleset, scheduling a reload if the file changed."""
+        ruleset = self._ruleset
+        if ruleset is None:
+            return self.reload()
+        if time.monotonic() >= self._next_check:
+            self._schedule_reload()
+        return ruleset
+
+    def reload(self) -> Ruleset:
+        """Recompile the file now, on the calling thread, and return the result."""
+        with self._lock:
+            self._next_check = time.monotonic() + self._check_interval
+            return self._load(file_signature(self._path))
+
+    def _schedule_reload(self) -> None:
+        if not self._lock.acquire(blocking=False):
+            return  # a reload is already running
+        started = False
+        try:
+            self._next_check = time.monotonic() + self._check_interval
+            signature = file_signature(self._path)
+            if signature != self._signature:
+                self._thread = threading.Thread(
+                    target=self._load_in_background,
+                    args=(signature,),
+                    name="rules-reload",
+                    daemon=True,
+                )
+                self._thread.start()
+                started = True
+        finally:
+            if not started:
+                self._lock.release()
+
+    def _load_in_background(self, signature: tuple[int, int] | None) -> None:
+        try:
+            self._load(signature)
+        except Exception as exc:
+            # Keep serving the previous rules; retry once the file changes.
+            self._signature = signature
+            self.last_error = exc
+            logger.exception("Could not reload return rules from %s", self._path)
+        finally:
+            self._lock.release()
+
+    def _load(self, signature: tuple[int, int] | None) -> Ruleset:
+        ruleset = load_rules(self._path)
+        if self._ruleset is not None and ruleset.version == self._ruleset.version:
+            ruleset = self._ruleset
+        self._ruleset = ruleset  # publish
+        self._signature = signature
+        self.last_error = None
+        return ruleset
+
+
+@functools.cache
+def get_rules_source() -> RulesSource:
+    """Return the process-wide source of ``RETURNS_RULES_PATH``."""
+    return RulesSource(
+        Path(getattr(settings, "RETURNS_RULES_PATH", RULES_PATH)),
+        check_interval=getattr(settings, "RETURNS_RULES_CHECK_INTERVAL", 2.0),
+    )
+
+
+def get_ruleset() -> Ruleset:
+    """Return the active ruleset."""
+    return get_rules_source().get()
+
+
+def ruleset_version() -> str:
+    """Content hash of the active ruleset, for keying caches and responses."""
+    return get_ruleset().version
@@ -0,0 +1,329 @@
+"""Prebuilt binary snapshot of mapped orders.
+
+``manage.py build_snapshot`` maps every order once and writes the result to
+a compact file that workers memory-map at startup.  Opening a snapshot only
+reads its fixed-width header, so cold start does not depend on the number
+of orders, and the mapped pages are shared between all workers on a host
+through the OS page cache.  Individual orders are decoded on access, and
+their articles only once they are read.
+
+Layout (little endian)::
+
+    header   magic "RPSNAP01", format version (H), reserved (H),
+             order count (I), table offset (Q), table entry size (Q)
+    data     per order: key bytes, then the encoded record
+    table    one fixed-width entry per order, sorted by order number:
+             key offset (Q), key length (H), record offset (Q), record length (I)
+
+A record starts with the source version and the normalised identifiers
+used for credential checks, followed by the order and its articles.
+"""
+
+from __future__ import annotations
+
+import functools
+import mmap
+import os
+import struct
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from portal.services.mapper import ARTICLE_TABLE_MIN_LINES, map_order
+from portal.services.order_store import normalize_identifier
+from portal.services.order_stream import StreamedOrder, iter_raw_orders
+from portal.types import (
+    DIGITAL,
+    FINAL_SALE,
+    Article,
+    ArticleTable,
+    LazyOrder,
+    Order,
+)
+
+_MAGIC = b"RPSNAP01"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sHHIQQ")
+_ENTRY = struct.Struct("<QHQI")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_U8 = struct.Struct("<B")
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+
+    def write_str(self, value: str) -> None:
+        data = value.encode()
+        self._parts.append(_U32.pack(len(data)))
+        self._parts.append(data)
+
+    def write_int(self, value: int) -> None:
+        self._parts.append(_I64.pack(value))
+
+    def write_float(self, value: float) -> None:
+        self._parts.append(_F64.pack(value))
+
+    def write_datetime(self, value: datetime) -> None:
+        self.write_int((value - _EPOCH) // _MICROSECOND)
+
+    def write_flags(self, value: int) -> None:
+        self._parts.append(_U8.pack(value))
+
+    def getvalue(self) -> bytes:
+        return b"".join(self._parts)
+
+
+class _Decoder:
+    def __init__(self, buf: mmap.mmap, offset: int) -> None:
+        self._buf = buf
+        self._pos = offset
+
+    @property
+    def position(self) -> int:
+        return self._pos
+
+    def read_str(self) -> str:
+        (length,) = _U32.unpack_from(self._buf, self._pos)
+        start = self._pos + _U32.size
+        self._pos = start + length
+        return self._buf[start : self._pos].decode()
+
+    def read_int(self) -> int:
+        (value,) = _I64.unpack_from(self._buf, self._pos)
+        self._pos += _I64.size
+        return int(value)
+
+    def read_float(self) -> float:
+        (value,) = _F64.unpack_from(self._buf, self._pos)
+        self._pos += _F64.size
+        return float(value)
+
+    def read_datetime(self) -> datetime:
+        return _EPOCH + self.read_int() * _MICROSECOND
+
+    def read_flags(self) -> int:
+        (value,) = _U8.unpack_from(self._buf, self._pos)
+        self._pos += _U8.size
+        return int(value)
+
+
+def _encode_record(version: str, identifiers: list[str], order: Order) -> bytes:
+    enc = _Encoder()
+    enc.write_str(version)
+    enc.write_int(len(identifiers))
+    for identifier in identifiers:
+        enc.write_str(identifier)
+    for value in (
+        order.order_number,
+        order.email,
+        order.recipient,
+        order.zip,
+        order.street,
+        order.city,
+    ):
+        enc.write_str(value)
+    enc.write_datetime(order.order_date)
+    enc.write_datetime(order.delivery_date)
+    enc.write_int(len(order.articles))
+    for article in order.articles:
+        enc.write_str(article.sku)
+        enc.write_str(article.name)
+        enc.write_str(article.category)
+        enc.write_int(article.quantity)
+        enc.write_int(article.quantity_returned)
+        enc.write_float(article.price)
+        enc.write_flags(
+            (DIGITAL if article.is_digital else 0)
+            | (FINAL_SALE if article.is_final_sale else 0)
+        )
+    return enc.getvalue()
+
+
+def _decode_order(buf: mmap.mmap, offset: int) -> Order:
+    dec = _Decoder(buf, offset)
+    order_number = dec.read_str()
+    email = dec.read_str()
+    recipient = dec.read_str()
+    zip_code = dec.read_str()
+    street = dec.read_str()
+    city = dec.read_str()
+    order_date = dec.read_datetime()
+    delivery_date = dec.read_datetime()
+    return LazyOrder(
+        order_number=order_number,
+        email=email,
+        recipient=recipient,
+        zip=zip_code,
+        street=street,
+        city=city,
+        order_date=order_date,
+        # Cached orders are shared between threads, so each load gets its
+        # own decoder at the articles offset.
+        load_articles=functools.partial(_decode_articles, buf, dec.position),
+        load_delivery_date=lambda: delivery_date,
+    )
+
+
+def _decode_articles(buf: mmap.mmap, offset: int) -> Sequence[Article]:
+    dec = _Decoder(buf, offset)
+    count = dec.read_int()
+    table = ArticleTable()
+    for _ in range(count):
+        sku = dec.read_str()
+        name = dec.read_str()
+        category = dec.read_str()
+        quantity = dec.read_int()
+        quantity_returned = dec.read_int()
+        price = dec.read_float()
+        flags = dec.read_flags()
+        table.append_row(
+            sku=sku,
+            name=name,
+            quantity=quantity,
+            quantity_returned=quantity_returned,
+            price=price,
+            is_digital=bool(flags & DIGITAL),
+            is_final_sale=bool(flags & FINAL_SALE),
+            category=category,
+        )
+    # Small orders are cheaper as plain objects than as columns.
+    return table if count >= ARTICLE_TABLE_MIN_LINES else list(table)
+
+
+def _identifiers(entry: StreamedOrder) -> list[str]:
+    values = (entry.raw.get("email"), entry.raw.get("zip"))
+    return [normalize_identifier(v) for v in values if isinstance(v, str) and v]
+
+
+def write_snapshot(orders: Iterable[StreamedOrder], path: Path) -> int:
+    """Map *orders* and write them to a snapshot at *path*.
+
+    The file is written next to *path* and atomically moved into place, so
+    workers never map a half-written snapshot.  Returns the order count.
+    """
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    entries: list[tuple[bytes, int, int, int]] = []
+    seen: set[str] = set()
+    with tmp_path.open("wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        for entry in orders:
+            order_number = entry.raw.get("order_number")
+            if not isinstance(order_number, str) or order_number in seen:
+                continue
+            seen.add(order_number)
+            key = order_number.encode()
+            record = _encode_record(
+                entry.span.digest, _identifiers(entry), map_order(entry.raw)
+            )
+            key_offset = f.tell()
+            f.write(key)
+            entries.append((key, key_offset, f.tell(), len(record)))
+            f.write(record)
+        table_offset = f.tell()
+        entries.sort()
+        for key, key_offset, record_offset, record_length in entries:
+            f.write(_ENTRY.pack(key_offset, len(key), record_offset, record_length))
+        f.seek(0)
+        f.write(
+            _HEADER.pack(
+                _MAGIC,
+                _FORMAT_VERSION,
+                0,
+                len(entries),
+                table_offset,
+                _ENTRY.size,
+            )
+        )
+    os.replace(tmp_path, path)
+    return len(entries)
+
+
+def build_snapshot(source: Path, path: Path) -> int:
+    """Write a snapshot of every order in the *source* orders JSON file."""
+    return write_snapshot(iter_raw_orders(source), path)
+
+
+@dataclass(frozen=True)
+class SnapshotRecord:
+    """A :class:`~portal.services.order_store.StoredOrder` inside a snapshot."""
+
+    order_number: str
+    version: str
+    _buf: mmap.mmap = field(repr=False, compare=False)
+    _order_offset: int = field(repr=False)
+
+    def to_order(self) -> Order:
+        return _decode_order(self._buf, self._order_offset)
+
+
+class SnapshotOrderStore:
+    """Read-only :class:`~portal.services.order_store.OrderBackend` on a snapshot.
+
+    Lookups binary-search the sorted offset table in the mapped file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, _, count, table_offset, entry_size = _HEADER.unpack_from(
+            self._buf, 0
+        )
+        if magic != _MAGIC or fmt != _FORMAT_VERSION or entry_size != _ENTRY.size:
+            raise ValueError(f"{path} is not a supported order snapshot")
+        self._count: int = count
+        self._table_offset: int = table_offset
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, order_number: str) -> SnapshotRecord | None:
+        located = self._locate(order_number)
+        if located is None:
+            return None
+        version, _, order_offset = located
+        return SnapshotRecord(order_number, version, self._buf, order_offset)
+
+    def find(self, order_number: str, identifier: str) -> SnapshotRecord | None:
+        located = self._locate(order_number)
+        if located is None:
+            return None
+        version, identifiers, order_offset = located
+        if normalize_identifier(identifier) not in identifiers:
+            return None
+        return SnapshotRecord(order_number, version, self._buf, order_offset)
+
+    def get_many(self, order_numbers: Iterable[str]) -> dict[str, SnapshotRecord]:
+        records: dict[str, SnapshotRecord] = {}
+        for order_number in order_numbers:
+            record = self.get(order_number)
+            if record is not None:
+                records[order_number] = record
+        return records
+
+    def _locate(self, order_number: str) -> tuple[str, list[str], int] | None:
+        """Return the version, identifiers and order offset of a record."""
+        key = order_number.encode()
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_offset, key_length, record_offset, _ = _ENTRY.unpack_from(
+                self._buf, self._table_offset + mid * _ENTRY.size
+            )
+            candidate = self._buf[key_offset : key_offset + key_length]
+            if candidate < key:
+                lo = mid + 1
+            elif candidate > key:
+                hi = mid
+            else:
+                dec = _Decoder(self._buf, record_offset)
+                version = dec.read_str()
+                identifiers = [dec.read_str() for _ in range(dec.read_int())]
+                return version, identifiers, dec.position
+        return None
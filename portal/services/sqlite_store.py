@@ -0,0 +1,159 @@
+"""SQLite-backed order store.
+
+Orders are ingested once from ``orders_raw.json`` (see
+``manage.py ingest_orders``) into a table with indexed order number, email
+and zip columns.  Each lookup reads a single row, so workers no longer hold
+the whole dataset in memory.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from portal.services.order_store import OrderRecord, normalize_identifier
+from portal.services.order_stream import iter_raw_orders
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_number TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    zip TEXT NOT NULL,
+    version TEXT NOT NULL,
+    payload BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS orders_email ON orders (email);
+CREATE INDEX IF NOT EXISTS orders_zip ON orders (zip);
+"""
+
+_UPSERT = """
+INSERT INTO orders (order_number, email, zip, version, payload)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (order_number) DO UPDATE SET
+    email = excluded.email,
+    zip = excluded.zip,
+    version = excluded.version,
+    payload = excluded.payload
+"""
+
+_DEFAULT_BATCH_SIZE = 1000
+
+# stay well below SQLite's bound-parameter limit in IN (...) queries
+_MAX_PARAMS = 500
+
+
+def _identifier(raw: dict[str, Any], key: str) -> str:
+    value = raw.get(key)
+    return normalize_identifier(value) if isinstance(value, str) else ""
+
+
+def _decode(order_number: str, version: str, payload: bytes) -> OrderRecord:
+    raw: object = json.loads(payload)
+    if not isinstance(raw, dict):
+        raise ValueError("each order entry must be an object")
+    return OrderRecord(order_number, version, raw)
+
+
+def ingest_orders(
+    source: Path,
+    database: Path,
+    *,
+    batch_size: int = _DEFAULT_BATCH_SIZE,
+    truncate: bool = False,
+) -> int:
+    """Stream *source* into *database* and return the number of orders written.
+
+    Rows are upserted with ``executemany`` in one transaction per batch, in
+    WAL mode so readers are never blocked by the ingest.
+    """
+    count = 0
+    conn = sqlite3.connect(database)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        if truncate:
+            with conn:
+                conn.execute("DELETE FROM orders")
+        rows = (
+            (
+                entry.raw["order_number"],
+                _identifier(entry.raw, "email"),
+                _identifier(entry.raw, "zip"),
+                entry.span.digest,
+                json.dumps(entry.raw, separators=(",", ":")).encode(),
+            )
+            for entry in iter_raw_orders(source)
+            if isinstance(entry.raw.get("order_number"), str)
+        )
+        for batch in itertools.batched(rows, batch_size):
+            with conn:
+                conn.executemany(_UPSERT, batch)
+            count += len(batch)
+    finally:
+        conn.close()
+    return count
+
+
+class SqliteOrderStore:
+    """Read-only :class:`~portal.services.order_store.OrderBackend` on SQLite.
+
+    Connections are opened lazily, one per thread, since ``sqlite3``
+    connections may not be shared across threads.
+    """
+
+    def __init__(self, database: Path) -> None:
+        self._database = database
+        self._local = threading.local()
+
+    def get(self, order_number: str) -> OrderRecord | None:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT version, payload FROM orders WHERE order_number = ?",
+                (order_number,),
+            )
+            .fetchone()
+        )
+        return None if row is None else _decode(order_number, *row)
+
+    def find(self, order_number: str, identifier: str) -> OrderRecord | None:
+        normalized = normalize_identifier(identifier)
+        if not normalized:
+            return None
+        row = (
+            self._connection()
+            .execute(
+                "SELECT version, payload FROM orders"
+                " WHERE order_number = ? AND (email = ? OR zip = ?)",
+                (order_number, normalized, normalized),
+            )
+            .fetchone()
+        )
+        return None if row is None else _decode(order_number, *row)
+
+    def get_many(self, order_numbers: Iterable[str]) -> dict[str, OrderRecord]:
+        records: dict[str, OrderRecord] = {}
+        conn = self._connection()
+        for batch in itertools.batched(dict.fromkeys(order_numbers), _MAX_PARAMS):
+            placeholders = ", ".join("?" * len(batch))
+            rows = conn.execute(
+                "SELECT order_number, version, payload FROM orders"
+                f" WHERE order_number IN ({placeholders})",
+                batch,
+            )
+            for order_number, version, payload in rows:
+                records[order_number] = _decode(order_number, version, payload)
+        return records
+
+    def _connection(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"{self._database.as_uri()}?mode=ro", uri=True)
+            self._local.conn = conn
+        return conn
@@ -0,0 +1,246 @@
+"""Token-bucket throttling of order lookups.
+
+Every lookup attempt takes a token from two buckets: one per client IP and
+one per order number, so neither a single scraper nor a burst aimed at one
+order from many addresses can monopolise the expensive lookup path.  A
+bucket holds up to ``capacity`` tokens and refills continuously at
+``capacity`` per ``period``.
+
+Bucket state lives in a pluggable :class:`BucketStore`, selected by
+``RETURNS_THROTTLE_BACKEND``: ``"memory"`` (per process), ``"sqlite"`` (a
+file shared by all workers on a host) or the dotted path of a custom store
+class, e.g. one backed by Redis.
+
+Clients are identified by :func:`client_ident`: ``REMOTE_ADDR``, or, behind
+``RETURNS_TRUSTED_PROXIES`` reverse proxies, the address the outermost of
+them saw in ``X-Forwarded-For``.  Entries further left are client-supplied
+and never trusted.
+"""
+
+from __future__ import annotations
+
+import functools
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+_PERIODS = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600, "hour": 3600}
+
+_DEFAULT_MAX_ENTRIES = 100_000
+
+# Longest order number accepted by the lookup form; longer input is cut so
+# it cannot blow up bucket keys.
+_MAX_ORDER_NUMBER = 50
+
+
+@dataclass(frozen=True, slots=True)
+class Rate:
+    """A burst of *capacity* attempts, refilled at *capacity* per *period*."""
+
+    capacity: int
+    period: float
+
+    @classmethod
+    def parse(cls, value: str) -> Rate:
+        """Parse ``"<count>/<period>"``, e.g. ``"10/min"`` or ``"100/h"``."""
+        count, _, unit = value.partition("/")
+        try:
+            rate = cls(int(count), _PERIODS[unit.strip()])
+        except (KeyError, ValueError):
+            raise ValueError(f"bad throttle rate {value!r}") from None
+        if rate.capacity <= 0:
+            raise ValueError(f"bad throttle rate {value!r}")
+        return rate
+
+    def take(self, tokens: float, elapsed: float) -> tuple[float, float]:
+        """Refill a bucket of *tokens* over *elapsed* seconds and take one.
+
+        Returns the tokens left and 0.0, or, if the bucket is empty, its
+        tokens and the seconds until a whole token is available.
+        """
+        tokens = min(
+            self.capacity, tokens + max(elapsed, 0.0) * self.capacity / self.period
+        )
+        if tokens >= 1:
+            return tokens - 1, 0.0
+        return tokens, (1 - tokens) * self.period / self.capacity
+
+
+class BucketStore(Protocol):
+    """Shared state of the token buckets."""
+
+    def take(self, key: str, rate: Rate, now: float) -> float:
+        """Take a token from bucket *key* at *now* (a ``time.time()``).
+
+        Returns 0.0 if a token was taken, otherwise the seconds until one
+        will be available.  Must be atomic across the store's clients.
+        """
+        ...
+
+
+class MemoryBucketStore:
+    """Buckets of this process only, least recently used dropped first."""
+
+    def __init__(self, *, max_entries: int = _DEFAULT_MAX_ENTRIES) -> None:
+        self._max_entries = max_entries
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: Rate, now: float) -> float:
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (rate.capacity, now))
+            tokens, wait = rate.take(tokens, now - updated)
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self._max_entries:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+# full_at is when the bucket will have refilled to capacity; from then on
+# the row is the same as no row at all.
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS token_buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    full_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS token_buckets_full_at ON token_buckets (full_at);
+"""
+
+_DEFAULT_PRUNE_EVERY = 1000
+
+
+class SqliteBucketStore:
+    """Buckets in a SQLite file, shared by every process that opens it.
+
+    Each ``take`` is one short ``BEGIN IMMEDIATE`` transaction.  Connections
+    are opened lazily, one per thread.  Every *prune_every* takes of a
+    connection also delete the buckets that have refilled to capacity, so
+    keys that are tried once do not accumulate.
+    """
+
+    def __init__(
+        self, database: Path, *, prune_every: int = _DEFAULT_PRUNE_EVERY
+    ) -> None:
+        self._database = database
+        self._prune_every = prune_every
+        self._local = threading.local()
+
+    def take(self, key: str, rate: Rate, now: float) -> float:
+        conn = self._connection()
+        self._local.takes += 1
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM token_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row is not None else (rate.capacity, now)
+            tokens, wait = rate.take(tokens, now - updated)
+            full_at = now + (rate.capacity - tokens) * rate.period / rate.capacity
+            conn.execute(
+                "INSERT OR REPLACE INTO token_buckets VALUES (?, ?, ?, ?)",
+                (key, tokens, now, full_at),
+            )
+            if self._local.takes % self._prune_every == 0:
+                conn.execute("DELETE FROM token_buckets WHERE full_at <= ?", (now,))
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        return wait
+
+    def _connection(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            # Transactions are managed explicitly in take().
+            conn = sqlite3.connect(self._database, isolation_level=None, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SQLITE_SCHEMA)
+            self._local.conn = conn
+            self._local.takes = 0
+        return conn
+
+
+class LookupThrottle:
+    """Per-client and per-order limits on lookup attempts."""
+
+    def __init__(
+        self,
+        store: BucketStore,
+        *,
+        per_client: Rate | None,
+        per_order: Rate | None,
+    ) -> None:
+        self._store = store
+        self._per_client = per_client
+        self._per_order = per_order
+
+    def check(
+        self, client: str, order_number: object, *, now: float | None = None
+    ) -> float:
+        """Count an attempt; return 0.0 if allowed, else seconds to wait.
+
+        *order_number* is the raw, unvalidated input; anything but a string
+        is only counted against the client.
+        """
+        if now is None:
+            now = time.time()
+        if self._per_client is not None:
+            wait = self._store.take(f"client:{client}", self._per_client, now)
+            if wait:
+                return wait
+        if self._per_order is not None and isinstance(order_number, str):
+            key = "".join(order_number[:_MAX_ORDER_NUMBER].split()).casefold()
+            if key:
+                return self._store.take(f"order:{key}", self._per_order, now)
+        return 0.0
+
+
+def client_ident(meta: Mapping[str, Any]) -> str:
+    """Return the client address of a request, given its ``META``."""
+    remote_addr = str(meta.get("REMOTE_ADDR", ""))
+    proxies = getattr(settings, "RETURNS_TRUSTED_PROXIES", 0)
+    forwarded = meta.get("HTTP_X_FORWARDED_FOR")
+    if not proxies or not forwarded:
+        return remote_addr
+    addrs = [addr.strip() for addr in str(forwarded).split(",")]
+    # Each trusted proxy appends the address it received the request from.
+    return addrs[-min(proxies, len(addrs))] or remote_addr
+
+
+def _rate(name: str, default: str) -> Rate | None:
+    value = getattr(settings, name, default)
+    return None if value is None else Rate.parse(value)
+
+
+@functools.cache
+def get_lookup_throttle() -> LookupThrottle:
+    """Return the process-wide throttle configured in the settings."""
+    name = getattr(settings, "RETURNS_THROTTLE_BACKEND", "memory")
+    store: BucketStore
+    if name == "memory":
+        store = MemoryBucketStore()
+    elif name == "sqlite":
+        store = SqliteBucketStore(Path(settings.RETURNS_THROTTLE_DB))
+    elif "." in name:
+        store = import_string(name)()
+    else:
+        raise ImproperlyConfigured(f"Unknown RETURNS_THROTTLE_BACKEND {name!r}")
+    try:
+        return LookupThrottle(
+            store,
+            per_client=_rate("RETURNS_LOOKUP_RATE_PER_CLIENT", "20/min"),
+            per_order=_rate("RETURNS_LOOKUP_RATE_PER_ORDER", "10/min"),
+        )
+    except ValueError as exc:
+        raise ImproperlyConfigured(str(exc)) from exc
@@ -2,12 +2,24 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterator
+
 import pytest
 
+from portal.services.throttle import get_lookup_throttle
+
 RawOrder = dict[str, object]
 RawArticle = dict[str, object]
 
 
+@pytest.fixture(autouse=True)
+def _fresh_lookup_throttle() -> Iterator[None]:
+    """Give every test empty lookup buckets."""
+    get_lookup_throttle.cache_clear()
+    yield
+    get_lookup_throttle.cache_clear()
+
+
 def _make_raw_order(**overrides: object) -> dict[str, object]:
     """Create a raw order dict with sensible defaults."""
     base: RawOrder = {
@@ -0,0 +1,227 @@
+"""Tests for the eligibility backfill behind ``manage.py evaluate_all``."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from portal.services.backfill import (
+    JsonlResultWriter,
+    Progress,
+    SqliteResultWriter,
+    evaluate_all,
+)
+from portal.services.order_delta import delta_path_for
+from portal.services.order_store import JsonOrderStore
+from portal.services.rules import RULES_PATH, compile_rules, load_rules
+from portal.tests.conftest import _make_raw_article, _make_raw_order
+
+NOW = datetime(2025, 12, 20)
+
+
+class _InterruptedError(Exception):
+    pass
+
+
+@pytest.fixture()
+def source(tmp_path: Path) -> Path:
+    orders = [
+        _make_raw_order(
+            order_number=f"E-{i:03d}",
+            delivered_at="2025-12-01T10:00:00Z",
+            articles=[
+                _make_raw_article(sku=f"SKU-{i}-{j}", quantity_returned=j % 2)
+                for j in range(1 + i % 3)
+            ],
+        )
+        for i in range(25)
+    ]
+    orders.insert(7, {"no_number": True})
+    path = tmp_path / "orders_raw.json"
+    path.write_text(json.dumps({"orders": orders}))
+    return path
+
+
+def _append_deltas(source: Path, *deltas: dict[str, object]) -> None:
+    with delta_path_for(source).open("a") as f:
+        for delta in deltas:
+            f.write(json.dumps(delta) + "\n")
+
+
+def _read_jsonl(path: Path) -> list[dict[str, object]]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def _interrupt_after(chunks: int) -> Callable[[Progress], None]:
+    def on_progress(progress: Progress) -> None:
+        if progress.orders >= chunks * 4:
+            raise _InterruptedError
+
+    return on_progress
+
+
+class TestEvaluateAll:
+    def test_writes_one_row_per_article(self, source: Path, tmp_path: Path) -> None:
+        output = tmp_path / "out.jsonl"
+        ruleset = load_rules(RULES_PATH)
+        writer = JsonlResultWriter(output)
+        total = evaluate_all(source, writer, ruleset=ruleset, now=NOW, chunk_size=4)
+        writer.close()
+
+        rows = _read_jsonl(output)
+        assert total.orders == 26
+        assert total.articles == len(rows) == sum(1 + i % 3 for i in range(25))
+        assert rows[0]["order_number"] == "E-000"
+        assert rows[0]["ruleset_version"] == ruleset.version
+        returned = [r for r in rows if r["line"] == 1]
+        assert all(r["matched_rule"] == "fully-returned" for r in returned)
+
+    def test_workers_match_serial_run(self, source: Path, tmp_path: Path) -> None:
+        ruleset = load_rules(RULES_PATH)
+        outputs = []
+        for workers in (1, 2):
+            output = tmp_path / f"out-{workers}.jsonl"
+            writer = JsonlResultWriter(output)
+            evaluate_all(
+                source, writer, ruleset=ruleset, now=NOW, workers=workers, chunk_size=3
+            )
+            writer.close()
+            outputs.append(output.read_text())
+        assert outputs[0] == outputs[1]
+
+    def test_resumes_jsonl_from_checkpoint(self, source: Path, tmp_path: Path) -> None:
+        ruleset = load_rules(RULES_PATH)
+        expected = tmp_path / "expected.jsonl"
+        writer = JsonlResultWriter(expected)
+        evaluate_all(source, writer, ruleset=ruleset, now=NOW, chunk_size=4)
+        writer.close()
+
+        output = tmp_path / "out.jsonl"
+        writer = JsonlResultWriter(output)
+        with pytest.raises(_InterruptedError):
+            evaluate_all(
+                source,
+                writer,
+                ruleset=ruleset,
+                now=NOW,
+                chunk_size=4,
+                on_progress=_interrupt_after(2),
+            )
+        writer.close()
+        # A torn write after the last checkpoint is discarded on resume.
+        with output.open("a") as f:
+            f.write('{"order_number": "torn')
+
+        writer = JsonlResultWriter(output)
+        rest = evaluate_all(source, writer, ruleset=ruleset, chunk_size=4, resume=True)
+        writer.close()
+
+        assert rest.orders == 26 - 8
+        assert output.read_text() == expected.read_text()
+
+    def test_resumes_sqlite_from_checkpoint(self, source: Path, tmp_path: Path) -> None:
+        ruleset = load_rules(RULES_PATH)
+        output = tmp_path / "out.sqlite3"
+        writer = SqliteResultWriter(output)
+        with pytest.raises(_InterruptedError):
+            evaluate_all(
+                source,
+                writer,
+                ruleset=ruleset,
+                now=NOW,
+                chunk_size=4,
+                on_progress=_interrupt_after(3),
+            )
+        writer.close()
+
+        writer = SqliteResultWriter(output)
+        checkpoint = writer.checkpoint()
+        assert checkpoint is not None and checkpoint.now == NOW
+        rest = evaluate_all(source, writer, ruleset=ruleset, chunk_size=4, resume=True)
+        writer.close()
+
+        assert rest.orders == 26 - 12
+        conn = sqlite3.connect(output)
+        count = conn.execute("SELECT COUNT(*) FROM eligibility").fetchone()[0]
+        conn.close()
+        assert count == sum(1 + i % 3 for i in range(25))
+
+    def test_refuses_to_resume_with_other_ruleset(
+        self, source: Path, tmp_path: Path
+    ) -> None:
+        output = tmp_path / "out.jsonl"
+        writer = JsonlResultWriter(output)
+        evaluate_all(source, writer, ruleset=load_rules(RULES_PATH), now=NOW)
+        writer.close()
+
+        other = compile_rules({"rules": [{"id": "w", "window_days": 1}]}, version="x")
+        with pytest.raises(ValueError, match="ruleset"):
+            evaluate_all(source, JsonlResultWriter(output), ruleset=other, resume=True)
+
+    def test_applies_delta_feed(self, source: Path, tmp_path: Path) -> None:
+        article = _make_raw_article(sku="NEW-SKU")
+        _append_deltas(
+            source,
+            {
+                "order_number": "E-001",
+                "articles": {"SKU-1-0": {"quantity_returned": 1}},
+            },
+            {"order_number": "E-002", "set": {"email": "new@example.com"}},
+            {"order_number": "NEW-1", "order": _make_raw_order(articles=[article])},
+            {"order_number": "GONE", "set": {"email": "ignored@example.com"}},
+        )
+        output = tmp_path / "out.jsonl"
+        writer = JsonlResultWriter(output)
+        total = evaluate_all(
+            source, writer, ruleset=load_rules(RULES_PATH), now=NOW, chunk_size=4
+        )
+        writer.close()
+
+        rows = _read_jsonl(output)
+        # The feed-only orders follow the file; GONE never existed.
+        assert total.orders == 28
+        assert rows[-1]["order_number"] == "NEW-1"
+        by_line = {(r["order_number"], r["line"]): r for r in rows}
+        assert by_line["E-001", 0]["matched_rule"] == "fully-returned"
+        store = JsonOrderStore(source)
+        for number in ("E-000", "E-001", "E-002", "NEW-1"):
+            record = store.get(number)
+            assert record is not None
+            assert by_line[number, 0]["order_version"] == record.version
+
+    def test_resume_ignores_later_deltas(self, source: Path, tmp_path: Path) -> None:
+        ruleset = load_rules(RULES_PATH)
+        expected = tmp_path / "expected.jsonl"
+        writer = JsonlResultWriter(expected)
+        evaluate_all(source, writer, ruleset=ruleset, now=NOW, chunk_size=4)
+        writer.close()
+
+        output = tmp_path / "out.jsonl"
+        writer = JsonlResultWriter(output)
+        with pytest.raises(_InterruptedError):
+            evaluate_all(
+                source,
+                writer,
+                ruleset=ruleset,
+                now=NOW,
+                chunk_size=4,
+                on_progress=_interrupt_after(2),
+            )
+        writer.close()
+        article = _make_raw_article(sku="NEW-SKU")
+        _append_deltas(
+            source,
+            {"order_number": "E-020", "set": {"email": "later@example.com"}},
+            {"order_number": "NEW-1", "order": _make_raw_order(articles=[article])},
+        )
+
+        writer = JsonlResultWriter(output)
+        evaluate_all(source, writer, ruleset=ruleset, chunk_size=4, resume=True)
+        writer.close()
+
+        assert output.read_text() == expected.read_text()
@@ -6,11 +6,24 @@ that cover your rules and edge cases.
 
 from __future__ import annotations
 
+import json
+from collections.abc import Sequence
 from datetime import datetime, timedelta
-from typing import TypedDict, Unpack
+from pathlib import Path
+from typing import Any, TypedDict, Unpack
 
-from portal.services.eligibility import evaluate_eligibility
-from portal.types import Article, Order
+import pytest
+
+from portal.services.eligibility import (
+    _cache,
+    cached_evaluation,
+    evaluate_cached,
+    evaluate_eligibility,
+    evaluate_order,
+)
+from portal.services.eligibility_trace import EligibilityTracer, rule_stats
+from portal.services.rules import compile_rules, get_rules_source
+from portal.types import Article, ArticleTable, Order
 
 
 class _ArticleData(TypedDict):
@@ -36,7 +49,7 @@ class _ArticleOverrides(TypedDict, total=False):
 
 
 def _make_order(
-    articles: list[Article],
+    articles: Sequence[Article],
     delivery_date: datetime | None = None,
 ) -> Order:
     return Order(
@@ -135,3 +148,297 @@ class TestRegularItem:
         )
         results = evaluate_eligibility(order)
         assert results[0].returnable is True
+
+
+class TestFinalSale:
+    """Final-sale items should not be returnable."""
+
+    def test_final_sale_item_is_not_returnable(self) -> None:
+        order = _make_order(
+            delivery_date=datetime.now() - timedelta(days=5),
+            articles=[_make_article(is_final_sale=True)],
+        )
+        result = evaluate_eligibility(order)[0]
+        assert result.returnable is False
+        assert result.matched_rule == "final-sale"
+        assert result.reason
+
+
+class TestCategoryWindows:
+    """Categories can override the default return window."""
+
+    @pytest.mark.parametrize(
+        ("category", "days_ago", "returnable"),
+        [
+            ("electronics", 13, True),
+            ("electronics", 15, False),
+            ("apparel", 29, True),
+            ("apparel", 31, False),
+            ("unconfigured", 29, True),
+            ("unconfigured", 31, False),
+        ],
+    )
+    def test_window_per_category(
+        self, category: str, days_ago: int, returnable: bool
+    ) -> None:
+        order = _make_order(
+            delivery_date=datetime.now() - timedelta(days=days_ago),
+            articles=[_make_article(category=category)],
+        )
+        assert evaluate_eligibility(order)[0].returnable is returnable
+
+    def test_reports_window_rule(self) -> None:
+        order = _make_order(
+            delivery_date=datetime(2025, 1, 1),
+            articles=[_make_article(category="electronics")],
+        )
+        result = evaluate_eligibility(order, now=datetime(2025, 1, 16))[0]
+        assert result.matched_rule == "window-electronics"
+        assert result.reason == "The 14-day return window has ended."
+
+    def test_window_ends_exactly_after_configured_days(self) -> None:
+        order = _make_order(
+            delivery_date=datetime(2025, 1, 1),
+            articles=[_make_article(category="electronics")],
+        )
+        last = datetime(2025, 1, 15)
+        assert evaluate_eligibility(order, now=last)[0].returnable is True
+        after = last + timedelta(microseconds=1)
+        assert evaluate_eligibility(order, now=after)[0].returnable is False
+
+
+class TestReturnableResult:
+    def test_returnable_has_no_rule_or_reason(self) -> None:
+        order = _make_order(
+            delivery_date=datetime.now() - timedelta(days=5),
+            articles=[_make_article()],
+        )
+        result = evaluate_eligibility(order)[0]
+        assert (result.reason, result.matched_rule) == ("", "")
+
+
+class TestCustomRuleset:
+    def test_many_rules_only_matching_ones_apply(self) -> None:
+        rules = [
+            {"id": f"cat-{i}", "when": {"category": f"cat-{i}"}, "window_days": i}
+            for i in range(500)
+        ]
+        ruleset = compile_rules({"rules": [*rules, {"id": "d", "window_days": 1}]})
+        order = _make_order(
+            delivery_date=datetime(2025, 1, 1),
+            articles=[
+                _make_article(category="cat-250"),
+                _make_article(category="cat-2"),
+                _make_article(category="other"),
+            ],
+        )
+        results = evaluate_eligibility(
+            order, now=datetime(2025, 1, 10), ruleset=ruleset
+        )
+        assert [r.matched_rule for r in results] == ["", "cat-2", "d"]
+
+
+class TestArticleTable:
+    def test_table_matches_object_evaluation(self) -> None:
+        articles = [
+            _make_article(
+                sku=f"SKU-{i}",
+                category=("electronics", "apparel", "misc")[i % 3],
+                is_digital=i % 4 == 0,
+                is_final_sale=i % 5 == 0,
+                quantity=2,
+                quantity_returned=i % 3,
+            )
+            for i in range(60)
+        ]
+        order = _make_order(delivery_date=datetime(2025, 1, 1), articles=articles)
+        table_order = _make_order(
+            delivery_date=datetime(2025, 1, 1),
+            articles=ArticleTable.from_articles(articles),
+        )
+        now = datetime(2025, 1, 20)
+        assert list(evaluate_eligibility(table_order, now=now)) == list(
+            evaluate_eligibility(order, now=now)
+        )
+
+
+class TestValidUntil:
+    NOW = datetime(2025, 1, 10)
+
+    def test_earliest_open_window_end(self) -> None:
+        order = _make_order(
+            delivery_date=datetime(2025, 1, 1),
+            articles=[
+                _make_article(category="apparel"),
+                _make_article(category="electronics"),
+            ],
+        )
+        evaluation = evaluate_order(order, now=self.NOW)
+        assert evaluation.valid_until == datetime(2025, 1, 15)
+        assert evaluation.is_valid(datetime(2025, 1, 15))
+        assert not evaluation.is_valid(datetime(2025, 1, 15, 0, 0, 1))
+
+    def test_closed_windows_do_not_limit_validity(self) -> None:
+        order = _make_order(
+            delivery_date=datetime(2025, 1, 1),
+            articles=[
+                _make_article(category="electronics"),
+                _make_article(category="apparel"),
+            ],
+        )
+        evaluation = evaluate_order(order, now=datetime(2025, 1, 20))
+        assert evaluation.valid_until == datetime(2025, 1, 31)
+
+    def test_final_results_never_expire(self) -> None:
+        order = _make_order(
+            delivery_date=datetime(2025, 1, 1),
+            articles=[_make_article(is_digital=True)],
+        )
+        evaluation = evaluate_order(order, now=datetime(2025, 6, 1))
+        assert evaluation.valid_until is None
+
+    def test_result_stays_identical_until_valid_until(self) -> None:
+        order = _make_order(
+            delivery_date=datetime(2025, 1, 1),
+            articles=[
+                _make_article(category="electronics", is_final_sale=True),
+                _make_article(category="apparel"),
+            ],
+        )
+        evaluation = evaluate_order(order, now=self.NOW)
+        assert evaluation.valid_until is not None
+        assert evaluate_order(order, now=evaluation.valid_until) == evaluation
+        later = evaluation.valid_until + timedelta(microseconds=1)
+        assert evaluate_order(order, now=later).results != evaluation.results
+
+
+class TestEvaluateCached:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self) -> None:
+        _cache.clear()
+
+    def test_reuses_result_for_same_versions(self) -> None:
+        order = _make_order(
+            delivery_date=datetime.now() - timedelta(days=5),
+            articles=[_make_article()],
+        )
+        first = evaluate_cached(order, "v1")
+        assert evaluate_cached(order, "v1") is first
+        assert cached_evaluation(order.order_number, "v1") is first
+        assert cached_evaluation(order.order_number, "v2") is None
+        assert evaluate_cached(order, "v2") is not first
+
+    def test_expires_at_valid_until(self) -> None:
+        order = _make_order(
+            delivery_date=datetime(2025, 1, 1),
+            articles=[_make_article(category="electronics")],
+        )
+        first = evaluate_cached(order, "v1", now=datetime(2025, 1, 10))
+        assert first.results[0].returnable is True
+        assert evaluate_cached(order, "v1", now=datetime(2025, 1, 15)) is first
+
+        expired = evaluate_cached(order, "v1", now=datetime(2025, 1, 16))
+        assert expired.results[0].returnable is False
+
+    def test_ruleset_change_invalidates(self, tmp_path: Path, settings: Any) -> None:
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps({"rules": [{"id": "w", "window_days": 30}]}))
+        settings.RETURNS_RULES_PATH = path
+        get_rules_source.cache_clear()
+        try:
+            order = _make_order(
+                delivery_date=datetime.now() - timedelta(days=5),
+                articles=[_make_article()],
+            )
+            first = evaluate_cached(order, "v1")
+
+            path.write_text(json.dumps({"rules": [{"id": "w", "window_days": 3}]}))
+            get_rules_source().reload()
+
+            second = evaluate_cached(order, "v1")
+            assert second.ruleset_version != first.ruleset_version
+            assert second.results[0].matched_rule == "w"
+        finally:
+            get_rules_source.cache_clear()
+
+
+class TestTracing:
+    ARTICLES: list[_ArticleOverrides] = [
+        {"category": "electronics", "is_final_sale": True},
+        {"category": "apparel"},
+        {"is_digital": True},
+        {"quantity": 1, "quantity_returned": 1},
+    ]
+
+    def _order(self, table: bool = False) -> Order:
+        articles = [_make_article(**overrides) for overrides in self.ARTICLES]
+        return _make_order(
+            delivery_date=datetime(2025, 1, 1),
+            articles=ArticleTable.from_articles(articles) if table else articles,
+        )
+
+    @pytest.mark.parametrize("table", [False, True])
+    def test_traced_results_match(self, table: bool) -> None:
+        order = self._order(table)
+        for now in (datetime(2025, 1, 10), datetime(2025, 1, 20)):
+            traced = evaluate_order(order, now=now, tracer=EligibilityTracer())
+            plain = evaluate_order(order, now=now)
+            assert list(traced.results) == list(plain.results)
+            assert traced.valid_until == plain.valid_until
+
+    def test_records_rules_consulted_per_article(self) -> None:
+        tracer = EligibilityTracer()
+        evaluate_order(self._order(), now=datetime(2025, 1, 20), tracer=tracer)
+
+        steps = [[(s.rule, s.rejected) for s in a.steps] for a in tracer.articles]
+        assert [a.line for a in tracer.articles] == [0, 1, 2, 3]
+        assert steps == [
+            [("final-sale", True)],
+            [("window-apparel", False)],
+            [("digital", True)],
+            [("fully-returned", True)],
+        ]
+        assert all(a.plan_ns >= 0 for a in tracer.articles)
+        assert all(s.elapsed_ns >= 0 for a in tracer.articles for s in a.steps)
+
+    def test_times_each_rule_check(self) -> None:
+        ruleset = compile_rules(
+            {
+                "rules": [
+                    {"id": "window", "window_days": 30},
+                    {"id": "deny", "reason": "No returns."},
+                ]
+            }
+        )
+        rule_stats.reset()
+        tracer = EligibilityTracer()
+        evaluate_order(
+            self._order(), now=datetime(2025, 1, 10), ruleset=ruleset, tracer=tracer
+        )
+
+        (article, *_) = tracer.articles
+        assert [(s.rule, s.rejected) for s in article.steps] == [
+            ("window", False),
+            ("deny", True),
+        ]
+        counters = {c.rule: c for c in rule_stats.snapshot()}
+        for rule in ("window", "deny"):
+            assert counters[rule].total_ns == sum(
+                s.elapsed_ns for a in tracer.articles for s in a.steps if s.rule == rule
+            )
+
+    def test_updates_process_counters(self) -> None:
+        rule_stats.reset()
+        for _ in range(3):
+            evaluate_order(
+                self._order(), now=datetime(2025, 1, 20), tracer=EligibilityTracer()
+            )
+        counters = {c.rule: c for c in rule_stats.snapshot()}
+        assert counters["window-apparel"].evaluations == 3
+        assert counters["window-apparel"].hits == 0
+        assert counters["digital"].hits == 3
+
+    def test_untraced_evaluations_are_not_counted(self) -> None:
+        rule_stats.reset()
+        evaluate_order(self._order())
+        assert rule_stats.snapshot() == []
@@ -0,0 +1,103 @@
+"""The vectorised evaluator must agree with the scalar engine row for row."""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from portal.services.eligibility import evaluate_eligibility
+from portal.services.rules import RULES_PATH, Ruleset, compile_rules, load_rules
+from portal.types import Article, Order
+
+pytest.importorskip("numpy")
+
+from portal.services.eligibility_batch import (  # noqa: E402
+    ArticleColumns,
+    evaluate_columns,
+)
+
+NOW = datetime(2025, 3, 1, 12, 0)
+CATEGORIES = ["apparel", "Electronics", "footwear", "digital", "", "cat-3", "cat-120"]
+
+
+def _random_orders(seed: int, count: int) -> list[Order]:
+    rng = random.Random(seed)
+    orders = []
+    for i in range(count):
+        quantity = rng.randint(1, 3)
+        articles = [
+            Article(
+                sku=f"SKU-{i}-{j}",
+                name="Article",
+                quantity=quantity,
+                quantity_returned=rng.randint(0, quantity),
+                price=9.99,
+                is_digital=rng.random() < 0.2,
+                is_final_sale=rng.random() < 0.2,
+                category=rng.choice(CATEGORIES),
+            )
+            for j in range(rng.randint(0, 4))
+        ]
+        # Deliveries cluster around the window ends to hit the boundaries.
+        delivered = NOW - timedelta(days=rng.choice([5, 14, 15, 30, 31, 90]))
+        delivered += timedelta(microseconds=rng.choice([-1, 0, 1]))
+        orders.append(
+            Order(
+                order_number=f"B-{i}",
+                email="b@example.com",
+                recipient="B",
+                zip="10115",
+                street="Street 1",
+                city="Berlin",
+                order_date=delivered - timedelta(days=2),
+                delivery_date=delivered,
+                articles=articles,
+            )
+        )
+    return orders
+
+
+def _assert_matches_scalar(orders: list[Order], ruleset: Ruleset) -> None:
+    columns = ArticleColumns.from_orders(orders)
+    batch = evaluate_columns(columns, now=NOW, ruleset=ruleset)
+    expected = [
+        result
+        for order in orders
+        for result in evaluate_eligibility(order, now=NOW, ruleset=ruleset)
+    ]
+    assert len(columns) == len(expected)
+    for row, result in enumerate(expected):
+        assert bool(batch.returnable[row]) is result.returnable
+        assert batch.matched_rule(row) == result.matched_rule
+        assert batch.reason(row) == result.reason
+
+
+class TestEvaluateColumns:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_scalar_engine(self, seed: int) -> None:
+        _assert_matches_scalar(_random_orders(seed, 200), load_rules(RULES_PATH))
+
+    def test_matches_scalar_engine_with_many_rules(self) -> None:
+        rules: list[dict[str, object]] = [
+            {"id": f"w-{i}", "when": {"category": f"cat-{i}"}, "window_days": i}
+            for i in range(200)
+        ]
+        rules[50:50] = [
+            {"id": "sale", "when": {"is_final_sale": True}, "reason": "sale"},
+            {
+                "id": "digital-apparel",
+                "when": {"is_digital": True, "category": ["apparel", "digital"]},
+                "reason": "digital",
+            },
+            {"id": "open", "when": {"fully_returned": False}, "window_days": 15},
+        ]
+        ruleset = compile_rules({"rules": [*rules, {"id": "d", "window_days": 30}]})
+        _assert_matches_scalar(_random_orders(42, 200), ruleset)
+
+    def test_empty_input(self) -> None:
+        batch = evaluate_columns(
+            ArticleColumns.from_orders([]), now=NOW, ruleset=load_rules(RULES_PATH)
+        )
+        assert len(batch.rule) == 0
@@ -2,7 +2,16 @@
 
 from typing import Any
 
-from portal.services.mapper import map_order
+import pytest
+
+from portal.services.mapper import (
+    ARTICLE_TABLE_MIN_LINES,
+    map_order,
+    map_order_lazy,
+    map_orders,
+)
+from portal.services.order_generator import generate_orders
+from portal.types import ArticleTable, LazyOrder
 
 
 class TestMapOrderBasicFields:
@@ -71,3 +80,106 @@ class TestMapArticleMissingFields:
         order = map_order(raw_order_1001)
         ebook = order.articles[1]  # EBOOK-RETURNS
         assert ebook.category == "digital"
+
+
+class TestMapOrders:
+    def test_matches_map_order(
+        self,
+        raw_order_1001: dict[str, Any],
+        raw_order_1002: dict[str, Any],
+        raw_order_1003: dict[str, Any],
+    ) -> None:
+        raws = [raw_order_1001, raw_order_1002, raw_order_1003] * 3
+        assert list(map_orders(raws, chunk_size=2)) == [map_order(r) for r in raws]
+
+    def test_process_pool_matches_map_order(self) -> None:
+        raws = list(generate_orders(50, seed=5, articles=2))
+        mapped = list(map_orders(raws, workers=2, chunk_size=7))
+        assert mapped == [map_order(r) for r in raws]
+
+    def test_empty_input(self) -> None:
+        assert list(map_orders([], workers=2)) == []
+
+
+def _shape_variants() -> list[dict[str, Any]]:
+    customer = {
+        "first_name": "Ada",
+        "last_name": "",
+        "address_line": "Main St 1",
+        "address_line_extra": 7,
+        "postal_code": 10115,
+        "city": "Berlin",
+    }
+    article = {"sku": 42, "name": None, "quantity": True, "price": 5}
+    variants: list[dict[str, Any]] = []
+    for recipient in (None, "", "Top Level", 3.5):
+        for with_customer in (False, True):
+            for fulfillments in (None, [], [{"delivered_at": "2025-12-06T08:00:00Z"}]):
+                raw: dict[str, Any] = {
+                    "order_number": 1001,
+                    "order_date": "2025-12-01T10:00:00+01:00",
+                    "articles": [article, "not-a-dict", {"quantity": 2.9}],
+                    "delivered_at": "2025-12-04T10:00:00Z",
+                    "zip": "",
+                }
+                if recipient is not None:
+                    raw["recipient"] = raw["street"] = raw["city"] = recipient
+                if with_customer:
+                    raw["customer"] = customer
+                if fulfillments is not None:
+                    raw["fulfillments"] = fulfillments
+                variants.append(raw)
+    return variants
+
+
+class TestMappingPaths:
+    """``map_order``, ``map_orders`` and ``map_order_lazy`` agree."""
+
+    @pytest.mark.parametrize("raw", _shape_variants())
+    def test_shape_variants(self, raw: dict[str, Any]) -> None:
+        order = map_order(raw)
+
+        assert list(map_orders([raw])) == [order]
+        assert map_order_lazy(raw) == order
+
+    def test_generated_orders(self) -> None:
+        raws = list(generate_orders(3000, seed=11))
+        orders = [map_order(raw) for raw in raws]
+
+        assert list(map_orders(raws, chunk_size=256)) == orders
+        assert [map_order_lazy(raw) for raw in raws] == orders
+        assert any(isinstance(order.articles, ArticleTable) for order in orders)
+
+    def test_large_orders_map_to_article_table(self) -> None:
+        (raw,) = generate_orders(1, articles=ARTICLE_TABLE_MIN_LINES)
+        order = map_order(raw)
+        assert isinstance(order.articles, ArticleTable)
+        assert isinstance(map_order_lazy(raw).articles, ArticleTable)
+        assert list(order.articles) == list(map_order_lazy(raw).articles)
+
+
+class TestMapOrderLazy:
+    def test_equals_eager_mapping(
+        self, raw_order_1001: dict[str, Any], raw_order_1003: dict[str, Any]
+    ) -> None:
+        for raw in (raw_order_1001, raw_order_1003):
+            lazy = map_order_lazy(raw)
+            assert lazy == map_order(raw)
+            assert map_order(raw) == lazy
+
+    def test_articles_are_mapped_on_first_access(
+        self, raw_order_1001: dict[str, Any]
+    ) -> None:
+        lazy = map_order_lazy(raw_order_1001)
+        assert isinstance(lazy, LazyOrder)
+        assert lazy.order_number == "RMA-1001"
+        assert not lazy.is_loaded("articles")
+        assert not lazy.is_loaded("delivery_date")
+
+        assert lazy.articles[0].sku == "TSHIRT-BLK-M"
+        assert lazy.is_loaded("articles")
+        assert lazy.articles is lazy.articles
+
+    def test_invalid_header_fails_eagerly(self) -> None:
+        with pytest.raises(ValueError):
+            map_order_lazy({"order_number": "X", "order_date": "not-a-date"})
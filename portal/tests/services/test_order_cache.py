@@ -0,0 +1,95 @@
+"""Tests for the mapped-order LRU cache."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from portal.services.mapper import map_order, map_order_lazy
+from portal.services.order_cache import OrderCache, _estimate_size
+from portal.tests.conftest import _make_raw_article, _make_raw_order
+from portal.types import Order
+
+
+def _raw(order_number: str, articles: int) -> dict[str, Any]:
+    return _make_raw_order(
+        order_number=order_number,
+        articles=[_make_raw_article(sku=f"SKU-{i}") for i in range(articles)],
+    )
+
+
+def _order(order_number: str, articles: int = 1) -> Order:
+    return map_order(_raw(order_number, articles))
+
+
+class TestOrderCache:
+    def test_hit_after_put(self) -> None:
+        cache = OrderCache()
+        order = _order("C-1")
+        cache.put("C-1", "v1", order)
+
+        assert cache.get("C-1", "v1") is order
+        stats = cache.stats()
+        assert (stats.hits, stats.misses) == (1, 0)
+
+    def test_version_change_is_a_miss_and_drops_entry(self) -> None:
+        cache = OrderCache()
+        cache.put("C-1", "v1", _order("C-1"))
+
+        assert cache.get("C-1", "v2") is None
+        assert cache.get("C-1", "v1") is None
+        assert cache.stats().entries == 0
+
+    def test_evicts_least_recently_used_by_count(self) -> None:
+        cache = OrderCache(max_entries=2)
+        cache.put("C-1", "v", _order("C-1"))
+        cache.put("C-2", "v", _order("C-2"))
+        cache.get("C-1", "v")
+        cache.put("C-3", "v", _order("C-3"))
+
+        assert cache.get("C-2", "v") is None
+        assert cache.get("C-1", "v") is not None
+        assert cache.stats().evictions == 1
+
+    def test_evicts_by_byte_budget(self) -> None:
+        small = _order("C-1")
+        budget = _estimate_size(small) * 2 + 1
+        cache = OrderCache(max_bytes=budget)
+        cache.put("C-1", "v", small)
+        cache.put("C-2", "v", _order("C-2"))
+        cache.put("C-3", "v", _order("C-3"))
+
+        stats = cache.stats()
+        assert stats.entries == 2
+        assert stats.bytes <= budget
+        assert cache.get("C-1", "v") is None
+
+    def test_oversized_order_is_not_cached(self) -> None:
+        cache = OrderCache(max_bytes=_estimate_size(_order("C-1")))
+        cache.put("C-2", "v", _order("C-2", articles=50))
+        assert cache.stats().entries == 0
+
+    def test_invalidate(self) -> None:
+        cache = OrderCache()
+        cache.put("C-1", "v", _order("C-1"))
+        cache.invalidate("C-1")
+        assert cache.get("C-1", "v") is None
+
+    def test_lazy_articles_are_charged_when_loaded(self) -> None:
+        loaded = _estimate_size(map_order(_raw("C-1", 200)))
+        cache = OrderCache(max_bytes=loaded + loaded // 2)
+        first = map_order_lazy(_raw("C-1", 200))
+        second = map_order_lazy(_raw("C-2", 200))
+        cache.put("C-1", "v", first)
+        cache.put("C-2", "v", second)
+        assert cache.stats().evictions == 0
+
+        assert len(first.articles) == 200
+        assert cache.stats().bytes == _estimate_size(first) + _estimate_size(second)
+        assert _estimate_size(first) > loaded // 2
+        assert len(second.articles) == 200
+
+        stats = cache.stats()
+        assert stats.evictions == 1
+        assert stats.bytes <= loaded + loaded // 2
+        assert cache.get("C-1", "v") is None
+        assert cache.get("C-2", "v") is second
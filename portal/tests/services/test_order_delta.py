@@ -0,0 +1,169 @@
+"""Tests for applying the order delta feed."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from portal.services.order_delta import delta_path_for, read_deltas
+from portal.services.order_store import JsonOrderStore
+from portal.tests.conftest import _make_raw_article, _make_raw_order
+
+
+def _append(path: Path, *deltas: dict[str, Any], newline: bool = True) -> None:
+    with path.open("a") as f:
+        f.write("\n".join(json.dumps(d) for d in deltas))
+        if newline:
+            f.write("\n")
+
+
+@pytest.fixture()
+def base(tmp_path: Path) -> Path:
+    path = tmp_path / "orders_raw.json"
+    order = _make_raw_order(
+        order_number="D-1",
+        email="d1@example.com",
+        articles=[_make_raw_article(sku="A"), _make_raw_article(sku="B")],
+    )
+    path.write_text(json.dumps({"orders": [order]}))
+    return path
+
+
+@pytest.fixture()
+def store(base: Path) -> JsonOrderStore:
+    return JsonOrderStore(base, check_interval=0)
+
+
+class TestReadDeltas:
+    def test_partial_trailing_line_is_deferred(self, tmp_path: Path) -> None:
+        path = tmp_path / "feed.jsonl"
+        _append(path, {"order_number": "D-1"})
+        _append(path, {"order_number": "D-2"}, newline=False)
+
+        deltas, offset = read_deltas(path)
+
+        assert [d.order_number for d in deltas] == ["D-1"]
+        assert read_deltas(path, offset)[0] == []
+
+    def test_malformed_lines_are_skipped(self, tmp_path: Path) -> None:
+        path = tmp_path / "feed.jsonl"
+        path.write_text('{"order_number": \n[1]\n{"set": {}}\n')
+        _append(path, {"order_number": "D-1"})
+
+        deltas, offset = read_deltas(path)
+
+        assert [d.order_number for d in deltas] == ["D-1"]
+        assert offset == path.stat().st_size
+
+    def test_missing_feed(self, tmp_path: Path) -> None:
+        assert read_deltas(tmp_path / "missing.jsonl", 7) == ([], 7)
+
+
+class TestJsonOrderStoreDeltas:
+    def test_article_update_changes_record_and_version(
+        self, base: Path, store: JsonOrderStore
+    ) -> None:
+        before = store.get("D-1")
+        assert before is not None
+
+        _append(
+            delta_path_for(base),
+            {"order_number": "D-1", "articles": {"B": {"quantity_returned": 1}}},
+        )
+
+        after = store.get("D-1")
+        assert after is not None
+        assert after.version != before.version
+        assert [a["quantity_returned"] for a in after.raw["articles"]] == [0, 1]
+        assert [a["quantity_returned"] for a in before.raw["articles"]] == [0, 0]
+
+    def test_fulfillments_are_appended(self, base: Path, store: JsonOrderStore) -> None:
+        store.get("D-1")
+        fulfillment = {"carrier": "UPS", "delivered_at": "2025-12-09T10:00:00Z"}
+        _append(
+            delta_path_for(base), {"order_number": "D-1", "fulfillments": [fulfillment]}
+        )
+
+        record = store.get("D-1")
+        assert record is not None
+        assert record.raw["fulfillments"][-1] == fulfillment
+        assert len(record.raw["fulfillments"]) == 2
+
+    def test_identifier_changes_are_indexed(
+        self, base: Path, store: JsonOrderStore
+    ) -> None:
+        store.get("D-1")
+        _append(
+            delta_path_for(base),
+            {"order_number": "D-1", "set": {"email": "new@example.com"}},
+        )
+
+        assert store.find("D-1", "new@example.com") is not None
+        assert store.find("D-1", "d1@example.com") is None
+
+    def test_new_order_from_full_payload(self, base: Path) -> None:
+        store = JsonOrderStore(base, check_interval=0, resident=False)
+        store.get("D-1")
+        _append(
+            delta_path_for(base),
+            {"order_number": "D-2", "order": _make_raw_order(zip="99999")},
+        )
+
+        record = store.find("D-2", "99999")
+        assert record is not None
+        assert record.raw["order_number"] == "D-2"
+
+    def test_truncated_feed_rebuilds_from_base(
+        self, base: Path, store: JsonOrderStore
+    ) -> None:
+        feed = delta_path_for(base)
+        _append(feed, {"order_number": "D-1", "set": {"city": "Hamburg"}})
+        assert store.get("D-1") is not None
+
+        feed.write_text("")
+
+        record = store.get("D-1")
+        assert record is not None
+        assert record.raw["city"] == "Testville"
+
+    def test_bad_line_does_not_stall_the_feed(
+        self, base: Path, store: JsonOrderStore
+    ) -> None:
+        assert store.get("D-1") is not None
+        feed = delta_path_for(base)
+        with feed.open("a") as f:
+            f.write("{not json\n")
+        _append(feed, {"order_number": "D-1", "set": {"city": "Hamburg"}})
+
+        record = store.get("D-1")
+        assert record is not None
+        assert record.raw["city"] == "Hamburg"
+        assert store.last_error is None
+
+    def test_failed_reload_keeps_the_last_index(
+        self, base: Path, store: JsonOrderStore
+    ) -> None:
+        assert store.get("D-1") is not None
+        base.write_text('{"orders": [{"order_number": ')
+
+        record = store.get("D-1")
+        assert record is not None
+        assert record.raw["city"] == "Testville"
+        assert isinstance(store.last_error, ValueError)
+
+    def test_readers_do_not_wait_for_a_running_reload(
+        self, base: Path, store: JsonOrderStore
+    ) -> None:
+        assert store.get("D-1") is not None
+        _append(
+            delta_path_for(base), {"order_number": "D-1", "set": {"city": "Hamburg"}}
+        )
+
+        with store._lock:  # a reload in progress on another thread
+            record = store.get("D-1")
+
+        assert record is not None
+        assert record.raw["city"] == "Testville"
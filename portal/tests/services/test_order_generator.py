@@ -0,0 +1,103 @@
+"""Tests for the synthetic order generator."""
+
+from __future__ import annotations
+
+import itertools
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from portal.services.mapper import map_order
+from portal.services.order_generator import generate_orders, write_orders
+from portal.services.order_stream import iter_raw_orders
+from portal.types import ArticleTable
+
+
+@pytest.fixture(scope="module")
+def corpus() -> list[dict[str, Any]]:
+    return list(generate_orders(2000, seed=3))
+
+
+class TestGenerateOrders:
+    def test_same_seed_same_orders(self) -> None:
+        assert list(generate_orders(20, seed=1)) == list(generate_orders(20, seed=1))
+        assert list(generate_orders(20, seed=1)) != list(generate_orders(20, seed=2))
+
+    def test_longer_corpus_extends_shorter(self) -> None:
+        short = list(generate_orders(10, seed=1))
+
+        assert list(generate_orders(30, seed=1))[:10] == short
+
+    def test_mixes_payload_shapes(self, corpus: list[dict[str, Any]]) -> None:
+        articles = [a for raw in corpus for a in raw["articles"]]
+
+        assert any("customer" not in raw for raw in corpus)
+        assert any("recipient" not in raw for raw in corpus)
+        assert any("customer" in raw and "zip" in raw for raw in corpus)
+        assert any(len(raw.get("fulfillments", ())) > 1 for raw in corpus)
+        assert any("delivered_at" in raw for raw in corpus)
+        assert any(raw.get("fulfillments") == [] for raw in corpus)
+        assert any("digital-delivery" in a["tags"] for a in articles)
+        assert any("final-sale" in a["tags"] for a in articles)
+        depths = {a["product_type"].count(" > ") + 1 for a in articles}
+        assert depths == {1, 2, 3, 4}
+
+    def test_article_counts_are_skewed(self, corpus: list[dict[str, Any]]) -> None:
+        counts = sorted(len(raw["articles"]) for raw in corpus)
+
+        assert counts[0] >= 1
+        assert counts[len(counts) // 2] <= 2
+        assert counts[-1] >= 256
+
+    def test_caps_article_counts(self) -> None:
+        orders = generate_orders(500, seed=3, max_articles=4)
+
+        assert max(len(raw["articles"]) for raw in orders) == 4
+
+    def test_fixed_article_count(self) -> None:
+        orders = generate_orders(50, seed=3, articles=7)
+
+        assert {len(raw["articles"]) for raw in orders} == {7}
+
+    def test_rejects_bad_arguments(self) -> None:
+        with pytest.raises(ValueError):
+            next(generate_orders(-1))
+        with pytest.raises(ValueError):
+            next(generate_orders(1, articles=-1))
+
+
+class TestWriteOrders:
+    def test_round_trips_through_the_stream_reader(
+        self, tmp_path: Path, corpus: list[dict[str, Any]]
+    ) -> None:
+        path = tmp_path / "orders.json"
+
+        assert write_orders(corpus, path) == len(corpus)
+        streamed = [order.raw for order in iter_raw_orders(path)]
+        assert streamed == corpus
+        orders = [map_order(raw) for raw in streamed]
+        assert any(isinstance(order.articles, ArticleTable) for order in orders)
+
+    def test_moves_file_into_place_when_complete(self, tmp_path: Path) -> None:
+        def orders() -> Iterator[dict[str, Any]]:
+            for raw in generate_orders(3):
+                # Nothing is written to the final path until the end.
+                assert not path.exists()
+                yield raw
+
+        path = tmp_path / "orders.json"
+
+        assert write_orders(orders(), path) == 3
+
+    def test_failed_write_leaves_no_file(self, tmp_path: Path) -> None:
+        def failing() -> Iterator[dict[str, Any]]:
+            yield from itertools.islice(generate_orders(3), 2)
+            raise RuntimeError("boom")
+
+        path = tmp_path / "orders.json"
+
+        with pytest.raises(RuntimeError):
+            write_orders(failing(), path)
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,151 @@
+"""Tests for the indexed JSON order store."""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from portal.services import order_store
+from portal.services.order_store import JsonOrderStore
+from portal.services.order_stream import StreamedOrder, iter_raw_orders
+from portal.tests.conftest import _make_raw_order
+from portal.types import LazyOrder
+
+
+def _write_orders(path: Path, *orders: dict[str, Any]) -> None:
+    path.write_text(json.dumps({"orders": list(orders)}))
+
+
+@pytest.fixture()
+def orders_path(tmp_path: Path) -> Path:
+    path = tmp_path / "orders_raw.json"
+    _write_orders(
+        path,
+        _make_raw_order(order_number="A-1", email="Ann@Example.com", zip="10115"),
+        _make_raw_order(order_number="A-2", email="bob@example.com", zip="SW1A 1AA"),
+    )
+    return path
+
+
+class TestLookups:
+    def test_get_by_order_number(self, orders_path: Path) -> None:
+        store = JsonOrderStore(orders_path)
+        record = store.get("A-2")
+        assert record is not None
+        assert record.raw["email"] == "bob@example.com"
+
+    def test_get_unknown_returns_none(self, orders_path: Path) -> None:
+        assert JsonOrderStore(orders_path).get("missing") is None
+
+    def test_find_by_email_ignores_case_and_whitespace(self, orders_path: Path) -> None:
+        store = JsonOrderStore(orders_path)
+        assert store.find("A-1", " ann@example.COM ") is not None
+
+    def test_find_by_zip_ignores_spacing(self, orders_path: Path) -> None:
+        store = JsonOrderStore(orders_path)
+        assert store.find("A-2", "sw1a1aa") is not None
+
+    def test_find_rejects_identifier_of_other_order(self, orders_path: Path) -> None:
+        store = JsonOrderStore(orders_path)
+        assert store.find("A-1", "bob@example.com") is None
+
+    def test_non_resident_store_reads_single_order(self, orders_path: Path) -> None:
+        store = JsonOrderStore(orders_path, resident=False)
+        record = store.find("A-2", "bob@example.com")
+        assert record is not None
+        assert record.raw["order_number"] == "A-2"
+        assert store.get("missing") is None
+
+
+class TestReloading:
+    def test_file_is_parsed_once(
+        self, orders_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        calls: list[Path] = []
+        original = iter_raw_orders
+
+        def counting_iter(path: Path) -> Iterator[StreamedOrder]:
+            calls.append(path)
+            return original(path)
+
+        monkeypatch.setattr(order_store, "iter_raw_orders", counting_iter)
+        store = JsonOrderStore(orders_path, check_interval=0)
+        for _ in range(5):
+            store.get("A-1")
+            store.find("A-1", "10115")
+        assert len(calls) == 1
+
+    def test_reloads_when_file_changes(self, orders_path: Path) -> None:
+        store = JsonOrderStore(orders_path, check_interval=0)
+        assert store.get("A-3") is None
+
+        _write_orders(orders_path, _make_raw_order(order_number="A-3"))
+        stat = orders_path.stat()
+        os.utime(orders_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert store.get("A-3") is not None
+        assert store.get("A-1") is None
+
+    def test_does_not_stat_within_check_interval(self, orders_path: Path) -> None:
+        store = JsonOrderStore(orders_path, check_interval=3600)
+        assert store.get("A-1") is not None
+
+        orders_path.unlink()
+
+        assert store.get("A-1") is not None
+
+
+class TestVersions:
+    def test_version_changes_only_for_changed_orders(self, orders_path: Path) -> None:
+        store = JsonOrderStore(orders_path, check_interval=0)
+        before = {n: store.get(n) for n in ("A-1", "A-2")}
+
+        _write_orders(
+            orders_path,
+            _make_raw_order(order_number="A-1", email="Ann@Example.com", zip="10115"),
+            _make_raw_order(order_number="A-2", email="bob@example.com", zip="E1"),
+        )
+        stat = orders_path.stat()
+        os.utime(orders_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        after = {n: store.get(n) for n in ("A-1", "A-2")}
+        versions = {n: (r.version if r else None) for n, r in before.items()}
+        assert after["A-1"] is not None and after["A-1"].version == versions["A-1"]
+        assert after["A-2"] is not None and after["A-2"].version != versions["A-2"]
+
+
+class TestModuleLookups:
+    def test_repeat_get_order_reuses_mapping(self) -> None:
+        order_store.get_order("RMA-1002")
+        hits = order_store.order_cache_stats().hits
+
+        order_store.get_order("RMA-1002")
+
+        assert order_store.order_cache_stats().hits == hits + 1
+
+    def test_async_lookups(self) -> None:
+        order = async_to_sync(order_store.afind_order)("RMA-1001", "10115")
+        assert order is not None
+        assert async_to_sync(order_store.aget_order)("RMA-1001") == order
+        assert async_to_sync(order_store.aget_order)("missing") is None
+
+    def test_lookup_maps_header_only(self, orders_path: Path) -> None:
+        record = JsonOrderStore(orders_path).find("A-1", "10115")
+        assert record is not None
+
+        order = record.to_order()
+
+        assert isinstance(order, LazyOrder)
+        assert not order.is_loaded("articles")
+
+    def test_freshened_order_shares_cached_articles(self) -> None:
+        first = order_store.get_order("RMA-1001")
+        second = order_store.get_order("RMA-1001")
+        assert first is not None and second is not None
+        assert first.articles is second.articles
@@ -0,0 +1,70 @@
+"""Tests for the streaming orders file reader."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from portal.services.order_stream import iter_raw_orders, read_raw_order
+from portal.tests.conftest import _make_raw_article, _make_raw_order
+
+
+def _write(path: Path, text: str) -> Path:
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+class TestIterRawOrders:
+    def test_matches_json_load(self, tmp_path: Path) -> None:
+        orders = [
+            _make_raw_order(
+                order_number=f"S-{i}",
+                recipient='Quote " and \\\\ backslash {not} [json]',
+                articles=[_make_raw_article(name="Café ünïcode", tags=["a", "b"])],
+            )
+            for i in range(20)
+        ]
+        path = _write(
+            tmp_path / "orders.json",
+            json.dumps({"meta": {"count": [1, 2]}, "orders": orders, "tail": 1}),
+        )
+
+        streamed = [entry.raw for entry in iter_raw_orders(path, chunk_size=7)]
+
+        assert streamed == orders
+
+    def test_spans_allow_reading_single_order(self, tmp_path: Path) -> None:
+        path = _write(
+            tmp_path / "orders.json",
+            json.dumps(
+                {"orders": [_make_raw_order(order_number=f"S-{i}") for i in range(5)]},
+                indent=2,
+                ensure_ascii=False,
+            ),
+        )
+
+        entries = list(iter_raw_orders(path, chunk_size=16))
+
+        for entry in entries:
+            assert read_raw_order(path, entry.span) == entry.raw
+
+    def test_empty_orders_list(self, tmp_path: Path) -> None:
+        path = _write(tmp_path / "orders.json", '{"version": 2, "orders": [ ]}')
+        assert list(iter_raw_orders(path)) == []
+
+    def test_missing_orders_key_raises(self, tmp_path: Path) -> None:
+        path = _write(tmp_path / "orders.json", '{"version": 2}')
+        with pytest.raises(ValueError, match="'orders' list"):
+            list(iter_raw_orders(path))
+
+    def test_non_object_entry_raises(self, tmp_path: Path) -> None:
+        path = _write(tmp_path / "orders.json", '{"orders": [1]}')
+        with pytest.raises(ValueError, match="must be an object"):
+            list(iter_raw_orders(path))
+
+    def test_bundled_data_file(self) -> None:
+        path = Path(__file__).resolve().parents[2] / "data" / "orders_raw.json"
+        expected = json.loads(path.read_text())["orders"]
+        assert [entry.raw for entry in iter_raw_orders(path)] == expected
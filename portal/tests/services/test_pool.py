@@ -0,0 +1,34 @@
+"""Tests for the bounded process-pool helper."""
+
+from __future__ import annotations
+
+import pytest
+
+from portal.services.pool import imap_bounded
+
+_offset = 0
+
+
+def _set_offset(offset: int) -> None:
+    global _offset
+    _offset = offset
+
+
+def _add_offset(value: int) -> int:
+    return value + _offset
+
+
+class TestImapBounded:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_keeps_input_order_after_initializer(self, workers: int) -> None:
+        results = imap_bounded(
+            _add_offset,
+            range(20),
+            workers=workers,
+            initializer=_set_offset,
+            initargs=(100,),
+        )
+        assert list(results) == list(range(100, 120))
+
+    def test_empty_input(self) -> None:
+        assert list(imap_bounded(_add_offset, [], workers=2)) == []
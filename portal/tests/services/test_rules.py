@@ -0,0 +1,224 @@
+"""Tests for loading and compiling the eligibility rules."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from portal.services import rules
+from portal.services.rules import (
+    FULLY_RETURNED,
+    RULES_PATH,
+    RulesSource,
+    compile_rules,
+    get_rules_source,
+    load_rules,
+    ruleset_version,
+)
+from portal.types import DIGITAL, FINAL_SALE
+
+
+def _write_rules(path: Path, window_days: int) -> None:
+    path.write_text(json.dumps({"rules": [{"id": "w", "window_days": window_days}]}))
+    # Make sure the change is visible even on coarse mtime filesystems.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + window_days * 10**9))
+
+
+class TestLoadRules:
+    def test_default_rules_compile(self) -> None:
+        ruleset = load_rules(RULES_PATH)
+        assert [rule.id for rule in ruleset.rules][:3] == [
+            "fully-returned",
+            "digital",
+            "final-sale",
+        ]
+
+    def test_json_rules(self, tmp_path: Path) -> None:
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps({"rules": [{"id": "all", "window_days": 7}]}))
+        plan = load_rules(path).plan("anything", 0)
+        assert plan.window is not None
+        assert plan.window.reason == "The 7-day return window has ended."
+
+    def test_reason_keeps_other_braces(self) -> None:
+        reason = "{policy}: {days} days {} only"
+        ruleset = compile_rules(
+            {"rules": [{"id": "w", "window_days": 7, "reason": reason}]}
+        )
+        assert ruleset.rules[0].reason == "{policy}: 7 days {} only"
+
+    @pytest.mark.parametrize(
+        "config",
+        [
+            {},
+            {"rules": [{"reason": "no id"}]},
+            {"rules": [{"id": "a"}]},
+            {"rules": [{"id": "a", "reason": "x", "when": {"colour": "red"}}]},
+            {"rules": [{"id": "a", "reason": "x", "when": {"is_digital": "yes"}}]},
+            {"rules": [{"id": "a", "window_days": -1}]},
+            {"rules": [{"id": "a", "window_days": 1}, {"id": "a", "window_days": 2}]},
+        ],
+    )
+    def test_rejects_invalid_config(self, config: object) -> None:
+        with pytest.raises(ValueError):
+            compile_rules(config)
+
+
+class TestPlans:
+    RULES = {
+        "rules": [
+            {"id": "done", "when": {"fully_returned": True}, "reason": "done"},
+            {"id": "tv", "when": {"category": "Electronics"}, "window_days": 14},
+            {"id": "digital", "when": {"is_digital": True}, "reason": "digital"},
+            {
+                "id": "sale",
+                "when": {"is_final_sale": True, "category": ["apparel", "shoes"]},
+                "reason": "sale",
+            },
+            {"id": "default", "window_days": 30},
+        ]
+    }
+
+    def test_first_rejecting_rule_decides(self) -> None:
+        ruleset = compile_rules(self.RULES)
+        plan = ruleset.plan("electronics", DIGITAL | FULLY_RETURNED)
+        assert plan.window is None
+        assert plan.deny is not None and plan.deny.id == "done"
+
+    def test_window_is_checked_before_later_rules(self) -> None:
+        plan = compile_rules(self.RULES).plan("ELECTRONICS", DIGITAL)
+        assert plan.window is not None and plan.window.id == "tv"
+        assert plan.deny is not None and plan.deny.id == "digital"
+
+    def test_only_first_window_counts(self) -> None:
+        plan = compile_rules(self.RULES).plan("electronics", 0)
+        assert plan.window is not None and plan.window.id == "tv"
+        assert plan.deny is None
+
+    def test_category_conditions(self) -> None:
+        ruleset = compile_rules(self.RULES)
+        assert ruleset.plan("shoes", FINAL_SALE).deny is not None
+        assert ruleset.plan("toys", FINAL_SALE).deny is None
+
+    def test_unknown_categories_use_default_window(self) -> None:
+        plan = compile_rules(self.RULES).plan("garden", 0)
+        assert plan.window is not None and plan.window.id == "default"
+
+
+class TestVersions:
+    def test_version_is_content_hash(self, tmp_path: Path) -> None:
+        first, second = tmp_path / "a.json", tmp_path / "b.json"
+        _write_rules(first, 7)
+        _write_rules(second, 7)
+        assert load_rules(first).version == load_rules(second).version
+        _write_rules(second, 8)
+        assert load_rules(first).version != load_rules(second).version
+
+    def test_active_version(self, tmp_path: Path, settings: Any) -> None:
+        path = tmp_path / "rules.json"
+        _write_rules(path, 7)
+        settings.RETURNS_RULES_PATH = path
+        get_rules_source.cache_clear()
+        try:
+            assert ruleset_version() == load_rules(path).version
+        finally:
+            get_rules_source.cache_clear()
+
+
+class TestRulesSource:
+    def _wait(self, source: RulesSource) -> None:
+        if source._thread is not None:
+            source._thread.join(timeout=5)
+
+    def test_reloads_in_background(self, tmp_path: Path) -> None:
+        path = tmp_path / "rules.json"
+        _write_rules(path, 7)
+        source = RulesSource(path, check_interval=0)
+        old = source.get()
+
+        _write_rules(path, 14)
+        # The caller is answered from the ruleset it already has.
+        assert source.get() is old
+        self._wait(source)
+
+        new = source.get()
+        assert new.version != old.version
+        assert new.rules[0].window_days == 14
+        # In-flight users of the old ruleset are unaffected.
+        assert old.rules[0].window_days == 7
+
+    def test_unchanged_file_keeps_ruleset(self, tmp_path: Path) -> None:
+        path = tmp_path / "rules.json"
+        _write_rules(path, 7)
+        source = RulesSource(path, check_interval=0)
+        ruleset = source.get()
+        path.touch()
+        source.get()
+        self._wait(source)
+        assert source.get() is ruleset
+
+    def test_broken_file_keeps_previous_ruleset(self, tmp_path: Path) -> None:
+        path = tmp_path / "rules.json"
+        _write_rules(path, 7)
+        source = RulesSource(path, check_interval=0)
+        ruleset = source.get()
+
+        path.write_text("{not json")
+        source.get()
+        self._wait(source)
+
+        assert source.get() is ruleset
+        assert isinstance(source.last_error, ValueError)
+
+        _write_rules(path, 30)
+        source.get()
+        self._wait(source)
+        assert source.get().rules[0].window_days == 30
+        assert source.last_error is None
+
+    def test_reason_with_stray_braces_reloads(self, tmp_path: Path) -> None:
+        path = tmp_path / "rules.json"
+        _write_rules(path, 7)
+        source = RulesSource(path, check_interval=0)
+        source.get()
+
+        rule = {"id": "w", "window_days": 14, "reason": "{x} after {days} days"}
+        path.write_text(json.dumps({"rules": [rule]}))
+        source.get()
+        self._wait(source)
+
+        assert source.last_error is None
+        assert source.get().rules[0].reason == "{x} after 14 days"
+
+    def test_unexpected_error_keeps_previous_ruleset(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        path = tmp_path / "rules.json"
+        _write_rules(path, 7)
+        source = RulesSource(path, check_interval=0)
+        ruleset = source.get()
+
+        def fail(path: Path) -> None:
+            raise KeyError("x")
+
+        monkeypatch.setattr(rules, "load_rules", fail)
+        _write_rules(path, 14)
+        source.get()
+        self._wait(source)
+
+        assert source.get() is ruleset
+        assert isinstance(source.last_error, KeyError)
+
+    def test_respects_check_interval(self, tmp_path: Path) -> None:
+        path = tmp_path / "rules.json"
+        _write_rules(path, 7)
+        source = RulesSource(path, check_interval=3600)
+        ruleset = source.get()
+        _write_rules(path, 14)
+        assert source.get() is ruleset
+        assert source._thread is None
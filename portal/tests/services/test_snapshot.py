@@ -0,0 +1,102 @@
+"""Tests for the binary order snapshot."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from portal.services.mapper import ARTICLE_TABLE_MIN_LINES, map_order
+from portal.services.order_store import JsonOrderStore
+from portal.services.snapshot import SnapshotOrderStore, build_snapshot
+from portal.tests.conftest import _make_raw_article, _make_raw_order
+from portal.types import ArticleTable
+
+
+@pytest.fixture()
+def source(tmp_path: Path) -> Path:
+    orders = [
+        _make_raw_order(
+            order_number=f"N-{i:03d}",
+            email=f"n{i}@example.com",
+            order_date="2025-12-01T10:00:00.123456Z",
+            articles=[
+                _make_raw_article(sku=f"SKU-{i}-{j}", name="Größe ✓", price=j + 0.5)
+                for j in range(i % 4)
+            ],
+        )
+        for i in range(40, 0, -1)
+    ]
+    path = tmp_path / "orders_raw.json"
+    path.write_text(json.dumps({"orders": orders}))
+    return path
+
+
+@pytest.fixture()
+def snapshot(tmp_path: Path, source: Path) -> SnapshotOrderStore:
+    path = tmp_path / "orders.snapshot"
+    assert build_snapshot(source, path) == 40
+    return SnapshotOrderStore(path)
+
+
+class TestSnapshotOrderStore:
+    def test_orders_round_trip(
+        self, source: Path, snapshot: SnapshotOrderStore
+    ) -> None:
+        json_store = JsonOrderStore(source)
+        for i in range(1, 41):
+            expected = json_store.get(f"N-{i:03d}")
+            record = snapshot.get(f"N-{i:03d}")
+            assert expected is not None and record is not None
+            assert record.version == expected.version
+            assert record.to_order() == map_order(expected.raw)
+
+    def test_preserves_microseconds(self, snapshot: SnapshotOrderStore) -> None:
+        record = snapshot.get("N-001")
+        assert record is not None
+        assert record.to_order().order_date == datetime(2025, 12, 1, 10, 0, 0, 123456)
+
+    def test_large_orders_decode_to_article_table(self, tmp_path: Path) -> None:
+        raw = _make_raw_order(
+            order_number="B2B-1",
+            articles=[
+                _make_raw_article(sku=f"SKU-{j}", quantity=j + 1)
+                for j in range(ARTICLE_TABLE_MIN_LINES)
+            ],
+        )
+        source = tmp_path / "b2b.json"
+        source.write_text(json.dumps({"orders": [raw]}))
+        build_snapshot(source, tmp_path / "b2b.snapshot")
+
+        record = SnapshotOrderStore(tmp_path / "b2b.snapshot").get("B2B-1")
+        assert record is not None
+        order = record.to_order()
+        assert isinstance(order.articles, ArticleTable)
+        assert order == map_order(raw)
+
+    def test_article_loads_are_independent(self, snapshot: SnapshotOrderStore) -> None:
+        record = snapshot.get("N-003")
+        assert record is not None
+        order = record.to_order()
+        # Threads sharing a cached order may both run its loader.
+        load = order._loaders["articles"]  # type: ignore[attr-defined]
+
+        first, second = load(), load()
+
+        assert len(first) == 3
+        assert second == first == order.articles
+
+    def test_get_unknown(self, snapshot: SnapshotOrderStore) -> None:
+        assert snapshot.get("N-000") is None
+        assert snapshot.get("Z") is None
+
+    def test_find_checks_identifier(self, snapshot: SnapshotOrderStore) -> None:
+        assert snapshot.find("N-007", "N7@Example.com") is not None
+        assert snapshot.find("N-007", "12345") is not None
+        assert snapshot.find("N-007", "n8@example.com") is None
+
+    def test_rejects_foreign_file(self, source: Path) -> None:
+        with pytest.raises(ValueError, match="not a supported order snapshot"):
+            SnapshotOrderStore(source)
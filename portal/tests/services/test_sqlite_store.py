@@ -0,0 +1,89 @@
+"""Tests for the SQLite order store."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from portal.services.order_store import JsonOrderStore, find_order, get_backend
+from portal.services.sqlite_store import SqliteOrderStore, ingest_orders
+from portal.tests.conftest import _make_raw_order
+
+
+@pytest.fixture()
+def source(tmp_path: Path) -> Path:
+    path = tmp_path / "orders_raw.json"
+    orders = [
+        _make_raw_order(order_number=f"Q-{i}", email=f"u{i}@Example.com", zip="10115")
+        for i in range(25)
+    ]
+    path.write_text(json.dumps({"orders": orders}))
+    return path
+
+
+@pytest.fixture()
+def database(tmp_path: Path, source: Path) -> Path:
+    path = tmp_path / "orders.sqlite3"
+    ingest_orders(source, path, batch_size=10)
+    return path
+
+
+class TestIngest:
+    def test_returns_number_of_orders(self, source: Path, tmp_path: Path) -> None:
+        assert ingest_orders(source, tmp_path / "db.sqlite3", batch_size=7) == 25
+
+    def test_reingest_upserts(self, source: Path, database: Path) -> None:
+        ingest_orders(source, database)
+        store = SqliteOrderStore(database)
+        assert store.get("Q-0") is not None
+
+
+class TestSqliteOrderStore:
+    def test_get_matches_json_store(self, source: Path, database: Path) -> None:
+        sqlite_record = SqliteOrderStore(database).get("Q-3")
+        json_record = JsonOrderStore(source).get("Q-3")
+        assert sqlite_record == json_record
+
+    def test_get_unknown(self, database: Path) -> None:
+        assert SqliteOrderStore(database).get("nope") is None
+
+    def test_find_by_normalized_email(self, database: Path) -> None:
+        store = SqliteOrderStore(database)
+        record = store.find("Q-4", "U4@example.com ")
+        assert record is not None
+        assert record.order_number == "Q-4"
+
+    def test_find_by_zip(self, database: Path) -> None:
+        assert SqliteOrderStore(database).find("Q-4", "10115") is not None
+
+    def test_find_rejects_wrong_identifier(self, database: Path) -> None:
+        store = SqliteOrderStore(database)
+        assert store.find("Q-4", "u5@example.com") is None
+        assert store.find("Q-4", "") is None
+
+
+class TestBackendSelection:
+    def test_setting_selects_sqlite_backend(
+        self, database: Path, settings: Any
+    ) -> None:
+        settings.RETURNS_ORDER_BACKEND = "sqlite"
+        settings.RETURNS_ORDERS_DB = database
+        get_backend.cache_clear()
+        try:
+            order = find_order("Q-7", "u7@example.com")
+        finally:
+            get_backend.cache_clear()
+
+        assert order is not None
+        assert order.order_number == "Q-7"
+
+
+class TestGetMany:
+    def test_matches_json_store(self, source: Path, database: Path) -> None:
+        numbers = ["Q-1", "missing", "Q-9", "Q-1"]
+        assert SqliteOrderStore(database).get_many(numbers) == (
+            JsonOrderStore(source).get_many(numbers)
+        )
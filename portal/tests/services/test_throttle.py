@@ -0,0 +1,222 @@
+"""Tests for lookup throttling."""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import Client
+from rest_framework.test import APIClient
+
+from portal import api, views
+from portal.services.throttle import (
+    BucketStore,
+    LookupThrottle,
+    MemoryBucketStore,
+    Rate,
+    SqliteBucketStore,
+    client_ident,
+    get_lookup_throttle,
+)
+
+
+class TestRate:
+    def test_parse(self) -> None:
+        assert Rate.parse("10/min") == Rate(10, 60)
+        assert Rate.parse("3/s") == Rate(3, 1)
+
+    @pytest.mark.parametrize("value", ["10", "ten/min", "10/day", "0/min"])
+    def test_parse_rejects_bad_rates(self, value: str) -> None:
+        with pytest.raises(ValueError, match="bad throttle rate"):
+            Rate.parse(value)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request: pytest.FixtureRequest, tmp_path: Path) -> BucketStore:
+    if request.param == "sqlite":
+        return SqliteBucketStore(tmp_path / "throttle.sqlite3")
+    return MemoryBucketStore()
+
+
+class TestBucketStores:
+    def test_burst_then_refill(self, store: BucketStore) -> None:
+        rate = Rate(2, 60)
+
+        assert store.take("k", rate, 0.0) == 0.0
+        assert store.take("k", rate, 0.0) == 0.0
+        assert store.take("k", rate, 0.0) == pytest.approx(30.0)
+        assert store.take("k", rate, 15.0) == pytest.approx(15.0)
+        assert store.take("k", rate, 30.0) == 0.0
+
+    def test_buckets_are_independent(self, store: BucketStore) -> None:
+        rate = Rate(1, 60)
+        store.take("a", rate, 0.0)
+
+        assert store.take("b", rate, 0.0) == 0.0
+
+    def test_sqlite_buckets_are_shared(self, tmp_path: Path) -> None:
+        rate = Rate(1, 60)
+        SqliteBucketStore(tmp_path / "t.sqlite3").take("k", rate, 0.0)
+
+        assert SqliteBucketStore(tmp_path / "t.sqlite3").take("k", rate, 1.0) > 0
+
+    def test_sqlite_store_prunes_refilled_buckets(self, tmp_path: Path) -> None:
+        database = tmp_path / "t.sqlite3"
+        store = SqliteBucketStore(database, prune_every=10)
+        rate = Rate(2, 60)
+        for i in range(9):
+            store.take(f"order:{i}", rate, 0.0)
+        store.take("client:a", rate, 0.0)
+        store.take("client:a", rate, 0.0)  # empty, not full until t=60
+        for i in range(8):
+            store.take(f"order:late-{i}", rate, 40.0)
+
+        # The 20th take, at t=45, drops the buckets full again since t=30.
+        store.take("order:last", rate, 45.0)
+
+        with sqlite3.connect(database) as conn:
+            keys = {key for (key,) in conn.execute("SELECT key FROM token_buckets")}
+        assert keys == {"client:a", "order:last"} | {
+            f"order:late-{i}" for i in range(8)
+        }
+        # The kept bucket still has only the 1.5 tokens refilled since t=0.
+        assert store.take("client:a", rate, 45.0) == 0.0
+        assert store.take("client:a", rate, 45.0) > 0
+
+    def test_memory_store_is_bounded(self) -> None:
+        store = MemoryBucketStore(max_entries=2)
+        rate = Rate(1, 60)
+        for key in ("a", "b", "c"):
+            store.take(key, rate, 0.0)
+
+        # "a" was evicted and starts over with a full bucket.
+        assert store.take("a", rate, 0.0) == 0.0
+
+
+class TestLookupThrottle:
+    def test_limits_each_client(self) -> None:
+        throttle = LookupThrottle(
+            MemoryBucketStore(), per_client=Rate(2, 60), per_order=None
+        )
+
+        assert throttle.check("1.1.1.1", "A", now=0) == 0.0
+        assert throttle.check("1.1.1.1", "B", now=0) == 0.0
+        assert throttle.check("1.1.1.1", "C", now=0) > 0
+        assert throttle.check("2.2.2.2", "C", now=0) == 0.0
+
+    def test_limits_each_order_across_clients(self) -> None:
+        throttle = LookupThrottle(
+            MemoryBucketStore(), per_client=None, per_order=Rate(2, 60)
+        )
+
+        assert throttle.check("1.1.1.1", "RMA-1001", now=0) == 0.0
+        assert throttle.check("2.2.2.2", " rma-1001 ", now=0) == 0.0
+        assert throttle.check("3.3.3.3", "RMA-1001", now=0) > 0
+        assert throttle.check("3.3.3.3", "RMA-1002", now=0) == 0.0
+
+    def test_ignores_non_string_order_numbers(self) -> None:
+        throttle = LookupThrottle(
+            MemoryBucketStore(), per_client=None, per_order=Rate(1, 60)
+        )
+
+        assert throttle.check("1.1.1.1", None, now=0) == 0.0
+        assert throttle.check("1.1.1.1", ["x"], now=0) == 0.0
+
+
+class TestClientIdent:
+    def test_ignores_forwarded_for_by_default(self) -> None:
+        meta = {"REMOTE_ADDR": "10.0.0.1", "HTTP_X_FORWARDED_FOR": "1.2.3.4"}
+
+        assert client_ident(meta) == "10.0.0.1"
+
+    def test_trusted_proxies(self, settings: Any) -> None:
+        settings.RETURNS_TRUSTED_PROXIES = 1
+        # The leftmost entry is forged by the client; the proxy appended the rest.
+        meta = {"REMOTE_ADDR": "10.0.0.1", "HTTP_X_FORWARDED_FOR": "6.6.6.6, 1.2.3.4"}
+
+        assert client_ident(meta) == "1.2.3.4"
+        assert client_ident({"REMOTE_ADDR": "10.0.0.1"}) == "10.0.0.1"
+
+
+class TestGetLookupThrottle:
+    def test_custom_backend(self, settings: Any) -> None:
+        settings.RETURNS_THROTTLE_BACKEND = "portal.services.throttle.MemoryBucketStore"
+
+        assert isinstance(get_lookup_throttle(), LookupThrottle)
+
+    def test_unknown_backend(self, settings: Any) -> None:
+        settings.RETURNS_THROTTLE_BACKEND = "redis"
+
+        with pytest.raises(ImproperlyConfigured):
+            get_lookup_throttle()
+
+    def test_bad_rate(self, settings: Any) -> None:
+        settings.RETURNS_LOOKUP_RATE_PER_ORDER = "lots"
+
+        with pytest.raises(ImproperlyConfigured):
+            get_lookup_throttle()
+
+
+@pytest.mark.django_db
+class TestThrottledLookups:
+    def _fail_on_lookup(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        def unexpected(order_number: str, identifier: str) -> None:
+            raise AssertionError("throttled lookups must not reach the store")
+
+        monkeypatch.setattr(views, "find_order", unexpected)
+        monkeypatch.setattr(api, "find_order", unexpected)
+
+    def test_view_rejects_with_429(
+        self, settings: Any, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        settings.RETURNS_LOOKUP_RATE_PER_CLIENT = "1/min"
+        client = Client()
+        data = {"order_number": "RMA-1001", "identifier": "alex@example.com"}
+        assert client.post("/returns/", data).status_code == 302
+
+        self._fail_on_lookup(monkeypatch)
+        response = client.post("/returns/", data)
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+
+    def test_forged_forwarded_for_is_still_throttled(self, settings: Any) -> None:
+        settings.RETURNS_LOOKUP_RATE_PER_CLIENT = "2/min"
+        settings.RETURNS_LOOKUP_RATE_PER_ORDER = None
+        client = APIClient()
+        data = {"order_number": "RMA-1001", "identifier": "wrong@example.com"}
+
+        statuses = [
+            client.post(
+                "/api/returns/lookup/",
+                data,
+                format="json",
+                HTTP_X_FORWARDED_FOR=f"203.0.113.{i}",
+            ).status_code
+            for i in range(3)
+        ]
+        response = Client().post("/returns/", data, HTTP_X_FORWARDED_FOR="203.0.113.99")
+
+        assert statuses == [400, 400, 429]
+        # The HTML and API lookups share the client's bucket.
+        assert response.status_code == 429
+
+    def test_api_rejects_with_429(
+        self, settings: Any, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        settings.RETURNS_LOOKUP_RATE_PER_ORDER = "1/min"
+        data = {"order_number": "RMA-1001", "identifier": "wrong@example.com"}
+        first = APIClient().post("/api/returns/lookup/", data, format="json")
+        assert first.status_code == 400
+
+        self._fail_on_lookup(monkeypatch)
+        # A different client, but the same order.
+        response = APIClient(REMOTE_ADDR="10.0.0.2").post(
+            "/api/returns/lookup/", data, format="json"
+        )
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
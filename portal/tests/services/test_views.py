@@ -1,7 +1,21 @@
 """Tests for the Django views."""
 
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any, cast
+
 import pytest
-from django.test import Client
+from asgiref.sync import async_to_sync
+from django.contrib.sessions.backends.cache import SessionStore
+from django.http import HttpRequest, HttpResponse
+from django.test import AsyncRequestFactory, Client
+from django.views import View
+
+from portal import views
+from portal.fragments import rows_cache
+from portal.tokens import issue_lookup_token
+from portal.types import Order
+from portal.views import AsyncArticlesView, AsyncLookupView
 
 pytestmark = pytest.mark.django_db
 
@@ -80,3 +94,185 @@ class TestArticlesView:
         response = client.get("/returns/RMA-1001/articles/")
         assert response.status_code == 200
         assert b"TSHIRT-BLK-M" in response.content
+
+    def test_if_none_match_returns_304(self, client: Client) -> None:
+        client.post(
+            "/returns/",
+            {
+                "order_number": "RMA-1001",
+                "identifier": "alex@example.com",
+            },
+        )
+        first = client.get("/returns/RMA-1001/articles/")
+
+        second = client.get(
+            "/returns/RMA-1001/articles/", HTTP_IF_NONE_MATCH=first.headers["ETag"]
+        )
+        stale = client.get("/returns/RMA-1001/articles/", HTTP_IF_NONE_MATCH='"x"')
+
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["Cache-Control"] == first.headers["Cache-Control"]
+        assert stale.status_code == 200
+
+    def test_lookup_token_instead_of_session(
+        self, client: Client, django_assert_num_queries: Any
+    ) -> None:
+        token = issue_lookup_token("RMA-1001")
+
+        with django_assert_num_queries(0):
+            response = client.get(
+                "/returns/RMA-1001/articles/", HTTP_X_LOOKUP_TOKEN=token
+            )
+            rows = client.get(
+                "/returns/RMA-1001/articles/rows/", HTTP_X_LOOKUP_TOKEN=token
+            )
+
+        assert response.status_code == 200
+        assert b"X-Lookup-Token" in response.content
+        assert rows.status_code == 200
+
+    def test_lookup_token_for_another_order_redirects(self, client: Client) -> None:
+        token = issue_lookup_token("RMA-1002")
+
+        response = client.get("/returns/RMA-1001/articles/", HTTP_X_LOOKUP_TOKEN=token)
+
+        assert response.status_code == 302
+
+    def test_lookup_token_in_query_string_is_ignored(self, client: Client) -> None:
+        token = issue_lookup_token("RMA-1001")
+
+        response = client.get("/returns/RMA-1001/articles/", {"token": token})
+
+        assert response.status_code == 302
+
+
+class TestArticleRowsView:
+    def _login(self, client: Client, order_number: str, identifier: str) -> None:
+        client.post(
+            "/returns/",
+            {"order_number": order_number, "identifier": identifier},
+        )
+
+    def test_requires_lookup(self, client: Client) -> None:
+        response = client.get(
+            "/returns/RMA-1001/articles/rows/", HTTP_HX_REQUEST="true"
+        )
+
+        assert response.headers["HX-Redirect"] == "/returns/"
+
+    def test_returns_rows_fragment(self, client: Client) -> None:
+        self._login(client, "RMA-1001", "alex@example.com")
+
+        response = client.get("/returns/RMA-1001/articles/rows/")
+
+        assert response.status_code == 200
+        assert b"TSHIRT-BLK-M" in response.content
+        assert b"<html" not in response.content
+        assert "ETag" in response.headers
+
+    def test_returnable_filter(self, client: Client) -> None:
+        self._login(client, "RMA-1002", "lee@example.com")
+
+        everything = client.get("/returns/RMA-1002/articles/rows/")
+        returnable = client.get("/returns/RMA-1002/articles/rows/?filter=returnable")
+
+        assert b"article-card" in everything.content
+        assert b"article-card" not in returnable.content
+        assert everything.headers["ETag"] != returnable.headers["ETag"]
+
+    def test_unknown_filter(self, client: Client) -> None:
+        self._login(client, "RMA-1001", "alex@example.com")
+
+        response = client.get("/returns/RMA-1001/articles/rows/?filter=nope")
+
+        assert response.status_code == 400
+
+    def test_served_from_cache(
+        self, client: Client, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        rows_cache.clear()
+        self._login(client, "RMA-1001", "alex@example.com")
+        first = client.get("/returns/RMA-1001/articles/rows/")
+
+        def unexpected(record: object) -> Order:
+            raise AssertionError("the order should not be mapped")
+
+        monkeypatch.setattr(views, "order_from_record", unexpected)
+        second = client.get("/returns/RMA-1001/articles/rows/")
+
+        assert second.content == first.content
+
+
+def _async_request(path: str, data: dict[str, str] | None = None) -> HttpRequest:
+    factory = AsyncRequestFactory()
+    request = factory.post(path, data) if data is not None else factory.get(path)
+    request.session = SessionStore()
+    return request
+
+
+def _run(view: type[View], request: HttpRequest, **kwargs: str) -> HttpResponse:
+    handler = cast(Callable[..., Awaitable[HttpResponse]], view.as_view())
+    return async_to_sync(handler)(request, **kwargs)
+
+
+class TestAsyncViews:
+    def test_lookup_sets_session_and_redirects(self) -> None:
+        request = _async_request(
+            "/returns/",
+            {"order_number": "RMA-1001", "identifier": "alex@example.com"},
+        )
+
+        response = _run(AsyncLookupView, request)
+
+        assert response.status_code == 302
+        assert request.session["order_number"] == "RMA-1001"
+
+    def test_lookup_invalid_credentials_shows_error(self) -> None:
+        request = _async_request(
+            "/returns/",
+            {"order_number": "RMA-1001", "identifier": "wrong@example.com"},
+        )
+
+        response = _run(AsyncLookupView, request)
+
+        assert response.status_code == 200
+        assert b"not found" in response.content.lower()
+
+    def test_lookup_throttles_off_the_event_loop(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        loops: list[bool] = []
+
+        def throttled(request: HttpRequest) -> None:
+            try:
+                asyncio.get_running_loop()
+                loops.append(True)
+            except RuntimeError:
+                loops.append(False)
+
+        monkeypatch.setattr(views, "_throttled", throttled)
+        request = _async_request(
+            "/returns/",
+            {"order_number": "RMA-1001", "identifier": "alex@example.com"},
+        )
+
+        _run(AsyncLookupView, request)
+
+        assert loops == [False]
+
+    def test_articles_require_lookup(self) -> None:
+        request = _async_request("/returns/RMA-1001/articles/")
+
+        response = _run(AsyncArticlesView, request, order_number="RMA-1001")
+
+        assert response.status_code == 302
+
+    def test_articles_after_lookup(self) -> None:
+        request = _async_request("/returns/RMA-1001/articles/")
+        request.session["order_number"] = "RMA-1001"
+
+        response = _run(AsyncArticlesView, request, order_number="RMA-1001")
+
+        assert response.status_code == 200
+        assert b"TSHIRT-BLK-M" in response.content
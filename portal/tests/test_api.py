@@ -1,8 +1,32 @@
 from __future__ import annotations
 
+import json
+from datetime import datetime
+from typing import Any
+from unittest.mock import patch
+
 import pytest
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
+from portal import api
+from portal.api import ArticlesResponseSerializer, ReturnsViewSet
+from portal.payloads import (
+    ArticlesJSONRenderer,
+    ArticlesPayload,
+    articles_json,
+    articles_payload,
+)
+from portal.services import eligibility
+from portal.services.rules import Ruleset, get_ruleset
+from portal.types import (
+    Article,
+    ArticleEligibility,
+    ArticleTable,
+    EligibilityTable,
+    Order,
+)
+
 pytestmark = pytest.mark.django_db
 
 
@@ -72,3 +96,329 @@ class TestReturnsApiViewSet:
         assert second["article"]["sku"] == "EBOOK-RETURNS"
         assert second["returnable"] is False
         assert second["selectable"] is False
+
+    def test_articles_reuse_cached_eligibility(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        eligibility._cache.clear()
+        calls = []
+        evaluate_order = eligibility.evaluate_order
+
+        def counting(order: Order, **kwargs: Any) -> eligibility.Evaluation:
+            calls.append(order.order_number)
+            return evaluate_order(order, **kwargs)
+
+        monkeypatch.setattr(eligibility, "evaluate_order", counting)
+        client = APIClient()
+        client.post(
+            "/api/returns/lookup/",
+            {"order_number": "RMA-1001", "identifier": "alex@example.com"},
+            format="json",
+        )
+
+        first = client.get("/api/returns/RMA-1001/articles/")
+        second = client.get("/api/returns/RMA-1001/articles/")
+
+        assert first.data == second.data
+        assert calls == ["RMA-1001"]
+
+    def test_articles_not_modified(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        client = APIClient()
+        client.post(
+            "/api/returns/lookup/",
+            {"order_number": "RMA-1001", "identifier": "alex@example.com"},
+            format="json",
+        )
+        first = client.get("/api/returns/RMA-1001/articles/")
+        etag = first.headers["ETag"]
+        assert "private" in first.headers["Cache-Control"]
+        assert "max-age=" in first.headers["Cache-Control"]
+
+        def unexpected(record: Any) -> Order:
+            raise AssertionError("the order should not be mapped")
+
+        monkeypatch.setattr(api, "order_from_record", unexpected)
+        second = client.get("/api/returns/RMA-1001/articles/", HTTP_IF_NONE_MATCH=etag)
+
+        assert second.status_code == 304
+        assert second.headers["ETag"] == etag
+
+    def test_articles_etag_follows_ruleset(self) -> None:
+        client = APIClient()
+        client.post(
+            "/api/returns/lookup/",
+            {"order_number": "RMA-1001", "identifier": "alex@example.com"},
+            format="json",
+        )
+        first = client.get("/api/returns/RMA-1001/articles/")
+        api_html = client.get("/api/returns/RMA-1001/articles/?format=api")
+
+        assert api_html.headers["ETag"] != first.headers["ETag"]
+
+        eligibility._cache.clear()
+        ruleset = get_ruleset()
+        with patch.object(ruleset, "version", "changed"):
+            response = client.get(
+                "/api/returns/RMA-1001/articles/",
+                HTTP_IF_NONE_MATCH=first.headers["ETag"],
+            )
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != first.headers["ETag"]
+
+    def test_debug_trace(self, settings: Any) -> None:
+        client = APIClient()
+        client.post(
+            "/api/returns/lookup/",
+            {"order_number": "RMA-1001", "identifier": "alex@example.com"},
+            format="json",
+        )
+        url = "/api/returns/RMA-1001/articles/?debug=trace"
+
+        assert "trace" not in client.get(url).data
+
+        settings.DEBUG = True
+        response = client.get(url)
+
+        assert response.status_code == 200
+        trace = response.data["trace"]
+        assert [a["line"] for a in trace["articles"]] == [0, 1]
+        assert trace["articles"][0]["steps"][0]["rule"]
+        assert {"rule", "evaluations", "hits", "total_ns"} <= set(
+            trace["rule_stats"][0]
+        )
+
+
+class TestLookupToken:
+    def _token(self) -> str:
+        response = APIClient().post(
+            "/api/returns/lookup/",
+            {"order_number": "RMA-1001", "identifier": "alex@example.com"},
+            format="json",
+        )
+        token: str = response.json()["token"]
+        return token
+
+    def test_articles_with_token_skip_the_database(
+        self, django_assert_num_queries: Any
+    ) -> None:
+        token = self._token()
+        client = APIClient()
+
+        with django_assert_num_queries(0):
+            response = client.get(
+                "/api/returns/RMA-1001/articles/", HTTP_X_LOOKUP_TOKEN=token
+            )
+
+        assert response.status_code == 200
+        assert response.json()["order"]["order_number"] == "RMA-1001"
+
+    def test_token_is_bound_to_its_order(self) -> None:
+        response = APIClient().get(
+            "/api/returns/RMA-1002/articles/", HTTP_X_LOOKUP_TOKEN=self._token()
+        )
+
+        assert response.status_code == 403
+
+    def test_rejects_tampered_and_expired_tokens(self, settings: Any) -> None:
+        token = self._token()
+        client = APIClient()
+        url = "/api/returns/RMA-1001/articles/"
+
+        tampered = client.get(url, HTTP_X_LOOKUP_TOKEN=token[:-1] + "x")
+        settings.RETURNS_LOOKUP_TOKEN_MAX_AGE = -1
+        expired = client.get(url, HTTP_X_LOOKUP_TOKEN=token)
+
+        assert tampered.status_code == 403
+        assert expired.status_code == 403
+
+
+class TestBulkEligibility:
+    URL = "/api/returns/bulk-eligibility/"
+
+    def test_requires_staff_user(self, django_user_model: Any) -> None:
+        client = APIClient()
+        payload = {"order_numbers": ["RMA-1001"]}
+        assert client.post(self.URL, payload, format="json").status_code == 403
+
+        client.force_authenticate(django_user_model.objects.create(username="agent"))
+        assert client.post(self.URL, payload, format="json").status_code == 403
+
+    def test_returns_eligibility_per_order(self, django_user_model: Any) -> None:
+        client = APIClient()
+        client.force_authenticate(
+            django_user_model.objects.create(username="support", is_staff=True)
+        )
+
+        response = client.post(
+            self.URL,
+            {"order_numbers": ["RMA-1002", "NOPE", "RMA-1001", "RMA-1002"]},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        orders = response.data["orders"]
+        assert [o["order_number"] for o in orders] == ["RMA-1002", "NOPE", "RMA-1001"]
+        assert [o["found"] for o in orders] == [True, False, True]
+        assert orders[1]["results"] == []
+        assert orders[2]["results"][0]["article"]["sku"] == "TSHIRT-BLK-M"
+
+    def test_uses_one_ruleset_per_batch(
+        self, django_user_model: Any, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        calls: list[int] = []
+
+        def counting() -> Ruleset:
+            calls.append(1)
+            return get_ruleset()
+
+        def unexpected() -> Ruleset:
+            raise AssertionError("the ruleset must come from the request")
+
+        monkeypatch.setattr(api, "get_ruleset", counting)
+        monkeypatch.setattr(eligibility, "get_ruleset", unexpected)
+        client = APIClient()
+        client.force_authenticate(
+            django_user_model.objects.create(username="support", is_staff=True)
+        )
+
+        response = client.post(
+            self.URL, {"order_numbers": ["RMA-1001", "RMA-1002"]}, format="json"
+        )
+
+        assert response.status_code == 200
+        assert calls == [1]
+
+    def test_rejects_oversized_batch(self, django_user_model: Any) -> None:
+        client = APIClient()
+        client.force_authenticate(
+            django_user_model.objects.create(username="support", is_staff=True)
+        )
+
+        response = client.post(
+            self.URL,
+            {"order_numbers": [f"RMA-{i}" for i in range(501)]},
+            format="json",
+        )
+
+        assert response.status_code == 400
+
+
+class TestColumnarSerialization:
+    def test_table_serializes_like_objects(self) -> None:
+        articles = [
+            Article(
+                sku=f"SKU-{i}",
+                name="Crate",
+                quantity=i,
+                quantity_returned=1,
+                price=2.5,
+                is_digital=i == 2,
+                category="b2b",
+            )
+            for i in range(4)
+        ]
+        table = ArticleTable.from_articles(articles)
+        results = EligibilityTable(table)
+        for i in range(len(table)):
+            results.append_row(returnable=i % 2 == 0, reason=f"r{i}", matched_rule="")
+        viewset = ReturnsViewSet()
+
+        assert viewset._serialize_results(results) == [
+            viewset._serialize_result(result) for result in results
+        ]
+
+
+class TestFastPathSerialization:
+    def _order(self) -> Order:
+        return Order(
+            order_number="1001",
+            email="anna@example.com",
+            recipient="Anna Müller",
+            zip="10115",
+            street="Invalidenstraße 1",
+            city="Berlin",
+            order_date=datetime(2025, 12, 1, 9, 30),
+            delivery_date=datetime(2025, 12, 3, 14, 0, 0, 250000),
+            articles=[
+                Article(
+                    sku=f"SKU-{i}",
+                    name="Kaffeebecher ☕",
+                    quantity=i,
+                    quantity_returned=1,
+                    price=19.99 * i,
+                    is_digital=i == 2,
+                    category="home",
+                )
+                for i in range(4)
+            ],
+        )
+
+    def _drf_data(self, order: Order, results: Any) -> dict[str, Any]:
+        viewset = ReturnsViewSet()
+        payload = {
+            "order": viewset._serialize_order(order),
+            "results": viewset._serialize_results(results),
+        }
+        data: dict[str, Any] = ArticlesResponseSerializer(payload).data
+        return data
+
+    def _results(self, order: Order) -> list[ArticleEligibility]:
+        return [
+            ArticleEligibility(
+                article=article,
+                returnable=i % 2 == 0,
+                reason="" if i % 2 == 0 else "Final sale",
+                matched_rule="" if i % 2 == 0 else "final-sale",
+            )
+            for i, article in enumerate(order.articles)
+        ]
+
+    def test_payload_matches_drf_serializer(self) -> None:
+        order = self._order()
+        results = self._results(order)
+
+        assert articles_payload(order, results) == self._drf_data(order, results)
+
+    def test_payload_matches_drf_serializer_for_tables(self) -> None:
+        order = self._order()
+        order.articles = ArticleTable.from_articles(order.articles)
+        results = EligibilityTable(order.articles)
+        for i in range(len(order.articles)):
+            results.append_row(returnable=i % 2 == 0, reason=f"r{i}", matched_rule="")
+
+        assert articles_payload(order, results) == self._drf_data(order, results)
+
+    def test_json_is_equivalent_to_drf(self) -> None:
+        order = self._order()
+        order.articles = [
+            Article(
+                sku="TINY",
+                name="Line\u2028break",
+                quantity=1,
+                quantity_returned=0,
+                price=1e-7,
+            ),
+            *order.articles,
+        ]
+        results = self._results(order)
+
+        encoded = articles_json(order, results)
+        drf: bytes = JSONRenderer().render(self._drf_data(order, results))
+
+        assert json.loads(encoded) == json.loads(drf)
+        assert "\u2028".encode() not in encoded
+
+    def test_articles_endpoint_uses_fast_path(self) -> None:
+        client = APIClient()
+        client.post(
+            "/api/returns/lookup/",
+            {"order_number": "RMA-1001", "identifier": "alex@example.com"},
+            format="json",
+        )
+
+        response = client.get("/api/returns/RMA-1001/articles/")
+
+        assert isinstance(response.accepted_renderer, ArticlesJSONRenderer)
+        assert isinstance(response.data, ArticlesPayload)
+        assert json.loads(response.content) == response.data
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from portal.benchmarks import suite
+
+
+class TestBenchmarkSuite:
+    def test_runs_every_benchmark_within_the_line_budget(self) -> None:
+        results = suite.run_suite(
+            list(suite.BENCHMARKS),
+            orders=[2, 3],
+            articles=[1, 4],
+            max_lines=8,
+            min_time=0,
+        )
+
+        assert {r.benchmark for r in results} == set(suite.BENCHMARKS)
+        assert {(r.orders, r.articles) for r in results} == {(2, 1), (2, 4), (3, 1)}
+        assert all(r.ops_per_second > 0 and r.peak_bytes > 0 for r in results)
+
+    def test_results_round_trip_and_compare(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        output = tmp_path / "results.json"
+        args = "--orders 2 --articles 1 --min-time 0 --benchmark map_order"
+        suite.main([*args.split(), "--output", str(output)])
+        suite.main(["--compare", str(output), str(output)])
+
+        assert "map_order" in capsys.readouterr().out
+        assert list(suite._load(output)) == [("map_order", 2, 1)]
+
+    def test_corpus_has_the_requested_article_count(self) -> None:
+        corpus = suite.build_corpus(5, 3)
+
+        assert [len(raw["articles"]) for raw in corpus] == [3] * 5
+        assert len({raw["order_number"] for raw in corpus}) == 5
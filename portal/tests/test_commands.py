@@ -0,0 +1,73 @@
+"""Tests for the portal management commands."""
+
+from __future__ import annotations
+
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from portal.services.snapshot import SnapshotOrderStore
+from portal.services.sqlite_store import SqliteOrderStore
+
+
+class TestIngestOrders:
+    def test_ingests_bundled_orders(self, tmp_path: Path) -> None:
+        database = tmp_path / "orders.sqlite3"
+        out = StringIO()
+
+        call_command("ingest_orders", database=database, stdout=out)
+
+        assert "Ingested 2 orders" in out.getvalue()
+        assert SqliteOrderStore(database).find("RMA-1001", "10115") is not None
+
+
+class TestBuildSnapshot:
+    def test_writes_bundled_orders(self, tmp_path: Path) -> None:
+        output = tmp_path / "orders.snapshot"
+        out = StringIO()
+
+        call_command("build_snapshot", output=output, stdout=out)
+
+        assert "Wrote 2 orders" in out.getvalue()
+        assert SnapshotOrderStore(output).find("RMA-1001", "10115") is not None
+
+
+class TestEvaluateAll:
+    def test_writes_bundled_orders(self, tmp_path: Path) -> None:
+        output = tmp_path / "eligibility.jsonl"
+        out = StringIO()
+
+        call_command("evaluate_all", output=output, workers=1, stdout=out)
+
+        assert "Evaluated 2 orders" in out.getvalue()
+        rows = [json.loads(line) for line in output.read_text().splitlines()]
+        assert {row["order_number"] for row in rows} == {"RMA-1001", "RMA-1002"}
+
+
+class TestTraceRules:
+    def test_prints_rule_counters(self) -> None:
+        out = StringIO()
+
+        call_command("trace_rules", "--json", stdout=out)
+
+        counters = json.loads(out.getvalue())
+        assert counters
+        assert all(c["evaluations"] >= c["hits"] for c in counters)
+
+
+class TestGenerateOrders:
+    def test_writes_seeded_orders(self, tmp_path: Path) -> None:
+        output = tmp_path / "orders.json"
+        out = StringIO()
+
+        call_command("generate_orders", output=output, orders=50, seed=7, stdout=out)
+
+        assert f"Wrote 50 orders to {output}" in out.getvalue()
+        assert len(json.loads(output.read_text())["orders"]) == 50
+
+    def test_rejects_negative_counts(self, tmp_path: Path) -> None:
+        with pytest.raises(CommandError):
+            call_command("generate_orders", output=tmp_path / "o.json", orders=-1)
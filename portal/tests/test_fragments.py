@@ -0,0 +1,67 @@
+"""Tests for the rendered article-rows cache."""
+
+from __future__ import annotations
+
+import sys
+from datetime import datetime
+
+from portal.fragments import RowsCache
+from portal.services.eligibility import Evaluation
+from portal.types import Article, ArticleEligibility
+
+NOW = datetime(2025, 12, 20)
+
+
+def _evaluation() -> Evaluation:
+    article = Article(
+        sku="SKU",
+        name="Shirt",
+        quantity=1,
+        quantity_returned=0,
+        price=10.0,
+        is_digital=False,
+        is_final_sale=False,
+        category="apparel",
+    )
+    return Evaluation(
+        results=[ArticleEligibility(article, True, "", "")],
+        ruleset_version="r1",
+        valid_until=None,
+    )
+
+
+class TestRowsCache:
+    def test_round_trip_drops_results(self) -> None:
+        cache = RowsCache()
+        cache.put("A", "v1", "all", _evaluation(), "<tr>")
+
+        cached = cache.get("A", "v1", "r1", "all", NOW)
+
+        assert cached is not None
+        evaluation, html = cached
+        assert html == "<tr>"
+        assert evaluation.results == ()
+        assert evaluation.ruleset_version == "r1"
+
+    def test_stale_versions_miss(self) -> None:
+        cache = RowsCache()
+        cache.put("A", "v1", "all", _evaluation(), "<tr>")
+
+        assert cache.get("A", "v2", "r1", "all", NOW) is None
+        assert cache.get("A", "v1", "r2", "all", NOW) is None
+
+    def test_bounded_by_bytes(self) -> None:
+        html = "x" * 1000
+        cache = RowsCache(max_bytes=2 * sys.getsizeof(html))
+        for number in ("A", "B", "C"):
+            cache.put(number, "v1", "all", _evaluation(), html)
+
+        assert cache.get("A", "v1", "r1", "all", NOW) is None
+        assert cache.get("B", "v1", "r1", "all", NOW) is not None
+        assert cache.get("C", "v1", "r1", "all", NOW) is not None
+
+    def test_skips_fragments_over_budget(self) -> None:
+        cache = RowsCache(max_bytes=100)
+        cache.put("A", "v1", "all", _evaluation(), "x" * 1000)
+
+        assert cache.get("A", "v1", "r1", "all", NOW) is None
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import dataclasses
+import pickle
+from datetime import datetime
+
+import pytest
+
+from portal.services.eligibility import evaluate_eligibility
+from portal.types import (
+    DIGITAL,
+    FINAL_SALE,
+    Article,
+    ArticleEligibility,
+    ArticleTable,
+    EligibilityTable,
+    Order,
+)
+
+
+def _articles(count: int) -> list[Article]:
+    return [
+        Article(
+            sku=f"SKU-{i}",
+            name=f"Article {i}",
+            quantity=i + 1,
+            quantity_returned=i % 2,
+            price=i + 0.25,
+            is_digital=i % 3 == 0,
+            is_final_sale=i % 5 == 0,
+            category="apparel" if i % 2 else "electronics",
+        )
+        for i in range(count)
+    ]
+
+
+class TestSlots:
+    def test_value_types_have_no_instance_dict(self) -> None:
+        (article,) = _articles(1)
+        result = ArticleEligibility(article, True, "", "")
+        assert not hasattr(article, "__dict__")
+        assert not hasattr(result, "__dict__")
+
+    def test_value_types_are_frozen(self) -> None:
+        (article,) = _articles(1)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            article.quantity = 5  # type: ignore[misc]
+
+
+class TestArticleTable:
+    def test_round_trips_articles(self) -> None:
+        articles = _articles(10)
+        table = ArticleTable.from_articles(articles)
+
+        assert len(table) == 10
+        assert list(table) == articles
+        assert table[3] == articles[3]
+        assert table[-1] == articles[-1]
+        assert table[2:4] == articles[2:4]
+        assert table == articles
+        assert articles == table
+
+    def test_flags_use_the_shared_bits(self) -> None:
+        articles = _articles(6)
+        table = ArticleTable.from_articles(articles)
+
+        for flags, article in zip(table.flags, articles, strict=True):
+            assert bool(flags & DIGITAL) == article.is_digital
+            assert bool(flags & FINAL_SALE) == article.is_final_sale
+
+    def test_index_out_of_range(self) -> None:
+        with pytest.raises(IndexError):
+            ArticleTable.from_articles(_articles(2))[2]
+
+    def test_pickles(self) -> None:
+        table = ArticleTable.from_articles(_articles(3))
+        assert pickle.loads(pickle.dumps(table)) == table
+
+
+class TestEligibilityTable:
+    def test_evaluator_keeps_columns(self) -> None:
+        articles = _articles(4)
+        order = Order(
+            order_number="B2B-1",
+            email="b2b@example.com",
+            recipient="B2B",
+            zip="10115",
+            street="Street 1",
+            city="Berlin",
+            order_date=datetime(2025, 12, 1),
+            delivery_date=datetime(2025, 12, 5),
+            articles=ArticleTable.from_articles(articles),
+        )
+        results = evaluate_eligibility(order)
+
+        assert isinstance(results, EligibilityTable)
+        assert list(results) == list(
+            evaluate_eligibility(dataclasses.replace(order, articles=articles))
+        )
+
+    def test_compares_by_results(self) -> None:
+        articles = _articles(3)
+
+        def table(returnable: bool) -> EligibilityTable:
+            results = EligibilityTable(ArticleTable.from_articles(articles))
+            for _ in articles:
+                results.append_row(returnable=returnable, reason="", matched_rule="")
+            return results
+
+        assert table(True) == table(True)
+        assert table(True) != table(False)
+        assert table(True) == list(table(True))
+        assert list(table(True)) == table(True)
+        with pytest.raises(TypeError):
+            hash(table(True))
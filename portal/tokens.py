@@ -0,0 +1,45 @@
+"""Signed lookup tokens.
+
+A lookup token proves that its holder passed the order lookup (number plus
+email or zip) for one order.  It is the order number, timestamped and
+HMAC-signed with ``SECRET_KEY``, so it is checked without touching the
+session or the database.  Clients send it in the ``X-Lookup-Token`` header,
+never in the URL, where it would end up in access logs, browser history and
+``Referer`` headers; it expires after ``RETURNS_LOOKUP_TOKEN_MAX_AGE``
+seconds.
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.core import signing
+from django.http import HttpRequest
+
+HEADER = "X-Lookup-Token"
+
+_SALT = "portal.lookup-token"
+
+
+def issue_lookup_token(order_number: str) -> str:
+    """Return a token for an order whose lookup just succeeded."""
+    return signing.TimestampSigner(salt=_SALT).sign(order_number)
+
+
+def verify_lookup_token(token: str) -> str | None:
+    """Return the order number *token* was issued for, unless invalid or expired."""
+    max_age = getattr(settings, "RETURNS_LOOKUP_TOKEN_MAX_AGE", 3600)
+    try:
+        return signing.TimestampSigner(salt=_SALT).unsign(token, max_age=max_age)
+    except signing.BadSignature:  # includes SignatureExpired
+        return None
+
+
+def request_token(request: HttpRequest) -> str | None:
+    """Return the token sent with *request*, if any (not yet verified)."""
+    return request.headers.get(HEADER) or None
+
+
+def token_order_number(request: HttpRequest) -> str | None:
+    """Return the order number proven by the request's token, if valid."""
+    token = request_token(request)
+    return None if token is None else verify_lookup_token(token)
@@ -2,11 +2,19 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field, fields
 from datetime import datetime
+from typing import Any, overload
 
+# Bits of an article's flags: the ArticleTable column, the snapshot format
+# and the plan keys of the rules all use these values.
+DIGITAL = 1
+FINAL_SALE = 2
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class Article:
     """A single article (line item) in an order."""
 
@@ -21,7 +29,119 @@ class Article:
     category: str = ""
 
 
-@dataclass
+class ArticleTable(Sequence[Article]):
+    """Columnar articles of one order, for B2B orders with thousands of lines.
+
+    Quantities, prices and flags are kept in parallel :mod:`array` columns
+    and the strings in plain lists, so the table costs a few objects instead
+    of one :class:`Article` per line.  Indexing builds an :class:`Article`
+    on demand; hot paths read the columns directly.
+    """
+
+    __slots__ = (
+        "sku",
+        "name",
+        "category",
+        "quantity",
+        "quantity_returned",
+        "price",
+        "flags",
+    )
+
+    def __init__(self) -> None:
+        self.sku: list[str] = []
+        self.name: list[str] = []
+        self.category: list[str] = []
+        self.quantity = array("q")
+        self.quantity_returned = array("q")
+        self.price = array("d")
+        self.flags = bytearray()
+
+    @classmethod
+    def from_articles(cls, articles: Iterable[Article]) -> ArticleTable:
+        table = cls()
+        for article in articles:
+            table.append(article)
+        return table
+
+    def append(self, article: Article) -> None:
+        self.append_row(
+            sku=article.sku,
+            name=article.name,
+            quantity=article.quantity,
+            quantity_returned=article.quantity_returned,
+            price=article.price,
+            is_digital=article.is_digital,
+            is_final_sale=article.is_final_sale,
+            category=article.category,
+        )
+
+    def append_row(
+        self,
+        *,
+        sku: str,
+        name: str,
+        quantity: int,
+        quantity_returned: int,
+        price: float,
+        is_digital: bool = False,
+        is_final_sale: bool = False,
+        category: str = "",
+    ) -> None:
+        self.sku.append(sku)
+        self.name.append(name)
+        self.category.append(category)
+        self.quantity.append(quantity)
+        self.quantity_returned.append(quantity_returned)
+        self.price.append(price)
+        self.flags.append(
+            (DIGITAL if is_digital else 0) | (FINAL_SALE if is_final_sale else 0)
+        )
+
+    def __len__(self) -> int:
+        return len(self.sku)
+
+    @overload
+    def __getitem__(self, index: int) -> Article: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Article]: ...
+
+    def __getitem__(self, index: int | slice) -> Article | list[Article]:
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self)))]
+        return self._row(range(len(self))[index])
+
+    def __iter__(self) -> Iterator[Article]:
+        return map(self._row, range(len(self)))
+
+    def _row(self, i: int) -> Article:
+        flags = self.flags[i]
+        return Article(
+            sku=self.sku[i],
+            name=self.name[i],
+            quantity=self.quantity[i],
+            quantity_returned=self.quantity_returned[i],
+            price=self.price[i],
+            is_digital=bool(flags & DIGITAL),
+            is_final_sale=bool(flags & FINAL_SALE),
+            category=self.category[i],
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            a == b for a, b in zip(self, other, strict=True)
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"<ArticleTable: {len(self)} articles>"
+
+
+@dataclass(slots=True)
 class Order:
     """A mapped customer order."""
 
@@ -33,10 +153,98 @@ class Order:
     city: str
     order_date: datetime
     delivery_date: datetime
-    articles: list[Article] = field(default_factory=list)
+    articles: Sequence[Article] = field(default_factory=list)
+
+
+class LazyOrder(Order):
+    """An :class:`Order` whose ``articles`` and ``delivery_date`` are deferred.
+
+    Both are computed by their loaders on first access and then kept, so
+    callers see exactly the same attributes, equality and repr as a plain
+    :class:`Order`.
+    """
+
+    __slots__ = ("_loaders",)
+
+    def __init__(
+        self,
+        *,
+        order_number: str,
+        email: str,
+        recipient: str,
+        zip: str,
+        street: str,
+        city: str,
+        order_date: datetime,
+        load_articles: Callable[[], Sequence[Article]],
+        load_delivery_date: Callable[[], datetime],
+    ) -> None:
+        self.order_number = order_number
+        self.email = email
+        self.recipient = recipient
+        self.zip = zip
+        self.street = street
+        self.city = city
+        self.order_date = order_date
+        self._loaders: dict[str, Callable[[], Any]] = {
+            "articles": load_articles,
+            "delivery_date": load_delivery_date,
+        }
 
+    def __getattr__(self, name: str) -> Any:
+        # Only called for slots that are not set yet.
+        if name == "_loaders":
+            raise AttributeError(name)
+        loader = self._loaders.get(name)
+        if loader is None:
+            raise AttributeError(name)
+        value = loader()
+        setattr(self, name, value)
+        return value
 
-@dataclass
+    def is_loaded(self, name: str) -> bool:
+        """Whether the deferred field *name* has been computed already."""
+        try:
+            object.__getattribute__(self, name)
+        except AttributeError:
+            return False
+        return True
+
+    def when_loaded(self, name: str, callback: Callable[[], None]) -> None:
+        """Call *callback* after the deferred field *name* is computed."""
+        loader = self._loaders[name]
+
+        def load() -> Any:
+            value = loader()
+            setattr(self, name, value)
+            callback()
+            return value
+
+        self._loaders[name] = load
+
+    def with_dates(self, order_date: datetime, delivery_date: datetime) -> LazyOrder:
+        """Copy with new dates whose articles still load (once) through *self*."""
+        return LazyOrder(
+            order_number=self.order_number,
+            email=self.email,
+            recipient=self.recipient,
+            zip=self.zip,
+            street=self.street,
+            city=self.city,
+            order_date=order_date,
+            load_articles=lambda: self.articles,
+            load_delivery_date=lambda: delivery_date,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Order):
+            return NotImplemented
+        return all(
+            getattr(self, f.name) == getattr(other, f.name) for f in fields(self)
+        )
+
+
+@dataclass(frozen=True, slots=True)
 class ArticleEligibility:
     """Result of evaluating return eligibility for a single article."""
 
@@ -44,3 +252,63 @@ class ArticleEligibility:
     returnable: bool
     reason: str  # human-readable explanation (empty string when returnable)
     matched_rule: str  # identifier of the rule that matched (empty when returnable)
+
+
+class EligibilityTable(Sequence[ArticleEligibility]):
+    """Columnar eligibility results for the rows of an :class:`ArticleTable`.
+
+    Indexing builds an :class:`ArticleEligibility` on demand, so code that
+    iterates results keeps working; serializers read the columns directly.
+    """
+
+    __slots__ = ("articles", "returnable", "reason", "matched_rule")
+
+    def __init__(self, articles: ArticleTable) -> None:
+        self.articles = articles
+        self.returnable = bytearray()
+        self.reason: list[str] = []
+        self.matched_rule: list[str] = []
+
+    def append_row(self, *, returnable: bool, reason: str, matched_rule: str) -> None:
+        self.returnable.append(returnable)
+        self.reason.append(reason)
+        self.matched_rule.append(matched_rule)
+
+    def __len__(self) -> int:
+        return len(self.returnable)
+
+    @overload
+    def __getitem__(self, index: int) -> ArticleEligibility: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[ArticleEligibility]: ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> ArticleEligibility | list[ArticleEligibility]:
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self)))]
+        return self._row(range(len(self))[index])
+
+    def __iter__(self) -> Iterator[ArticleEligibility]:
+        return map(self._row, range(len(self)))
+
+    def _row(self, i: int) -> ArticleEligibility:
+        return ArticleEligibility(
+            article=self.articles[i],
+            returnable=bool(self.returnable[i]),
+            reason=self.reason[i],
+            matched_rule=self.matched_rule[i],
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            a == b for a, b in zip(self, other, strict=True)
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"<EligibilityTable: {len(self)} results>"
@@ -1,12 +1,27 @@
+from django.conf import settings
 from django.urls import path
 
 from portal import views
 
+if settings.RETURNS_ASYNC_VIEWS:
+    lookup_view = views.AsyncLookupView.as_view()
+    articles_view = views.AsyncArticlesView.as_view()
+    article_rows_view = views.AsyncArticleRowsView.as_view()
+else:
+    lookup_view = views.LookupView.as_view()
+    articles_view = views.ArticlesView.as_view()
+    article_rows_view = views.ArticleRowsView.as_view()
+
 urlpatterns = [
-    path("", views.LookupView.as_view(), name="lookup"),
+    path("", lookup_view, name="lookup"),
     path(
         "<str:order_number>/articles/",
-        views.ArticlesView.as_view(),
+        articles_view,
         name="articles",
     ),
+    path(
+        "<str:order_number>/articles/rows/",
+        article_rows_view,
+        name="article_rows",
+    ),
 ]
@@ -1,10 +1,150 @@
-from django.http import HttpRequest, HttpResponse
+import math
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest
+from django.http.response import HttpResponseBase
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.views import View
 
+from portal.conditional import add_validators, cached_not_modified, not_modified
 from portal.forms import LookupForm
-from portal.services.eligibility import evaluate_eligibility
-from portal.services.order_store import find_order, get_order
+from portal.fragments import ROW_FILTERS, rows_cache
+from portal.services.eligibility import evaluate_cached
+from portal.services.order_store import (
+    StoredOrder,
+    afind_order,
+    aget_order_record,
+    find_order,
+    get_order_record,
+    order_from_record,
+)
+from portal.services.rules import ruleset_version
+from portal.services.throttle import client_ident, get_lookup_throttle
+from portal.tokens import request_token, token_order_number
+from portal.types import ArticleEligibility, Order
+
+_ROWS_TEMPLATE = "returns/partials/article_rows.html"
+
+
+def _article_rows(
+    results: Sequence[ArticleEligibility], *, returnable_only: bool = False
+) -> list[dict[str, Any]]:
+    article_rows = []
+    for line, result in enumerate(results, 1):
+        if returnable_only and not result.returnable:
+            continue
+        remaining_qty = max(
+            result.article.quantity - result.article.quantity_returned,
+            0,
+        )
+        article_rows.append(
+            {
+                # Stable across filters, so selections survive a toggle.
+                "line": line,
+                "result": result,
+                "remaining_qty": remaining_qty,
+                "quantity_options": list(range(1, remaining_qty + 1)),
+                "selectable": result.returnable and remaining_qty > 0,
+            }
+        )
+    return article_rows
+
+
+def _articles_context(
+    order: Order, results: Sequence[ArticleEligibility]
+) -> dict[str, Any]:
+    return {
+        "order": order,
+        "results": results,
+        "article_rows": _article_rows(results),
+    }
+
+
+def _has_lookup(request: HttpRequest, order_number: str) -> bool:
+    # A valid token spares the session, and with it the database.
+    if token_order_number(request) == order_number:
+        return True
+    return bool(request.session.get("order_number") == order_number)
+
+
+async def _ahas_lookup(request: HttpRequest, order_number: str) -> bool:
+    if token_order_number(request) == order_number:
+        return True
+    return bool(await request.session.aget("order_number") == order_number)
+
+
+def _render_articles(request: HttpRequest, record: StoredOrder) -> HttpResponseBase:
+    # The page passes the token on to its htmx requests, so it is part of
+    # the representation.
+    token = request_token(request) if token_order_number(request) else None
+    variant = "html" if token is None else f"html:{token}"
+    now = datetime.now()
+    response = cached_not_modified(request, record, variant, now=now)
+    if response is not None:
+        return response
+    order = order_from_record(record)
+    evaluation = evaluate_cached(order, record.version, now=now)
+    response = not_modified(request, record, evaluation, variant, now=now)
+    if response is None:
+        context = _articles_context(order, evaluation.results)
+        context["lookup_token"] = token
+        response = render(request, "returns/articles.html", context)
+    return add_validators(response, record, evaluation, variant, now=now)
+
+
+def _render_rows(
+    request: HttpRequest, record: StoredOrder, row_filter: str
+) -> HttpResponseBase:
+    variant = f"rows:{row_filter}"
+    now = datetime.now()
+    cached = rows_cache.get(
+        record.order_number, record.version, ruleset_version(), row_filter, now
+    )
+    if cached is not None:
+        evaluation, html = cached
+        response = not_modified(request, record, evaluation, variant, now=now)
+    else:
+        order = order_from_record(record)
+        evaluation = evaluate_cached(order, record.version, now=now)
+        response = not_modified(request, record, evaluation, variant, now=now)
+        if response is None:
+            rows = _article_rows(
+                evaluation.results, returnable_only=row_filter == "returnable"
+            )
+            html = render_to_string(_ROWS_TEMPLATE, {"article_rows": rows})
+            rows_cache.put(
+                record.order_number, record.version, row_filter, evaluation, html
+            )
+    if response is None:
+        response = HttpResponse(html)
+    return add_validators(response, record, evaluation, variant, now=now)
+
+
+def _lookup_redirect(request: HttpRequest) -> HttpResponse:
+    if request.headers.get("HX-Request"):
+        # Let htmx load the lookup page instead of swapping it into the rows.
+        return HttpResponse(headers={"HX-Redirect": reverse("lookup")})
+    return redirect("lookup")
+
+
+def _throttled(request: HttpRequest) -> HttpResponse | None:
+    """Count a lookup attempt; a 429 response if it is over the limits."""
+    wait = get_lookup_throttle().check(
+        client_ident(request.META), request.POST.get("order_number")
+    )
+    if not wait:
+        return None
+    return HttpResponse(
+        "Too many lookup attempts. Please try again later.",
+        status=429,
+        content_type="text/plain",
+        headers={"Retry-After": str(math.ceil(wait))},
+    )
 
 
 class LookupView(View):
@@ -14,6 +154,10 @@ class LookupView(View):
         return render(request, "returns/lookup.html", {"form": LookupForm()})
 
     def post(self, request: HttpRequest) -> HttpResponse:
+        throttled = _throttled(request)
+        if throttled is not None:
+            return throttled
+
         form = LookupForm(request.POST)
         if form.is_valid():
             order = find_order(
@@ -32,36 +176,89 @@ class LookupView(View):
 class ArticlesView(View):
     """Articles page – shows items in the order with eligibility info."""
 
-    def get(self, request: HttpRequest, order_number: str) -> HttpResponse:
-        if request.session.get("order_number") != order_number:
+    def get(self, request: HttpRequest, order_number: str) -> HttpResponseBase:
+        if not _has_lookup(request, order_number):
             return redirect("lookup")
 
-        order = get_order(order_number)
-        if order is None:
+        record = get_order_record(order_number)
+        if record is None:
             return redirect("lookup")
 
-        results = evaluate_eligibility(order)
-        article_rows = []
-        for result in results:
-            remaining_qty = max(
-                result.article.quantity - result.article.quantity_returned,
-                0,
-            )
-            article_rows.append(
-                {
-                    "result": result,
-                    "remaining_qty": remaining_qty,
-                    "quantity_options": list(range(1, remaining_qty + 1)),
-                    "selectable": result.returnable and remaining_qty > 0,
-                }
+        return _render_articles(request, record)
+
+
+class AsyncLookupView(View):
+    """Async :class:`LookupView`, served when running under ASGI."""
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        return render(request, "returns/lookup.html", {"form": LookupForm()})
+
+    async def post(self, request: HttpRequest) -> HttpResponse:
+        # The SQLite bucket store can wait on its lock; keep it off the loop.
+        throttled = await sync_to_async(_throttled, thread_sensitive=False)(request)
+        if throttled is not None:
+            return throttled
+
+        form = LookupForm(request.POST)
+        if form.is_valid():
+            order = await afind_order(
+                form.cleaned_data["order_number"],
+                form.cleaned_data["identifier"],
             )
+            if order is None:
+                form.add_error(None, "Order not found or credentials do not match.")
+            else:
+                await request.session.aset("order_number", order.order_number)
+                return redirect("articles", order_number=order.order_number)
 
-        return render(
-            request,
-            "returns/articles.html",
-            {
-                "order": order,
-                "results": results,
-                "article_rows": article_rows,
-            },
-        )
+        return render(request, "returns/lookup.html", {"form": form})
+
+
+class AsyncArticlesView(View):
+    """Async :class:`ArticlesView`, served when running under ASGI."""
+
+    async def get(self, request: HttpRequest, order_number: str) -> HttpResponseBase:
+        if not await _ahas_lookup(request, order_number):
+            return redirect("lookup")
+
+        record = await aget_order_record(order_number)
+        if record is None:
+            return redirect("lookup")
+
+        return _render_articles(request, record)
+
+
+class ArticleRowsView(View):
+    """Rows fragment of the articles page, requested by htmx."""
+
+    def get(self, request: HttpRequest, order_number: str) -> HttpResponseBase:
+        if not _has_lookup(request, order_number):
+            return _lookup_redirect(request)
+
+        row_filter = request.GET.get("filter", "all")
+        if row_filter not in ROW_FILTERS:
+            return HttpResponseBadRequest("Unknown filter.")
+
+        record = get_order_record(order_number)
+        if record is None:
+            return _lookup_redirect(request)
+
+        return _render_rows(request, record, row_filter)
+
+
+class AsyncArticleRowsView(View):
+    """Async :class:`ArticleRowsView`, served when running under ASGI."""
+
+    async def get(self, request: HttpRequest, order_number: str) -> HttpResponseBase:
+        if not await _ahas_lookup(request, order_number):
+            return _lookup_redirect(request)
+
+        row_filter = request.GET.get("filter", "all")
+        if row_filter not in ROW_FILTERS:
+            return HttpResponseBadRequest("Unknown filter.")
+
+        record = await aget_order_record(order_number)
+        if record is None:
+            return _lookup_redirect(request)
+
+        return _render_rows(request, record, row_filter)
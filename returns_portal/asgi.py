@@ -0,0 +1,8 @@
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "returns_portal.settings")
+os.environ.setdefault("RETURNS_ASYNC_VIEWS", "1")
+
+application = get_asgi_application()
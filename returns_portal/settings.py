@@ -4,6 +4,7 @@ Django settings for returns_portal project.
 Generated by "django-admin startproject" and adapted for this repository.
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / "subdir".
@@ -65,6 +66,12 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "returns_portal.wsgi.application"
 
+ASGI_APPLICATION = "returns_portal.asgi.application"
+
+# Serve the async portal views; returns_portal.asgi turns this on so order
+# lookups do not tie up a worker thread while the store does I/O.
+RETURNS_ASYNC_VIEWS = os.environ.get("RETURNS_ASYNC_VIEWS") == "1"
+
 
 # Database
 # https://docs.djangoproject.com/en/dev/ref/settings/#databases
@@ -108,6 +115,58 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Order store
+# "json" indexes portal/data/orders_raw.json in memory; "sqlite" reads the
+# database filled by ``manage.py ingest_orders``; "snapshot" memory-maps the
+# file written by ``manage.py build_snapshot``.
+
+RETURNS_ORDER_BACKEND = "json"
+
+RETURNS_ORDERS_DB = BASE_DIR / "orders.sqlite3"
+
+RETURNS_ORDERS_SNAPSHOT = BASE_DIR / "orders.snapshot"
+
+
+# Return eligibility rules (YAML or JSON).  Edits are picked up without a
+# restart; the file is checked at most every RETURNS_RULES_CHECK_INTERVAL
+# seconds and recompiled in the background.
+
+RETURNS_RULES_PATH = BASE_DIR / "portal" / "data" / "return_rules.yaml"
+
+RETURNS_RULES_CHECK_INTERVAL = 2.0
+
+
+# Articles responses carry an ETag and may be reused by the browser until
+# their eligibility expires, but for at most this many seconds.
+
+RETURNS_ARTICLES_MAX_AGE = 60
+
+
+# Lifetime in seconds of the signed lookup tokens returned by the lookup
+# API, which the articles endpoints accept instead of a session.
+
+RETURNS_LOOKUP_TOKEN_MAX_AGE = 60 * 60
+
+
+# Lookup throttling: token buckets per client IP and per order number, as
+# "<attempts>/<s|min|h>" (None disables a limit).  "memory" keeps buckets
+# per process; "sqlite" shares them through RETURNS_THROTTLE_DB between the
+# workers of a host; a dotted path names a custom BucketStore class.
+
+RETURNS_THROTTLE_BACKEND = "memory"
+
+RETURNS_THROTTLE_DB = BASE_DIR / "throttle.sqlite3"
+
+RETURNS_LOOKUP_RATE_PER_CLIENT = "20/min"
+
+RETURNS_LOOKUP_RATE_PER_ORDER = "10/min"
+
+# Reverse proxies in front of the app whose X-Forwarded-For entries are
+# trusted to name the client.  0 throttles on REMOTE_ADDR alone.
+
+RETURNS_TRUSTED_PROXIES = 0
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/dev/howto/static-files/
 